@@ -0,0 +1,170 @@
+"""
+Stage benchmarks on synthetic universes (data.synthetic.generate_synthetic_panel).
+
+    PYTHONPATH=. python -m benchmarks.run_benchmarks                 # compare with baseline.json
+    PYTHONPATH=. python -m benchmarks.run_benchmarks --sizes 10000x20 --repeat 1
+    PYTHONPATH=. python -m benchmarks.run_benchmarks --update-baseline
+
+A size is SYMBOLSxYEARS. Each stage is timed --repeat times and the best time is kept.
+Exit status 1 when a stage is slower than baseline * --tolerance (and by more than
+--min-delta-s, so millisecond stages do not flap).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.alerts.builder import build_alert
+from src.common.config_loader import load_config, load_score_maps
+from src.data.synthetic import BARS_PER_YEAR, generate_synthetic_panel
+from src.features.cross_section import rank_snapshot_rs
+from src.features.panel import compute_panel_features
+from src.features.snapshot import snapshot_from_panel
+from src.publish.export_latest import build_payload, dumps_compact
+from src.scoring.scorer import total_score
+from src.strategies import rs_rotation, trend_breakout
+from src.universe.filter import passes_universe_filters
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = "100x2,1000x2,500x10"
+
+
+def parse_size(spec: str) -> tuple[int, int]:
+    n_symbols, years = spec.lower().split("x")
+    return int(n_symbols), int(years)
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best, out = float("inf"), None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def bench_size(n_symbols: int, years: int, cfg: dict, maps: dict, repeat: int = 3, seed: int = 0, history: bool = True) -> dict[str, Any]:
+    """Time every stage for one synthetic universe; the first symbol doubles as the benchmark."""
+    n_bars = years * BARS_PER_YEAR
+    times: dict[str, float] = {}
+    regime = {"regime": "TREND", "benchmark": "SYN0000", "regime_reason": []}
+    provenance = {"vendor": "synthetic", "feed": "bench", "bar_interval": "1d"}
+    weights = cfg["scoring"]["weights_global"]
+
+    times["generate"], panel = _best(lambda: generate_synthetic_panel(n_symbols, n_bars, seed=seed), repeat)
+    times["features"], feats = _best(lambda: compute_panel_features(panel), repeat)
+
+    def _snapshot():
+        snap = snapshot_from_panel(panel, feats)
+        return snap, rank_snapshot_rs(snap, snap[0])
+
+    times["snapshot"], (snap, ranks) = _best(_snapshot, repeat)
+    times["filters"], passed = _best(lambda: [r for r in snap if r["n_valid"] > 0 and passes_universe_filters(r, cfg)], repeat)
+
+    def _strategies():
+        raws = []
+        for r in passed:
+            sym = str(r["symbol"])
+            raws.append(trend_breakout.evaluate(sym, r, cfg, maps))
+            raws.append(rs_rotation.evaluate(sym, r, snap[0], cfg, maps, rs_rank=ranks.get(sym)))
+        return [raw for raw in raws if raw]
+
+    times["strategies"], raws = _best(_strategies, repeat)
+    times["scoring"], totals = _best(lambda: [total_score(raw["scores"]["components"], weights) for raw in raws], repeat)
+    times["alerts"], alerts = _best(
+        lambda: [build_alert(raw, cfg, t, regime, data_provenance=provenance) for raw, t in zip(raws, totals)], repeat
+    )
+    times["publish"], _ = _best(lambda: dumps_compact(build_payload(alerts, 20)), repeat)
+
+    if history:
+        def _history():
+            trend_breakout.evaluate_history(panel, feats, cfg, maps)
+            rs_rotation.evaluate_history(panel, feats, feats["ret60"][:, 0], cfg, maps)
+
+        times["history"], _ = _best(_history, repeat)
+
+    return {
+        "symbols": n_symbols,
+        "bars": n_bars,
+        "passed_filters": len(passed),
+        "raw_alerts": len(raws),
+        "seconds": {k: round(v, 5) for k, v in times.items()},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_s: float) -> list[str]:
+    """Stages slower than baseline * tolerance (and by more than min_delta_s)."""
+    out = []
+    for size, res in results.items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for stage, t in res["seconds"].items():
+            b = base["seconds"].get(stage)
+            if b is not None and t > b * tolerance and t - b > min_delta_s:
+                out.append(f"{size} {stage}: {t:.4f}s vs baseline {b:.4f}s (x{t / b:.2f})")
+    return out
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stage benchmarks on synthetic universes.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated SYMBOLSxYEARS, e.g. 10x1,1000x5,10000x20")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (best time is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-history", action="store_true", help="Skip the whole-history strategy evaluation")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor per stage")
+    parser.add_argument("--min-delta-s", type=float, default=0.02, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--out", default=None, help="Also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    cfg = load_config(PROJECT_ROOT)
+    maps = load_score_maps(PROJECT_ROOT)
+    results = {}
+    for spec in filter(None, (s.strip() for s in args.sizes.split(","))):
+        n_symbols, years = parse_size(spec)
+        res = bench_size(n_symbols, years, cfg, maps, repeat=args.repeat, seed=args.seed, history=not args.no_history)
+        results[spec] = res
+        print(f"{spec:>10} " + " ".join(f"{k}={v:.4f}" for k, v in res["seconds"].items()), flush=True)
+
+    payload = {"environment": environment(), "repeat": args.repeat, "seed": args.seed, "results": results}
+    if args.out:
+        Path(args.out).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline")
+        return 0
+
+    regressions = compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance, args.min_delta_s)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,14 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
+from ..common.settings import settings_for
+
 def build_alert(raw: dict, cfg: dict, total_score: float, regime: dict, data_provenance: dict) -> dict:
     now = datetime.now(timezone.utc).isoformat()
     return {
         "alert_id": str(uuid.uuid4()),
         "created_at_utc": now,
-        "universe": cfg["meta"]["universe"],
+        "universe": settings_for(cfg).universe,
         "symbol": raw["symbol"],
         "currency": "USD",
         "data_provenance": data_provenance,
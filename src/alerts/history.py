@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+import json
+from pathlib import Path
+import sqlite3
+from typing import Any, Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    alert_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    setup TEXT NOT NULL,
+    bar_interval TEXT NOT NULL,
+    alert_date TEXT NOT NULL,
+    created_at_utc TEXT NOT NULL,
+    total REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_symbol_setup_interval_date ON alerts (symbol, setup, bar_interval, alert_date);
+CREATE INDEX IF NOT EXISTS alerts_date ON alerts (alert_date);
+CREATE TABLE IF NOT EXISTS latest (
+    symbol TEXT NOT NULL,
+    setup TEXT NOT NULL,
+    bar_interval TEXT NOT NULL,
+    alert_date TEXT NOT NULL,
+    PRIMARY KEY (symbol, setup, bar_interval)
+) WITHOUT ROWID;
+"""
+
+DEFAULT_INTERVAL = "1d"
+
+
+def _key(alert: dict) -> tuple[str, str, str]:
+    interval = (alert.get("data_provenance") or {}).get("bar_interval") or DEFAULT_INTERVAL
+    return alert["symbol"], alert["setup"]["setup_name"], str(interval)
+
+
+def _alert_date(alert: dict) -> str:
+    return str(alert.get("created_at_utc") or datetime.now(timezone.utc).isoformat())[:10]
+
+
+@dataclass
+class Cooldown:
+    """
+    Last alert date per (symbol, setup) at the scan's bar interval, taken from the history before a scan.
+
+    blocks() is true while fewer than days calendar days have passed since that alert.
+    Plain data, so it travels to the process-pool workers with the ScanContext.
+    """
+    last: dict[tuple[str, str], str] = field(default_factory=dict)
+    days: int = 0
+    today: date = field(default_factory=lambda: datetime.now(timezone.utc).date())
+
+    def blocks(self, symbol: str, setup: str) -> bool:
+        d = self.last.get((symbol, setup))
+        return self.days > 0 and d is not None and (self.today - date.fromisoformat(d)).days < self.days
+
+
+class AlertHistory:
+    """
+    Append-only alert store in SQLite, indexed by (symbol, setup, bar interval, date) and by date.
+
+    add() buffers rows and writes them batch_size at a time in one transaction (flush() /
+    close() write the rest). A small latest table keeps the newest alert date per
+    (symbol, setup, bar interval), so loading a scan's cooldown does not scan the history
+    however large it grows; last() and query() are index seeks. The bar interval is the
+    alert's data_provenance.bar_interval: a daily setup does not suppress the same setup on
+    hourly bars.
+    """
+
+    def __init__(self, path: str | Path, batch_size: int = 500):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self._pending: list[tuple] = []
+        self._con = sqlite3.connect(self.path)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, cfg: dict, project_root: str | Path) -> AlertHistory | None:
+        c = cfg.get("alerts", {}).get("history", {}) or {}
+        if not c.get("enabled", False):
+            return None
+        return cls(Path(project_root) / c.get("path", "data/alerts/history.sqlite"), batch_size=int(c.get("batch_size", 500)))
+
+    def __enter__(self) -> AlertHistory:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def add(self, alert: dict) -> None:
+        symbol, setup, interval = _key(alert)
+        self._pending.append((
+            alert["alert_id"], symbol, setup, interval, _alert_date(alert), alert.get("created_at_utc", ""),
+            alert.get("scores", {}).get("total"), json.dumps(alert, ensure_ascii=False),
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, alerts: Iterable[dict]) -> None:
+        for a in alerts:
+            self.add(a)
+
+    def flush(self) -> int:
+        rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        with self._con:
+            self._con.executemany(
+                "INSERT INTO alerts (alert_id, symbol, setup, bar_interval, alert_date, created_at_utc, total, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._con.executemany(
+                "INSERT INTO latest (symbol, setup, bar_interval, alert_date) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (symbol, setup, bar_interval) DO UPDATE SET alert_date = excluded.alert_date "
+                "WHERE excluded.alert_date > latest.alert_date",
+                [r[1:5] for r in rows],
+            )
+        return len(rows)
+
+    def close(self) -> None:
+        self.flush()
+        self._con.close()
+
+    def last(self, symbol: str, setup: str, interval: str | None = None) -> dict | None:
+        """The most recent alert for (symbol, setup), at any bar interval unless one is given, or None."""
+        self.flush()
+        sql, args = "SELECT payload FROM alerts WHERE symbol = ? AND setup = ?", [symbol, setup]
+        if interval is not None:
+            sql, args = sql + " AND bar_interval = ?", args + [interval]
+        row = self._con.execute(sql + " ORDER BY alert_date DESC, id DESC LIMIT 1", args).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cooldown(
+        self, days: int, today: date | None = None, symbols: Iterable[str] | None = None, interval: str = DEFAULT_INTERVAL
+    ) -> Cooldown:
+        """A Cooldown over the latest table for one bar interval (optionally only for symbols)."""
+        self.flush()
+        rows = self._con.execute("SELECT symbol, setup, alert_date FROM latest WHERE bar_interval = ?", (interval,)).fetchall()
+        if symbols is not None:
+            wanted = set(symbols)
+            rows = [r for r in rows if r[0] in wanted]
+        cd = Cooldown({(s, k): d for s, k, d in rows}, int(days))
+        if today is not None:
+            cd.today = today
+        return cd
+
+    def query(
+        self,
+        symbol: str | None = None,
+        setup: str | None = None,
+        start: str | date | None = None,
+        end: str | date | None = None,
+        limit: int | None = None,
+        interval: str | None = None,
+    ) -> list[dict]:
+        """Alerts in [start, end] (inclusive dates), oldest first, optionally for one symbol / setup / bar interval."""
+        self.flush()
+        where, args = [], []
+        for col, val in (("symbol", symbol), ("setup", setup), ("bar_interval", interval)):
+            if val is not None:
+                where.append(f"{col} = ?")
+                args.append(val)
+        if start is not None:
+            where.append("alert_date >= ?")
+            args.append(str(start)[:10])
+        if end is not None:
+            where.append("alert_date <= ?")
+            args.append(str(end)[:10])
+        sql = "SELECT payload FROM alerts" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY alert_date, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [json.loads(r[0]) for r in self._con.execute(sql, args)]
+
+    def count(self) -> int:
+        self.flush()
+        return int(self._con.execute("SELECT COUNT(*) FROM alerts").fetchone()[0])
@@ -1,15 +1,77 @@
 from __future__ import annotations
-import yaml
+from dataclasses import dataclass
+import hashlib
 from pathlib import Path
+import pickle
+import uuid
+
+from .settings import Settings, compile_config, remember, validate_score_maps
+
+# bump when Settings or the validation changes, so stale compiled caches are not reused
+COMPILED_VERSION = 2
 
 def load_yaml(path: str | Path) -> dict:
+    import yaml  # only paid when a compiled config is not cached
+
     p = Path(path)
     return yaml.safe_load(p.read_text(encoding="utf-8"))
 
-def load_config(project_root: str | Path) -> dict:
+@dataclass(frozen=True, slots=True)
+class CompiledConfig:
+    cfg: dict
+    score_maps: dict
+    settings: Settings
+    digest: str
+
+def _digest(*raw: bytes) -> str:
+    h = hashlib.sha256(f"v{COMPILED_VERSION}".encode())
+    for b in raw:
+        h.update(len(b).to_bytes(8, "little"))
+        h.update(b)
+    return h.hexdigest()[:32]
+
+def load_compiled(project_root: str | Path, cache_dir: str | Path | None = None, keep: int = 4) -> CompiledConfig:
+    """
+    config.yaml + score_maps.yaml parsed, validated (settings.ConfigError) and compiled.
+
+    The result is pickled under cache_dir (default data/cache/config) keyed by a hash of both
+    files, so an unchanged config is one small pickle load and no YAML parsing. Every call
+    returns fresh dicts, as parsing would, and registers its settings for the new cfg dict
+    (settings.settings_for), so nothing compiles them again. The newest keep entries are kept.
+    Callers needing both files take cfg and score_maps from one load_compiled.
+    """
     root = Path(project_root)
-    return load_yaml(root / "config" / "config.yaml")
+    cfg_path, maps_path = root / "config" / "config.yaml", root / "config" / "score_maps.yaml"
+    cfg_raw, maps_raw = cfg_path.read_bytes(), maps_path.read_bytes()
+    digest = _digest(cfg_raw, maps_raw)
+    cache = Path(cache_dir) if cache_dir is not None else root / "data" / "cache" / "config"
+    entry = cache / f"compiled-{digest}.pkl"
+
+    try:
+        compiled = pickle.loads(entry.read_bytes())
+        if isinstance(compiled, CompiledConfig) and compiled.digest == digest:
+            remember(compiled.cfg, compiled.settings)
+            return compiled
+    except Exception:
+        pass  # missing, stale or unreadable: compile again
+
+    cfg, score_maps = load_yaml(cfg_path), load_yaml(maps_path)
+    validate_score_maps(score_maps)
+    compiled = CompiledConfig(cfg, score_maps, compile_config(cfg), digest)
+    try:
+        cache.mkdir(parents=True, exist_ok=True)
+        tmp = cache / f".compiled-{uuid.uuid4().hex[:8]}.tmp"
+        tmp.write_bytes(pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp.replace(entry)
+        for old in sorted(cache.glob("compiled-*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)[keep:]:
+            old.unlink(missing_ok=True)
+    except OSError:
+        pass  # read-only checkout: still works, just without the cache
+    remember(compiled.cfg, compiled.settings)
+    return compiled
+
+def load_config(project_root: str | Path) -> dict:
+    return load_compiled(project_root).cfg
 
 def load_score_maps(project_root: str | Path) -> dict:
-    root = Path(project_root)
-    return load_yaml(root / "config" / "score_maps.yaml")
+    return load_compiled(project_root).score_maps
@@ -0,0 +1,79 @@
+"""
+Import-time breakdown of an entry point, from a fresh interpreter (python -X importtime).
+
+    PYTHONPATH=. python -m src.common.importtime src.main src.publish.export_latest --top 15
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import os
+import subprocess
+import sys
+
+# imports that a CLI entry point must not pay for before it knows its mode
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "yfinance", "requests")
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(module: str, cwd: str | None = None) -> list[ImportTime]:
+    """Every module imported by `import module` in a new interpreter, in import order."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [cwd or os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=cwd, env=env, check=True,
+    )
+    out = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header row
+        depth = (len(name) - len(name.lstrip())) // 2
+        out.append(ImportTime(name.strip(), int(self_us), int(cum_us), depth))
+    return out
+
+
+def total_us(rows: list[ImportTime], module: str) -> int:
+    """Cumulative import time of module itself (0 when it was already imported by a parent)."""
+    return next((r.cumulative_us for r in rows if r.module == module), 0)
+
+
+def by_package(rows: list[ImportTime]) -> dict[str, int]:
+    """Self time summed per top-level package, largest first."""
+    out: dict[str, int] = {}
+    for r in rows:
+        top = r.module.split(".")[0]
+        out[top] = out.get(top, 0) + r.self_us
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]))
+
+
+def report(module: str, top: int = 15, cwd: str | None = None) -> str:
+    rows = measure_imports(module, cwd)
+    heavy = sorted({r.module for r in rows if r.module.split(".")[0] in HEAVY_MODULES and "." not in r.module})
+    lines = [f"{module}: {total_us(rows, module) / 1000:.1f} ms, {len(rows)} modules, heavy: {', '.join(heavy) or 'none'}"]
+    for pkg, us in list(by_package(rows).items())[:top]:
+        lines.append(f"  {pkg:<28} {us / 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Import-time breakdown per top-level package.")
+    ap.add_argument("modules", nargs="+", help="Modules to import, e.g. src.main")
+    ap.add_argument("--top", type=int, default=15, help="Packages listed per module")
+    args = ap.parse_args(argv)
+    for m in args.modules:
+        print(report(m, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+import cProfile
+import io
+from pathlib import Path
+import pstats
+import threading
+import time
+from typing import Any, Iterator
+
+PERCENTILES = (50, 90, 99)
+
+
+class RunMetrics:
+    """
+    Timing and vendor accounting for one run; safe to share between fetch threads.
+
+    stage(name) times a block (wall clock + CPU of the calling thread) and adds it to that
+    stage's totals. Blocks running on several threads add up, so a concurrent stage's wall_s
+    can exceed the run's. observe(name, seconds) records one per-symbol latency. call()
+    counts vendor requests, retries, 429s and bytes; slept() and watch() account for time
+    spent sleeping (retry back-off, rate limiter waits).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.stages: dict[str, dict[str, float]] = {}
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.vendors: dict[str, dict[str, int]] = {}
+        self.sleep_s: dict[str, float] = defaultdict(float)
+        self._limiters: list[tuple[Any, float, int]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - w0, time.thread_time() - c0)
+
+    def add_stage(self, name: str, wall_s: float, cpu_s: float = 0.0, calls: int = 1) -> None:
+        with self._lock:
+            s = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            s["wall_s"] += wall_s
+            s["cpu_s"] += cpu_s
+            s["calls"] += calls
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.latencies[name].append(float(seconds))
+
+    def call(self, vendor: str, status: int | None = None, nbytes: int = 0, retry: bool = False, error: bool = False) -> None:
+        """One request attempt against vendor (status None when it never got a response)."""
+        with self._lock:
+            v = self.vendors.setdefault(vendor, {"calls": 0, "retries": 0, "http_429": 0, "errors": 0, "bytes": 0})
+            v["calls"] += 1
+            v["retries"] += int(retry)
+            v["http_429"] += int(status == 429)
+            v["errors"] += int(error or (status is not None and status >= 400))
+            v["bytes"] += int(nbytes)
+
+    def slept(self, reason: str, seconds: float) -> None:
+        with self._lock:
+            self.sleep_s[reason] += float(seconds)
+
+    def watch(self, limiter: Any, from_now: bool = False) -> None:
+        """Report a TokenBucket's waits / throttles with this run (from_now: only those after this call, for a bucket shared across runs)."""
+        self._limiters.append((limiter, limiter.waited_s, limiter.throttled) if from_now else (limiter, 0.0, 0))
+
+    def summary(self) -> dict[str, Any]:
+        """timing + vendor sections for run_report.json."""
+        with self._lock:
+            stages = {k: {"wall_s": round(v["wall_s"], 4), "cpu_s": round(v["cpu_s"], 4), "calls": int(v["calls"])} for k, v in self.stages.items()}
+            latency = {k: latency_summary(v) for k, v in self.latencies.items()}
+            vendors = {k: dict(v) for k, v in self.vendors.items()}
+            sleep = {f"{k}_s": round(v, 4) for k, v in self.sleep_s.items()}
+        if self._limiters:
+            sleep["rate_limit_s"] = round(sum(lim.waited_s - w0 for lim, w0, _ in self._limiters), 4)
+            sleep["throttled"] = int(sum(lim.throttled - t0 for lim, _, t0 in self._limiters))
+        return {
+            "timing": {
+                "wall_s": round(time.perf_counter() - self._wall0, 4),
+                "cpu_s": round(time.process_time() - self._cpu0, 4),
+                "stages": stages,
+                "latency_ms": latency,
+            },
+            "vendor": {"calls": vendors, "sleep": sleep},
+        }
+
+
+def latency_summary(seconds: list[float]) -> dict[str, float]:
+    if not seconds:
+        return {"n": 0}
+    import numpy as np  # kept off the CLI's import path (see src.main)
+
+    ms = np.asarray(seconds, dtype=float) * 1000.0
+    out = {"n": int(ms.size)}
+    for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        out[f"p{p}"] = round(float(v), 3)
+    out["max"] = round(float(ms.max()), 3)
+    return out
+
+
+@contextmanager
+def profiled(out_dir: str | Path | None, top_n: int = 30, name: str = "run_profile") -> Iterator[cProfile.Profile | None]:
+    """
+    cProfile the block (main thread only) when out_dir is given: writes <name>.pstats for
+    pstats/snakeviz and <name>.txt with the top_n functions by own and by cumulative time.
+    """
+    if out_dir is None:
+        yield None
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(str(out / f"{name}.pstats"))
+        buf = io.StringIO()
+        for key, title in (("tottime", "own time"), ("cumulative", "cumulative time")):
+            buf.write(f"== top {top_n} by {title} ==\n")
+            pstats.Stats(prof, stream=buf).strip_dirs().sort_stats(key).print_stats(top_n)
+        (out / f"{name}.txt").write_text(buf.getvalue(), encoding="utf-8")
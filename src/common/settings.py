@@ -0,0 +1,342 @@
+"""
+Typed, validated view of config.yaml for the scan's hot paths.
+
+compile_config checks the keys the scan reads and converts them once into frozen slotted
+objects, so a bad config fails at load with the offending path instead of mid-scan, and
+strategies/filters read attributes instead of re-walking nested dicts per symbol.
+settings_for memoizes the compiled form on the loaded dict (like scoring.maps.compiled_maps):
+treat a config dict as read-only once a scan has used it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+from typing import Any, Mapping
+
+REGIMES = frozenset({"TREND", "RANGE", "RISK_OFF", "HIGH_VOL"})
+# what regime rule conditions may test (regime.timeline computes them per benchmark bar):
+# flags compare with == / != true|false, levels with a number
+REGIME_FLAGS = frozenset({"benchmark_close_above_ma200", "benchmark_close_below_ma200", "benchmark_ma50_above_ma200"})
+REGIME_LEVELS = frozenset({"benchmark_adx14", "vix"})
+WEIGHT_KEYS = ("regime_fit", "trend_momo", "mean_reversion", "volume_flow", "risk_reward", "liquidity", "event_risk_penalty")
+
+
+class ConfigError(ValueError):
+    """Invalid config.yaml / score_maps.yaml; the message starts with the key path."""
+
+
+@dataclass(frozen=True, slots=True)
+class UniverseFilter:
+    min_price: float
+    min_avg_dollar_volume_20d: float
+    exclude_symbols: frozenset[str]
+
+
+@dataclass(frozen=True, slots=True)
+class Pool:
+    min_total: float
+    max_event_risk_penalty: float
+    max_risk_pct_of_equity: float
+    max_alerts_per_run: int
+
+
+@dataclass(frozen=True, slots=True)
+class Target:
+    name: str
+    rr: float
+    size_pct: float
+
+
+@dataclass(frozen=True, slots=True)
+class TrendBreakoutParams:
+    require_close_confirm: bool
+    stop_atr_multiple: float
+    min_rr: float
+    targets: tuple[Target, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class RsRotationParams:
+    rs_percentile_min: float
+    stop_atr_multiple: float
+    min_rr: float
+
+
+@dataclass(frozen=True, slots=True)
+class Strategy:
+    name: str
+    enabled: bool
+    pool_default: str
+    allowed_regimes: frozenset[str]
+    params: Any  # TrendBreakoutParams / RsRotationParams; the raw mapping for strategies not implemented yet
+
+
+@dataclass(frozen=True, slots=True)
+class Condition:
+    """One regime rule condition, e.g. "benchmark_adx14 <= 18" (true/false are 1.0/0.0)."""
+    variable: str
+    op: str
+    value: float
+
+    @property
+    def label(self) -> str:
+        """Reason tag: benchmark_close_above_ma200, not_<variable>, vix_ge_30, ..."""
+        if self.variable in REGIME_FLAGS:
+            return self.variable if (self.op == "==") == (self.value == 1.0) else f"not_{self.variable}"
+        return f"{self.variable}_{_OP_NAMES[self.op]}_{self.value:g}"
+
+
+@dataclass(frozen=True, slots=True)
+class RegimeRule:
+    name: str
+    conditions: tuple[Condition, ...]
+    optional: tuple[Condition, ...]  # reported in the reasons when met, never required
+    min_vix: float | None  # vol_guard: a reason when the vol proxy reaches it, never required
+    max_vix: float | None  # vol_guard: the rule does not apply above it (where the proxy is known)
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    universe: str
+    timezone: str
+    universe_filter: UniverseFilter
+    pools: Mapping[str, Pool]
+    weights: Mapping[str, float]
+    strategies: Mapping[str, Strategy]
+    trend_breakout: Strategy
+    rs_rotation: Strategy
+    regime_benchmark: str
+    regime_rules: Mapping[str, RegimeRule]
+
+    @property
+    def core(self) -> Pool:
+        return self.pools["CORE"]
+
+
+_MISSING = object()
+
+
+def _get(d: Any, path: str, key: str, default: Any = _MISSING) -> Any:
+    if not isinstance(d, Mapping):
+        raise ConfigError(f"{path}: expected a mapping, got {type(d).__name__}")
+    if key not in d or d[key] is None:
+        if default is _MISSING:
+            raise ConfigError(f"{path}.{key}: missing")
+        return default
+    return d[key]
+
+
+def _num(d: Any, path: str, key: str, default: Any = _MISSING) -> float:
+    v = _get(d, path, key, default)
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        raise ConfigError(f"{path}.{key}: expected a number, got {v!r}")
+    return float(v)
+
+
+def _int(d: Any, path: str, key: str, default: Any = _MISSING) -> int:
+    v = _get(d, path, key, default)
+    if isinstance(v, bool) or not isinstance(v, int):
+        raise ConfigError(f"{path}.{key}: expected an integer, got {v!r}")
+    return v
+
+
+def _bool(d: Any, path: str, key: str, default: Any = _MISSING) -> bool:
+    v = _get(d, path, key, default)
+    if not isinstance(v, bool):
+        raise ConfigError(f"{path}.{key}: expected true/false, got {v!r}")
+    return v
+
+
+def _str(d: Any, path: str, key: str, default: Any = _MISSING) -> str:
+    v = _get(d, path, key, default)
+    if not isinstance(v, str):
+        raise ConfigError(f"{path}.{key}: expected a string, got {v!r}")
+    return v
+
+
+def _strs(d: Any, path: str, key: str, default: Any = _MISSING) -> frozenset[str]:
+    v = _get(d, path, key, default)
+    if not isinstance(v, (list, tuple)) or not all(isinstance(x, str) for x in v):
+        raise ConfigError(f"{path}.{key}: expected a list of strings, got {v!r}")
+    return frozenset(v)
+
+
+def _pool(d: Any, path: str) -> Pool:
+    return Pool(
+        min_total=_num(d, path, "min_total"),
+        max_event_risk_penalty=_num(d, path, "max_event_risk_penalty"),
+        max_risk_pct_of_equity=_num(d, path, "max_risk_pct_of_equity"),
+        max_alerts_per_run=_int(d, path, "max_alerts_per_run"),
+    )
+
+
+def _trend_breakout_params(p: Any, path: str) -> TrendBreakoutParams:
+    targets = _get(p, path, "targets")
+    if not isinstance(targets, list) or not targets:
+        raise ConfigError(f"{path}.targets: expected a non-empty list")
+    return TrendBreakoutParams(
+        require_close_confirm=_bool(p, path, "require_close_confirm"),
+        stop_atr_multiple=_num(p, path, "stop_atr_multiple"),
+        min_rr=_num(p, path, "min_rr"),
+        targets=tuple(
+            Target(_str(t, f"{path}.targets[{i}]", "name", f"T{i + 1}"), _num(t, f"{path}.targets[{i}]", "rr"), _num(t, f"{path}.targets[{i}]", "size_pct"))
+            for i, t in enumerate(targets)
+        ),
+    )
+
+
+def _rs_rotation_params(p: Any, path: str) -> RsRotationParams:
+    return RsRotationParams(
+        rs_percentile_min=_num(p, path, "rs_percentile_min"),
+        stop_atr_multiple=_num(p, path, "stop_atr_multiple"),
+        min_rr=_num(p, path, "min_rr"),
+    )
+
+
+_OP_NAMES = {"==": "eq", "!=": "ne", ">=": "ge", "<=": "le", ">": "gt", "<": "lt"}
+_CONDITION = re.compile(r"^\s*(\w+)\s*(==|!=|>=|<=|>|<)\s*(\S+)\s*$")
+
+
+def _condition(text: Any, path: str) -> Condition:
+    m = _CONDITION.match(text) if isinstance(text, str) else None
+    if m is None:
+        raise ConfigError(f"{path}: expected '<variable> <op> <value>', got {text!r}")
+    variable, op, raw = m.groups()
+    if variable in REGIME_FLAGS:
+        if op not in ("==", "!=") or raw.lower() not in ("true", "false"):
+            raise ConfigError(f"{path}: {variable} compares with == / != true|false, got {text!r}")
+        return Condition(variable, op, 1.0 if raw.lower() == "true" else 0.0)
+    if variable not in REGIME_LEVELS:
+        raise ConfigError(f"{path}: unknown variable {variable!r} (one of {sorted(REGIME_FLAGS | REGIME_LEVELS)})")
+    try:
+        return Condition(variable, op, float(raw))
+    except ValueError:
+        raise ConfigError(f"{path}: expected a number, got {raw!r}") from None
+
+
+def _regime_rule(name: str, r: Any) -> RegimeRule:
+    path = f"regime.rules.{name}"
+    conditions = _get(r, path, "conditions")
+    optional = _get(r, path, "optional", [])
+    if not isinstance(conditions, list) or not conditions:
+        raise ConfigError(f"{path}.conditions: expected a non-empty list")
+    if not isinstance(optional, list):
+        raise ConfigError(f"{path}.optional: expected a list")
+    guard = _get(r, path, "vol_guard", {})
+    return RegimeRule(
+        name=name,
+        conditions=tuple(_condition(c, f"{path}.conditions[{i}]") for i, c in enumerate(conditions)),
+        optional=tuple(_condition(c, f"{path}.optional[{i}]") for i, c in enumerate(optional)),
+        min_vix=_num(guard, f"{path}.vol_guard", "min_vix", None) if "min_vix" in guard else None,
+        max_vix=_num(guard, f"{path}.vol_guard", "max_vix", None) if "max_vix" in guard else None,
+    )
+
+
+_PARAMS = {"TREND_BREAKOUT": _trend_breakout_params, "RS_ROTATION": _rs_rotation_params}
+
+
+def _strategy(name: str, s: Any, pools: Mapping[str, Pool]) -> Strategy:
+    path = f"strategies.{name}"
+    pool = _str(s, path, "pool_default")
+    if pool not in pools:
+        raise ConfigError(f"{path}.pool_default: unknown pool {pool!r} (scoring.pools has {sorted(pools)})")
+    regimes = _strs(s, path, "allowed_regimes")
+    if regimes - REGIMES:
+        raise ConfigError(f"{path}.allowed_regimes: unknown regime(s) {sorted(regimes - REGIMES)}")
+    params = _get(s, path, "params", {})
+    compile_params = _PARAMS.get(name)
+    return Strategy(
+        name=name,
+        enabled=_bool(s, path, "enabled", True),
+        pool_default=pool,
+        allowed_regimes=regimes,
+        params=compile_params(params, f"{path}.params") if compile_params else dict(params),
+    )
+
+
+def compile_config(cfg: dict) -> Settings:
+    """Validate cfg and build its Settings; raises ConfigError naming the first bad key."""
+    if not isinstance(cfg, Mapping):
+        raise ConfigError(f"config: expected a mapping, got {type(cfg).__name__}")
+    meta = _get(cfg, "config", "meta")
+
+    uf = _get(cfg, "config", "universe_filter")
+    universe_filter = UniverseFilter(
+        min_price=_num(uf, "universe_filter", "min_price"),
+        min_avg_dollar_volume_20d=_num(uf, "universe_filter", "min_avg_dollar_volume_20d"),
+        exclude_symbols=_strs(uf, "universe_filter", "exclude_symbols", []),
+    )
+
+    scoring = _get(cfg, "config", "scoring")
+    raw_pools = _get(scoring, "scoring", "pools")
+    if not isinstance(raw_pools, Mapping):
+        raise ConfigError("scoring.pools: expected a mapping")
+    pools = {name: _pool(p, f"scoring.pools.{name}") for name, p in raw_pools.items()}
+    if "CORE" not in pools:
+        raise ConfigError("scoring.pools.CORE: missing")
+
+    raw_weights = _get(scoring, "scoring", "weights_global")
+    unknown = set(raw_weights) - set(WEIGHT_KEYS) if isinstance(raw_weights, Mapping) else set()
+    if unknown:
+        raise ConfigError(f"scoring.weights_global: unknown component(s) {sorted(unknown)}")
+    weights = {k: _num(raw_weights, "scoring.weights_global", k) for k in WEIGHT_KEYS if k in raw_weights}
+
+    raw_strategies = _get(cfg, "config", "strategies")
+    if not isinstance(raw_strategies, Mapping):
+        raise ConfigError("strategies: expected a mapping")
+    for name in _PARAMS:
+        _get(raw_strategies, "strategies", name)
+    strategies = {name: _strategy(name, s, pools) for name, s in raw_strategies.items()}
+
+    regime = _get(cfg, "config", "regime")
+    raw_rules = _get(regime, "regime", "rules")
+    if not isinstance(raw_rules, Mapping):
+        raise ConfigError("regime.rules: expected a mapping")
+    unknown = set(raw_rules) - REGIMES
+    if unknown:
+        raise ConfigError(f"regime.rules: unknown regime(s) {sorted(unknown)}")
+    regime_rules = {name: _regime_rule(name, r) for name, r in raw_rules.items()}
+
+    return Settings(
+        universe=_str(meta, "meta", "universe"),
+        timezone=_str(meta, "meta", "timezone", "UTC"),
+        universe_filter=universe_filter,
+        pools=pools,
+        weights=weights,
+        strategies=strategies,
+        trend_breakout=strategies["TREND_BREAKOUT"],
+        rs_rotation=strategies["RS_ROTATION"],
+        regime_benchmark=_str(regime, "regime", "benchmark"),
+        regime_rules=regime_rules,
+    )
+
+
+def validate_score_maps(score_maps: dict) -> None:
+    maps = _get(score_maps, "score_maps", "maps")
+    if not isinstance(maps, Mapping):
+        raise ConfigError("score_maps.maps: expected a mapping")
+    for name, rules in maps.items():
+        if not isinstance(rules, list):
+            raise ConfigError(f"score_maps.maps.{name}: expected a list of rules")
+        for i, r in enumerate(rules):
+            path = f"score_maps.maps.{name}[{i}]"
+            if not isinstance(r, Mapping) or not (("score" in r and any(op in r for op in ("lt", "lte", "gt", "gte"))) or "penalty" in r):
+                raise ConfigError(f"{path}: expected {{lt|lte|gt|gte: x, score: y}} or a penalty rule, got {r!r}")
+
+
+_COMPILED: dict[int, tuple[dict, Settings]] = {}
+
+
+def remember(cfg: dict, settings: Settings) -> Settings:
+    if len(_COMPILED) >= 8:
+        _COMPILED.clear()
+    _COMPILED[id(cfg)] = (cfg, settings)
+    return settings
+
+
+def settings_for(cfg: dict) -> Settings:
+    """compile_config, memoized on the loaded config dict (compiled once per load)."""
+    hit = _COMPILED.get(id(cfg))
+    if hit is not None and hit[0] is cfg:
+        return hit[1]
+    return remember(cfg, compile_config(cfg))
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+import threading
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+BAR_FIELDS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("ns", tz="UTC")),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+    ]
+)
+
+
+def as_utc(ts: datetime | pd.Timestamp | str) -> pd.Timestamp:
+    t = pd.Timestamp(ts)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+
+def _dedupe(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop_duplicates(subset="timestamp", keep="last").sort_values("timestamp").reset_index(drop=True)
+
+
+def _read_parts(parts: list[Path], cols: list[str], filt=None) -> pd.DataFrame | None:
+    # parts in write order, so keep="last" is the latest write
+    tables = [pq.read_table(p, columns=cols, filters=filt, memory_map=True) for p in parts]
+    tables = [t for t in tables if t.num_rows]
+    if not tables:
+        return None
+    return _dedupe(pa.concat_tables(tables).to_pandas())
+
+
+class BarStore:
+    """
+    Partitioned Parquet bar store.
+
+    Layout:
+      {root}/interval={interval}/symbol={symbol}/year={YYYY}/part-{write_ns}-{id}.parquet
+
+    Writes are append-only: each append adds new part files and never rewrites old ones.
+    Reads prune year partitions, push the [start, end] predicate and column projection
+    down to Parquet, and memory-map the files. When parts overlap, the most recently
+    written bar for a timestamp wins.
+
+    With memory=True (a long-running process, see runtime.daemon) each symbol's bars are
+    also kept in memory after the first read; later reads only load part files written
+    since, and fall back to a full read when parts were removed (compaction).
+    """
+
+    def __init__(self, root: str | Path, memory: bool = False):
+        self.root = Path(root)
+        self.memory = memory
+        self._mem: dict[tuple[str, str], tuple[list[str], pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def _symbol_dir(self, symbol: str, interval: str) -> Path:
+        return self.root / f"interval={interval}" / f"symbol={symbol}"
+
+    def symbols(self, interval: str) -> list[str]:
+        d = self.root / f"interval={interval}"
+        if not d.exists():
+            return []
+        return sorted(p.name.split("=", 1)[1] for p in d.iterdir() if p.is_dir() and p.name.startswith("symbol="))
+
+    def has(self, symbol: str, interval: str) -> bool:
+        return bool(self._parts(symbol, interval))
+
+    def part_count(self, symbol: str, interval: str) -> int:
+        return len(self._parts(symbol, interval))
+
+    def last_timestamps(self, symbol: str, interval: str, n: int = 1) -> list[pd.Timestamp]:
+        """The n most recent stored bar timestamps (ascending), reading only the newest year partitions."""
+        if self.memory:
+            return [pd.Timestamp(t) for t in self._cached(symbol, interval)["timestamp"].iloc[-n:]]
+        d = self._symbol_dir(symbol, interval)
+        if not d.exists():
+            return []
+        years = sorted((int(p.name.split("=", 1)[1]) for p in d.glob("year=*")), reverse=True)
+        found: list = []
+        for year in years:
+            parts = sorted((d / f"year={year}").glob("part-*.parquet"), key=lambda p: p.name)
+            if not parts:
+                continue
+            ts = pa.concat_tables([pq.read_table(p, columns=["timestamp"], memory_map=True) for p in parts])
+            found = sorted(set(ts.column("timestamp").to_pylist()) | set(found))
+            if len(found) >= n:
+                break
+        return [pd.Timestamp(t) for t in found[-n:]]
+
+    def first_timestamp(self, symbol: str, interval: str) -> pd.Timestamp | None:
+        """The oldest stored bar timestamp, reading only the oldest year partition."""
+        if self.memory:
+            df = self._cached(symbol, interval)
+            return pd.Timestamp(df["timestamp"].iloc[0]) if len(df) else None
+        d = self._symbol_dir(symbol, interval)
+        if not d.exists():
+            return None
+        for year in sorted(int(p.name.split("=", 1)[1]) for p in d.glob("year=*")):
+            parts = list((d / f"year={year}").glob("part-*.parquet"))
+            if parts:
+                ts = pa.concat_tables([pq.read_table(p, columns=["timestamp"], memory_map=True) for p in parts])
+                return pd.Timestamp(min(ts.column("timestamp").to_pylist()))
+        return None
+
+    def head_checked(self, symbol: str, interval: str) -> pd.Timestamp | None:
+        """Earliest start a whole-window fetch asked the vendor for (see mark_head)."""
+        try:
+            return as_utc((self._symbol_dir(symbol, interval) / "head.txt").read_text(encoding="utf-8").strip())
+        except (OSError, ValueError):
+            return None
+
+    def mark_head(self, symbol: str, interval: str, start: datetime | pd.Timestamp) -> None:
+        """
+        Record that the vendor was asked for bars from start: whatever it returned is all it
+        has after start, so stored history beginning later than start is still complete.
+        """
+        start_ts = as_utc(start)
+        checked = self.head_checked(symbol, interval)
+        if checked is not None and checked <= start_ts:
+            return
+        d = self._symbol_dir(symbol, interval)
+        d.mkdir(parents=True, exist_ok=True)
+        tmp = d / f".head-{uuid.uuid4().hex[:8]}.tmp"
+        tmp.write_text(start_ts.isoformat(), encoding="utf-8")
+        tmp.replace(d / "head.txt")
+
+    def last_timestamp(self, symbol: str, interval: str) -> pd.Timestamp | None:
+        ts = self.last_timestamps(symbol, interval, n=1)
+        return ts[-1] if ts else None
+
+    def _parts(self, symbol: str, interval: str, start: pd.Timestamp | None = None, end: pd.Timestamp | None = None) -> list[Path]:
+        d = self._symbol_dir(symbol, interval)
+        if not d.exists():
+            return []
+        parts: list[Path] = []
+        for ydir in d.iterdir():
+            if not ydir.name.startswith("year="):
+                continue
+            year = int(ydir.name.split("=", 1)[1])
+            if start is not None and year < start.year:
+                continue
+            if end is not None and year > end.year:
+                continue
+            parts.extend(ydir.glob("part-*.parquet"))
+        # part names start with the write time, so name order == write order
+        return sorted(parts, key=lambda p: p.name)
+
+    def append(self, df: pd.DataFrame, interval: str, symbol: str | None = None) -> int:
+        """Append bars (timestamp/open/high/low/close/volume[/symbol]); returns rows written."""
+        if df is None or df.empty:
+            return 0
+
+        if symbol is None:
+            if "symbol" not in df.columns:
+                raise ValueError("append() needs a symbol column or symbol=")
+            groups = df.groupby("symbol", sort=False)
+        else:
+            groups = [(symbol, df)]
+
+        written = 0
+        for sym, g in groups:
+            g = g.assign(timestamp=pd.to_datetime(g["timestamp"], utc=True))
+            for year, part in g.groupby(g["timestamp"].dt.year, sort=True):
+                table = pa.Table.from_pandas(part[BAR_FIELDS].astype({c: "float64" for c in BAR_FIELDS[1:]}), schema=_SCHEMA, preserve_index=False)
+                out_dir = self._symbol_dir(str(sym), interval) / f"year={int(year)}"
+                out_dir.mkdir(parents=True, exist_ok=True)
+                name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+                tmp = out_dir / f".{name}.tmp"
+                pq.write_table(table, tmp)
+                tmp.replace(out_dir / name)
+                written += len(part)
+        return written
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        columns: list[str] | None = None,
+        start: datetime | pd.Timestamp | str | None = None,
+        end: datetime | pd.Timestamp | str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Read bars for one symbol, sorted by timestamp with duplicates resolved.
+
+        columns: subset of BAR_FIELDS (timestamp is always included).
+        start/end: inclusive UTC bounds.
+        """
+        start_ts = as_utc(start) if start is not None else None
+        end_ts = as_utc(end) if end is not None else None
+
+        cols = BAR_FIELDS if columns is None else ["timestamp"] + [c for c in columns if c in BAR_FIELDS and c != "timestamp"]
+
+        filt = None
+        if start_ts is not None:
+            filt = ds.field("timestamp") >= pa.scalar(start_ts, type=_SCHEMA.field("timestamp").type)
+        if end_ts is not None:
+            f_end = ds.field("timestamp") <= pa.scalar(end_ts, type=_SCHEMA.field("timestamp").type)
+            filt = f_end if filt is None else (filt & f_end)
+
+        if self.memory:
+            df = self._cached(symbol, interval)
+            if start_ts is not None:
+                df = df[df["timestamp"] >= start_ts]
+            if end_ts is not None:
+                df = df[df["timestamp"] <= end_ts]
+            if df.empty:
+                return pd.DataFrame(columns=cols + ["symbol"])
+            df = df[cols].reset_index(drop=True)
+        else:
+            df = _read_parts(self._parts(symbol, interval, start_ts, end_ts), cols, filt)
+            if df is None:
+                return pd.DataFrame(columns=cols + ["symbol"])
+        df["symbol"] = symbol
+        return df
+
+    def _cached(self, symbol: str, interval: str) -> pd.DataFrame:
+        """All stored bars of one symbol from memory, reading only parts not seen yet."""
+        parts = self._parts(symbol, interval)
+        names = [str(p) for p in parts]
+        with self._lock:
+            seen, df = self._mem.get((symbol, interval), ([], None))
+        if df is not None and names == seen:
+            return df
+        if df is not None and names[: len(seen)] == seen:
+            new = _read_parts(parts[len(seen):], BAR_FIELDS)
+            df = _dedupe(pd.concat([df, new], ignore_index=True)) if new is not None else df
+        else:
+            df = _read_parts(parts, BAR_FIELDS)
+            if df is None:
+                df = pd.DataFrame({c: pd.Series(dtype=t) for c, t in zip(BAR_FIELDS, ["datetime64[ns, UTC]"] + ["float64"] * 5)})
+        with self._lock:
+            self._mem[(symbol, interval)] = (names, df)
+        return df
+
+    def compact(self, symbol: str, interval: str) -> int:
+        """Merge each year's parts into one file (deduplicated); returns the number of parts removed."""
+        removed = 0
+        d = self._symbol_dir(symbol, interval)
+        if not d.exists():
+            return 0
+        for ydir in sorted(d.glob("year=*")):
+            parts = sorted(ydir.glob("part-*.parquet"), key=lambda p: p.name)
+            if len(parts) < 2:
+                continue
+            df = pa.concat_tables([pq.read_table(p, memory_map=True) for p in parts]).to_pandas()
+            df = df.drop_duplicates(subset="timestamp", keep="last").sort_values("timestamp")
+            self.append(df, interval, symbol=symbol)
+            for p in parts:
+                p.unlink()
+            removed += len(parts)
+        return removed
@@ -2,15 +2,41 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+import threading
 import time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+
+if TYPE_CHECKING:
+    from ..common.instrumentation import RunMetrics
+    from .bar_store import BarStore
+    from .http_cache import ResponseCache
+    from .rate_limit import TokenBucket
 
 
 FINNHUB_BASE = "https://finnhub.io/api/v1"
 
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session(pool_size: int = 16) -> requests.Session:
+    """Keep-alive session shared by every Finnhub call (and every fetch thread)."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _SESSION = s
+    return _SESSION
+
 
 @dataclass(frozen=True)
 class FinnhubError(Exception):
@@ -45,30 +71,62 @@ def interval_to_resolution(interval: str) -> str:
     raise ValueError(f"Unsupported interval: {interval}")
 
 
+def _retry_after_s(r: requests.Response) -> float | None:
+    try:
+        return float(r.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
 def _request_json(
     url: str,
     params: dict[str, Any],
     api_key: str,
     timeout_s: int = 25,
     max_retries: int = 4,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+    metrics: RunMetrics | None = None,
 ) -> dict[str, Any]:
     """
     Finnhub request with clear debugging:
     - Uses token query param (robust in CI).
     - Prints status/text via raised FinnhubError payload.
+    - With a shared limiter, every attempt takes a token and a 429 throttles all workers
+      instead of sleeping only this one.
+    - With a cache, a fresh cached response is returned without touching the network
+      (or the rate-limit budget).
+    - With metrics, every attempt is counted (status, bytes, retries) and back-off sleeps
+      are recorded.
     """
     api_key = (api_key or "").strip()
     if not api_key:
         raise FinnhubError("missing FINNHUB_API_KEY")
 
+    endpoint = url[len(FINNHUB_BASE):].strip("/") if url.startswith(FINNHUB_BASE) else url
+    if cache is not None:
+        cached = cache.get(endpoint, params)
+        if cached is not None:
+            return cached
+
     p = dict(params)
     p["token"] = api_key
 
     last_err: Exception | None = None
 
+    def _backoff(i: int) -> None:
+        delay = min(10, 2 ** i)
+        if metrics is not None:
+            metrics.slept("backoff", delay)
+        time.sleep(delay)
+
     for i in range(max_retries):
+        if limiter is not None:
+            limiter.acquire()
         try:
-            r = requests.get(url, params=p, timeout=timeout_s)
+            r = get_session().get(url, params=p, timeout=timeout_s)
+            if metrics is not None:
+                metrics.call("finnhub", status=r.status_code, nbytes=len(r.content), retry=i > 0)
 
             # retryable transient
             if r.status_code in (429, 500, 502, 503, 504):
@@ -77,7 +135,10 @@ def _request_json(
                     status_code=r.status_code,
                     payload={"text": r.text[:300]},
                 )
-                time.sleep(min(10, 2 ** i))
+                if r.status_code == 429 and limiter is not None:
+                    limiter.penalize(_retry_after_s(r))
+                else:
+                    _backoff(i)
                 continue
 
             # auth errors -> fail fast
@@ -96,17 +157,24 @@ def _request_json(
                     payload={"text": r.text[:300]},
                 )
 
-            return r.json()
+            if limiter is not None:
+                limiter.reward()
+            j = r.json()
+            if cache is not None:
+                cache.put(endpoint, params, j)
+            return j
 
         except FinnhubError as e:
             last_err = e
             if e.status_code in (401, 403):
                 raise
-            time.sleep(min(10, 2 ** i))
+            _backoff(i)
 
         except requests.exceptions.RequestException as e:
             last_err = e
-            time.sleep(min(10, 2 ** i))
+            if metrics is not None:
+                metrics.call("finnhub", retry=i > 0, error=True)
+            _backoff(i)
 
     raise FinnhubError("request failed after retries", payload={"error": str(last_err)})
 
@@ -117,23 +185,32 @@ def fetch_stock_candles(
     lookback_days: int,
     api_key: str,
     now_utc: datetime | None = None,
+    store: BarStore | None = None,
+    start_utc: datetime | None = None,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+    metrics: RunMetrics | None = None,
 ) -> pd.DataFrame:
     """
     Finnhub /stock/candle -> DataFrame:
     timestamp (UTC), open, high, low, close, volume, symbol
+
+    start_utc overrides the lookback window start (used for delta refreshes).
+    If store is given, the fetched bars are also appended to it.
     """
     if now_utc is None:
         now_utc = datetime.now(timezone.utc)
 
-    start = now_utc - timedelta(days=int(lookback_days * 1.2) + 5)
+    start = start_utc if start_utc is not None else now_utc - timedelta(days=int(lookback_days * 1.2) + 5)
+    # minute-aligned window so repeated requests within a run share a cache key
     params = {
         "symbol": symbol,
         "resolution": interval_to_resolution(interval),
-        "from": _to_unix_seconds(start),
-        "to": _to_unix_seconds(now_utc),
+        "from": _to_unix_seconds(start) // 60 * 60,
+        "to": _to_unix_seconds(now_utc) // 60 * 60,
     }
     url = f"{FINNHUB_BASE}/stock/candle"
-    j = _request_json(url, params=params, api_key=api_key)
+    j = _request_json(url, params=params, api_key=api_key, limiter=limiter, cache=cache, metrics=metrics)
 
     if j.get("s") != "ok":
         return pd.DataFrame()
@@ -157,10 +234,18 @@ def fetch_stock_candles(
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
     df = df.dropna(subset=["open", "high", "low", "close"]).reset_index(drop=True)
+    if store is not None:
+        store.append(df, interval, symbol=symbol)
     return df
 
 
-def fetch_quote(symbol: str, api_key: str) -> dict[str, Any]:
+def fetch_quote(
+    symbol: str,
+    api_key: str,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+    metrics: RunMetrics | None = None,
+) -> dict[str, Any]:
     url = f"{FINNHUB_BASE}/quote"
     params = {"symbol": symbol}
-    return _request_json(url, params=params, api_key=api_key)
\ No newline at end of file
+    return _request_json(url, params=params, api_key=api_key, limiter=limiter, cache=cache, metrics=metrics)
\ No newline at end of file
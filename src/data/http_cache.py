@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+
+def cache_key(endpoint: str, params: dict[str, Any]) -> str:
+    """Stable key for endpoint+params (the API token is never part of the key)."""
+    clean = {k: v for k, v in params.items() if k != "token"}
+    raw = endpoint + "?" + json.dumps(clean, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    TTL cache for JSON responses, in memory (LRU) and optionally on disk.
+
+    ttl_s maps an endpoint (e.g. "quote", "stock/candle") to its time-to-live in seconds;
+    endpoints not listed use default_ttl_s, and a TTL of 0 disables caching for that endpoint.
+    Both tiers are size-bounded: max_entries for memory, max_disk_entries for disk (oldest
+    files are evicted first).
+    """
+
+    def __init__(
+        self,
+        ttl_s: dict[str, float] | None = None,
+        default_ttl_s: float = 0.0,
+        max_entries: int = 1024,
+        disk_dir: str | Path | None = None,
+        max_disk_entries: int = 10_000,
+    ):
+        self.ttl_s = dict(ttl_s or {})
+        self.default_ttl_s = float(default_ttl_s)
+        self.max_entries = int(max_entries)
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.max_disk_entries = int(max_disk_entries)
+        self._mem: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict, project_root: str | Path) -> ResponseCache | None:
+        c = cfg.get("data", {}).get("http_cache", {}) or {}
+        if not c.get("enabled", False):
+            return None
+        disk = c.get("dir")
+        return cls(
+            ttl_s={str(k): float(v) for k, v in (c.get("ttl_s") or {}).items()},
+            default_ttl_s=float(c.get("default_ttl_s", 0)),
+            max_entries=int(c.get("max_entries", 1024)),
+            disk_dir=(Path(project_root) / disk) if disk else None,
+            max_disk_entries=int(c.get("max_disk_entries", 10_000)),
+        )
+
+    def ttl_for(self, endpoint: str) -> float:
+        return float(self.ttl_s.get(endpoint, self.default_ttl_s))
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def get(self, endpoint: str, params: dict[str, Any]) -> Any | None:
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return None
+        key = cache_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                if now - item[0] <= ttl:
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return item[1]
+                del self._mem[key]
+
+        if self.disk_dir is not None:
+            p = self._disk_path(key)
+            try:
+                rec = json.loads(p.read_text(encoding="utf-8"))
+                if now - float(rec["ts"]) <= ttl:
+                    with self._lock:
+                        self.disk_hits += 1
+                        self._remember(key, float(rec["ts"]), rec["data"])
+                    return rec["data"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, endpoint: str, params: dict[str, Any], data: Any) -> None:
+        if self.ttl_for(endpoint) <= 0:
+            return
+        key = cache_key(endpoint, params)
+        ts = time.time()
+        with self._lock:
+            self._remember(key, ts, data)
+
+        if self.disk_dir is not None:
+            p = self._disk_path(key)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            tmp = p.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps({"ts": ts, "endpoint": endpoint, "data": data}), encoding="utf-8")
+            tmp.replace(p)
+            with self._lock:
+                self._disk_writes += 1
+                check = self._disk_writes % 100 == 1
+            if check:
+                self._evict_disk()
+
+    def _remember(self, key: str, ts: float, data: Any) -> None:
+        self._mem[key] = (ts, data)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self) -> None:
+        files = list(self.disk_dir.glob("*/*.json"))
+        extra = len(files) - self.max_disk_entries
+        if extra <= 0:
+            return
+        files.sort(key=lambda f: f.stat().st_mtime)
+        for f in files[:extra]:
+            try:
+                f.unlink()
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._mem),
+                "hit_rate_pct": round(100.0 * (self.hits + self.disk_hits) / lookups, 1) if lookups else 0.0,
+            }
@@ -4,12 +4,24 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from .bar_store import BarStore, as_utc
 
-def load_local_parquet(symbol: str, interval: str, project_root: str | Path) -> pd.DataFrame:
+
+def load_local_parquet(
+    symbol: str,
+    interval: str,
+    project_root: str | Path,
+    columns: list[str] | None = None,
+    start=None,
+    end=None,
+) -> pd.DataFrame:
     """
-    Load local parquet file for real (non-demo) runs.
+    Load local bars for real (non-demo) runs.
+
+    Reads the partitioned bar store under {project_root}/data/bars (see data.bar_store)
+    with column projection and an inclusive [start, end] UTC range pushed down to Parquet.
 
-    Convention:
+    Legacy convention (still supported when the store has no bars for the symbol):
       {project_root}/data/raw/{symbol}_{interval}.parquet
 
     Expected columns (at least):
@@ -18,21 +30,35 @@ def load_local_parquet(symbol: str, interval: str, project_root: str | Path) ->
     If your parquet uses different column names, map them in this function.
     """
     root = Path(project_root)
+    store = BarStore(root / "data" / "bars")
+    if store.has(symbol, interval):
+        return store.read(symbol, interval, columns=columns, start=start, end=end)
+
     path = root / "data" / "raw" / f"{symbol}_{interval}.parquet"
     if not path.exists():
         raise FileNotFoundError(
             f"Local parquet not found: {path}\n"
-            "Provide the file under data/raw/ OR run demo mode."
+            "Provide the file under data/raw/ (or data/bars/) OR run demo mode."
         )
 
-    df = pd.read_parquet(path)
+    expected = ["timestamp", "open", "high", "low", "close", "volume"]
+    wanted = expected if columns is None else ["timestamp"] + [c for c in columns if c != "timestamp"]
+    df = pd.read_parquet(path, columns=wanted, memory_map=True)
 
     # Optional: enforce common schema/order
-    expected = ["timestamp", "open", "high", "low", "close", "volume"]
-    missing = [c for c in expected if c not in df.columns]
+    missing = [c for c in expected if c not in df.columns and c in wanted]
     if missing:
         raise ValueError(f"Parquet missing columns: {missing}. Columns found: {list(df.columns)}")
 
+    if start is not None or end is not None:
+        ts = pd.to_datetime(df["timestamp"], utc=True)
+        keep = pd.Series(True, index=df.index)
+        if start is not None:
+            keep &= ts >= as_utc(start)
+        if end is not None:
+            keep &= ts <= as_utc(end)
+        df = df[keep].reset_index(drop=True)
+
     return df
 
 
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+import time
+
+_UNITS = {"s": 1.0, "sec": 1.0, "second": 1.0, "m": 60.0, "min": 60.0, "minute": 60.0, "h": 3600.0, "hour": 3600.0}
+
+
+def parse_rate(spec: str | float | int) -> float:
+    """'60/min', '5/s', '1000/hour' or a bare number (calls per second) -> calls per second."""
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    s = str(spec).strip().lower()
+    if "/" not in s:
+        return float(s)
+    n, unit = s.split("/", 1)
+    unit = unit.strip()
+    if unit not in _UNITS:
+        raise ValueError(f"Unsupported rate unit: {spec}")
+    return float(n) / _UNITS[unit]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every fetch worker.
+
+    acquire() blocks until a token is available. penalize() is called on HTTP 429: it pauses
+    all workers (Retry-After or an exponential cool-down) and halves the effective rate;
+    reward() on success slowly restores it (AIMD).
+    """
+
+    def __init__(self, rate_per_s: float, burst: float | None = None, min_rate_fraction: float = 0.125):
+        if rate_per_s <= 0:
+            raise ValueError("rate_per_s must be > 0")
+        self.max_rate = float(rate_per_s)
+        self.rate = float(rate_per_s)
+        self.burst = float(burst) if burst is not None else max(1.0, float(rate_per_s))
+        self.min_rate = self.max_rate * min_rate_fraction
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+        self.waited_s = 0.0
+        self.throttled = 0
+
+    @classmethod
+    def from_spec(cls, spec: str | float | int, burst: float | None = None) -> TokenBucket:
+        return cls(parse_rate(spec), burst=burst)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping as needed; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.waited_s += waited
+                    return waited
+                else:
+                    delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, retry_after_s: float | None = None) -> None:
+        with self._lock:
+            self.throttled += 1
+            self._strikes += 1
+            cool = retry_after_s if retry_after_s is not None else min(30.0, 2.0 ** self._strikes)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + cool)
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self._tokens = 0.0
+
+    def reward(self) -> None:
+        with self._lock:
+            self._strikes = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20.0)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import pandas as pd
+
+from .bar_store import BarStore
+
+CandleFetcher = Callable[..., pd.DataFrame]
+
+
+def window_start_for(now_utc: datetime, lookback_days: int, align: str | None = None) -> datetime:
+    """
+    Start of the bar window read back after a refresh. align="week"/"month" floors it to the
+    start of the week/month, so the window only moves at those boundaries and cached features
+    for it can be extended in between (see features.cache).
+    """
+    start = now_utc - timedelta(days=int(lookback_days * 1.2) + 5)
+    if align == "week":
+        start = (start - timedelta(days=start.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    elif align == "month":
+        start = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif align:
+        raise ValueError(f"Unknown window alignment: {align!r}")
+    return start
+
+
+def covers_window(store: BarStore, symbol: str, interval: str, window_start: datetime, tail: list[pd.Timestamp]) -> bool:
+    """
+    Whether the stored bars span the window: the newest bar is inside it and the oldest is at
+    or before its start, or the vendor was already asked from window_start (or earlier) and
+    simply has nothing older (a recent listing, capped intraday history).
+    """
+    if not tail or tail[-1] < window_start:
+        return False
+    first = store.first_timestamp(symbol, interval)
+    if first is not None and first <= window_start:
+        return True
+    checked = store.head_checked(symbol, interval)
+    return checked is not None and checked <= window_start
+
+
+def refresh_candles(
+    fetch: CandleFetcher,
+    symbol: str,
+    interval: str,
+    lookback_days: int,
+    store: BarStore,
+    overlap_bars: int = 2,
+    max_parts: int = 64,
+    full: bool = False,
+    now_utc: datetime | None = None,
+    window_align: str | None = None,
+    **fetch_kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Delta-refresh one symbol's bars into the store and return the lookback window.
+
+    fetch is fetch_stock_candles / fetch_stock_candles_yahoo (or anything with the same
+    keyword interface). When the store already covers the window (covers_window: newest
+    and oldest bar), only the tail from the overlap_bars-th most recent stored bar onwards is
+    requested, so revised recent bars are re-fetched and overwrite the stored ones. Otherwise
+    (or with full=True) the whole window is fetched from its start, which also backfills a
+    head missing after lookback_days grew. window_align is passed to window_start_for.
+    """
+    if now_utc is None:
+        now_utc = datetime.now(timezone.utc)
+    window_start = window_start_for(now_utc, lookback_days, window_align)
+
+    tail = [] if full else store.last_timestamps(symbol, interval, n=max(1, overlap_bars))
+    if covers_window(store, symbol, interval, window_start, tail):
+        fetch(symbol, interval=interval, lookback_days=lookback_days, now_utc=now_utc, store=store, start_utc=tail[0], **fetch_kwargs)
+    else:
+        fetch(symbol, interval=interval, lookback_days=lookback_days, now_utc=now_utc, store=store, start_utc=window_start, **fetch_kwargs)
+        store.mark_head(symbol, interval, window_start)
+
+    if store.part_count(symbol, interval) > max_parts:
+        store.compact(symbol, interval)
+
+    return store.read(symbol, interval, start=window_start)
+
+
+def refresh_candles_batch(
+    fetch_batch: Callable[..., tuple[dict[str, pd.DataFrame], list[str]]],
+    symbols: list[str],
+    interval: str,
+    lookback_days: int,
+    store: BarStore,
+    overlap_bars: int = 2,
+    max_parts: int = 64,
+    full: bool = False,
+    now_utc: datetime | None = None,
+    window_align: str | None = None,
+    **fetch_kwargs: Any,
+) -> tuple[dict[str, pd.DataFrame], list[str]]:
+    """
+    refresh_candles for a group of symbols fetched with one batch call (fetch_stock_candles_yahoo_batch).
+
+    The group shares one request window: the earliest delta start among its symbols, or the
+    full lookback window if any symbol's stored bars do not cover it (covers_window).
+    Returns ({symbol: lookback window}, [symbols with no bars at all]).
+    """
+    if now_utc is None:
+        now_utc = datetime.now(timezone.utc)
+    window_start = window_start_for(now_utc, lookback_days, window_align)
+
+    start = None
+    if not full:
+        starts = []
+        for sym in symbols:
+            tail = store.last_timestamps(sym, interval, n=max(1, overlap_bars))
+            if not covers_window(store, sym, interval, window_start, tail):
+                starts = []
+                break
+            starts.append(tail[0])
+        start = min(starts) if starts else None
+
+    fetch_batch(symbols, interval=interval, lookback_days=lookback_days, now_utc=now_utc, store=store, start_utc=start or window_start, **fetch_kwargs)
+    if start is None:
+        for sym in symbols:
+            store.mark_head(sym, interval, window_start)
+
+    frames: dict[str, pd.DataFrame] = {}
+    empty: list[str] = []
+    for sym in symbols:
+        if store.part_count(sym, interval) > max_parts:
+            store.compact(sym, interval)
+        df = store.read(sym, interval, start=window_start)
+        if df.empty:
+            empty.append(sym)
+        else:
+            frames[sym] = df
+    return frames, empty
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .bar_store import BAR_FIELDS, BarStore
+
+_INTERVALS = {
+    "1m": 1, "1": 1,
+    "5m": 5, "5": 5,
+    "15m": 15, "15": 15,
+    "30m": 30, "30": 30,
+    "60m": 60, "60": 60, "1h": 60, "hour": 60, "hourly": 60,
+    "1d": None, "d": None, "day": None, "daily": None,
+}
+
+
+@dataclass(frozen=True)
+class Session:
+    """Regular trading session in exchange-local wall-clock time."""
+    timezone: str = "America/New_York"
+    open: str = "09:30"
+    close: str = "16:00"
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Session:
+        s = (cfg.get("data", {}).get("resample", {}) or {}).get("session", {}) or {}
+        return cls(**{k: str(v) for k, v in s.items() if k in ("timezone", "open", "close")})
+
+    @property
+    def open_minute(self) -> int:
+        return _minute_of_day(self.open)
+
+    @property
+    def close_minute(self) -> int:
+        return _minute_of_day(self.close)
+
+
+US_EQUITY = Session()
+
+
+def _minute_of_day(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def interval_minutes(interval: str) -> int | None:
+    """Bar length in minutes; None for daily."""
+    key = interval.strip().lower()
+    if key not in _INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return _INTERVALS[key]
+
+
+def can_derive(target: str, source: str) -> bool:
+    """target bars can be built from source bars (finer, and an exact divisor for intraday)."""
+    t, s = interval_minutes(target), interval_minutes(source)
+    if s is None:
+        return False
+    return t is None or (t > s and t % s == 0)
+
+
+def resample_bars(df: pd.DataFrame, interval: str, session: Session = US_EQUITY) -> pd.DataFrame:
+    """
+    Aggregate finer bars into interval bars within the regular session.
+
+    Buckets are anchored at the session open in local time (9:30, 10:30, ... for 60m; the
+    last bucket of the day may be shorter), so DST changes and UTC offsets do not shift
+    them, and no bucket spans two sessions. Bars outside the session are dropped.
+    Intraday bars are stamped with their bucket start (UTC); daily bars with the session
+    date at 00:00 UTC, like the vendors' daily bars. Input bars are stamped with their start.
+    """
+    step = interval_minutes(interval)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=BAR_FIELDS + (["symbol"] if df is not None and "symbol" in df.columns else []))
+    cols = BAR_FIELDS + (["symbol"] if "symbol" in df.columns else [])
+
+    df = df.assign(timestamp=pd.to_datetime(df["timestamp"], utc=True))
+    df = df.sort_values("timestamp", kind="stable").drop_duplicates("timestamp", keep="last")
+    local = pd.DatetimeIndex(df["timestamp"]).tz_convert(session.timezone)
+    minute = local.hour.to_numpy() * 60 + local.minute.to_numpy()
+    keep = (minute >= session.open_minute) & (minute < session.close_minute)
+    if not keep.any():
+        return pd.DataFrame(columns=cols)
+
+    local, minute = local[keep], minute[keep]
+    day = local.tz_localize(None).normalize()
+    day_ns = day.asi8
+    bucket = (minute - session.open_minute) // step if step else np.zeros(len(minute), dtype=np.int64)
+    key = day_ns // 60_000_000_000 * 10_000 + bucket
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], len(key)] - 1
+
+    o, h, lo, c, v = (df[f].to_numpy(dtype=np.float64)[keep] for f in BAR_FIELDS[1:])
+    if step:
+        wall = day[starts] + pd.to_timedelta(session.open_minute + bucket[starts] * step, unit="min")
+        ts = wall.tz_localize(session.timezone).tz_convert("UTC")
+    else:
+        ts = day[starts].tz_localize("UTC")
+
+    out = pd.DataFrame(
+        {
+            "timestamp": ts,
+            "open": o[starts],
+            "high": np.fmax.reduceat(h, starts),
+            "low": np.fmin.reduceat(lo, starts),
+            "close": c[ends],
+            "volume": np.add.reduceat(np.nan_to_num(v), starts),
+        }
+    )
+    if "symbol" in df.columns:
+        out["symbol"] = df["symbol"].iloc[0]
+    return out
+
+
+def _resume_from(last: pd.Timestamp, interval: str, session: Session) -> pd.Timestamp:
+    # start of the last stored bucket in UTC; daily bars are stamped 00:00 UTC, their session is local
+    if interval_minutes(interval) is None:
+        return pd.Timestamp(last.date()).tz_localize(session.timezone).tz_convert("UTC")
+    return last
+
+
+def update_resampled(
+    store: BarStore,
+    symbol: str,
+    source: str,
+    targets: list[str],
+    session: Session = US_EQUITY,
+    max_parts: int = 64,
+) -> dict[str, int]:
+    """
+    Bring coarser intervals up to date from stored finer bars, each from the next finer one
+    (targets sorted, e.g. 5m -> 30m -> 60m -> 1d).
+
+    Only bars from the last stored bucket of each target onwards are re-aggregated: that
+    bucket may have been built from a partial set of finer bars, and the store keeps the
+    latest write for a timestamp. Returns {interval: bars written}.
+    """
+    chain = sorted(set(targets), key=lambda i: interval_minutes(i) or 10**9)
+    written: dict[str, int] = {}
+    src = source
+    for target in chain:
+        if not can_derive(target, src):
+            raise ValueError(f"Cannot derive {target} bars from {src}")
+        last = store.last_timestamp(symbol, target)
+        fine = store.read(symbol, src, start=_resume_from(last, target, session) if last is not None else None)
+        written[target] = store.append(resample_bars(fine, target, session), target, symbol=symbol)
+        if store.part_count(symbol, target) > max_parts:
+            store.compact(symbol, target)
+        src = target
+    return written
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import time
+
+import pandas as pd
+
+
+@dataclass
+class FetchResult:
+    symbol: str
+    df: pd.DataFrame | None
+    error: Exception | None
+    elapsed_s: float
+
+
+def _timed(fetch_one: Callable[[str], pd.DataFrame], symbol: str) -> FetchResult:
+    t0 = time.perf_counter()
+    try:
+        return FetchResult(symbol, fetch_one(symbol), None, time.perf_counter() - t0)
+    except Exception as e:
+        return FetchResult(symbol, None, e, time.perf_counter() - t0)
+
+
+def fetch_concurrently(
+    symbols: Iterable[str],
+    fetch_one: Callable[[str], pd.DataFrame],
+    max_workers: int = 8,
+    max_pending: int | None = None,
+) -> Iterator[FetchResult]:
+    """
+    Run fetch_one(symbol) on a thread pool and yield results as they complete.
+
+    Pacing is up to fetch_one (pass the vendor clients a shared TokenBucket). At most
+    max_pending fetches are in flight, so a slow consumer applies backpressure and the
+    caller can do CPU work on finished symbols while the rest are still downloading.
+    """
+    max_workers = max(1, int(max_workers))
+    max_pending = max_pending or 2 * max_workers
+    it = iter(symbols)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch") as pool:
+        pending: set[Future] = set()
+        for sym in it:
+            pending.add(pool.submit(_timed, fetch_one, sym))
+            if len(pending) >= max_pending:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                nxt = next(it, None)
+                if nxt is not None:
+                    pending.add(pool.submit(_timed, fetch_one, nxt))
+                yield fut.result()
+
+
+def fetch_batched(
+    symbols: Iterable[str],
+    fetch_chunk: Callable[[list[str]], dict[str, pd.DataFrame]],
+    chunk_size: int = 50,
+) -> Iterator[FetchResult]:
+    """
+    Fetch symbols in chunks with one call per chunk and yield one FetchResult per symbol.
+
+    The next chunk downloads on a background thread while the caller consumes the current
+    one. Symbols missing from a chunk's result come back with an empty frame; a failed
+    chunk reports its error on every symbol in it.
+    """
+    syms = list(symbols)
+    chunk_size = max(1, int(chunk_size))
+    chunks = [syms[i : i + chunk_size] for i in range(0, len(syms), chunk_size)]
+
+    def _run(chunk: list[str]) -> tuple[dict[str, pd.DataFrame] | None, Exception | None, float]:
+        t0 = time.perf_counter()
+        try:
+            return fetch_chunk(chunk), None, time.perf_counter() - t0
+        except Exception as e:
+            return None, e, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch-batch") as pool:
+        nxt = pool.submit(_run, chunks[0]) if chunks else None
+        for i, chunk in enumerate(chunks):
+            frames, err, elapsed = nxt.result()
+            nxt = pool.submit(_run, chunks[i + 1]) if i + 1 < len(chunks) else None
+            per_symbol = elapsed / len(chunk)
+            for sym in chunk:
+                if err is not None:
+                    yield FetchResult(sym, None, err, per_symbol)
+                else:
+                    yield FetchResult(sym, frames.get(sym, pd.DataFrame()), None, per_symbol)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from ..features.panel import BAR_COLUMNS, BarPanel
+
+BARS_PER_YEAR = 252
+_BLOCK = 512  # symbols generated per block (bounds peak memory; part of the seed layout)
+
+
+def symbol_seed(symbol: str, base: int = 0) -> int:
+    """Stable per-symbol seed (unlike hash(), identical across processes and runs)."""
+    return (zlib.crc32(symbol.encode("utf-8")) + int(base)) % (2**32)
+
+
+def synthetic_symbols(n: int, prefix: str = "SYN") -> list[str]:
+    width = max(4, len(str(max(n - 1, 0))))
+    return [f"{prefix}{j:0{width}d}" for j in range(n)]
+
+
+def generate_synthetic_panel(
+    n_symbols: int = 100,
+    n_bars: int = 520,
+    seed: int = 0,
+    market_corr: float = 0.25,
+    sector_corr: float = 0.15,
+    n_sectors: int = 11,
+    symbols: list[str] | None = None,
+    end: pd.Timestamp | None = None,
+) -> BarPanel:
+    """
+    Synthetic daily OHLCV for a whole universe at once, as a BarPanel (time x symbol).
+
+    Returns follow a one-market + one-sector factor model, so two symbols correlate at about
+    market_corr (+ sector_corr within a sector). Every symbol gets its own drift, volatility,
+    price level and volume level, and volume rises on large moves. Same arguments -> same
+    panel. Symbols are generated in blocks from spawned seeds, so 10,000 symbols x 20 years
+    stays within a few times the size of the output arrays.
+    """
+    if market_corr < 0 or sector_corr < 0 or market_corr + sector_corr >= 1:
+        raise ValueError("need market_corr, sector_corr >= 0 and market_corr + sector_corr < 1")
+    symbols = list(symbols) if symbols is not None else synthetic_symbols(n_symbols)
+    n_sym, n = len(symbols), int(n_bars)
+    end = pd.Timestamp.now(tz="UTC").normalize() if end is None else pd.Timestamp(end)
+    ts = pd.date_range(end=end, periods=n, freq="B", tz="UTC" if end.tzinfo is None else None)
+
+    root = np.random.SeedSequence(seed)
+    factor_seq, *block_seqs = root.spawn(1 + -(-n_sym // _BLOCK))
+    frng = np.random.default_rng(factor_seq)
+    market = frng.standard_normal(n)
+    sectors = frng.standard_normal((n, max(1, n_sectors)))
+    a, b = np.sqrt(market_corr), np.sqrt(sector_corr)
+    c = np.sqrt(1.0 - market_corr - sector_corr)
+
+    arrays = {col: np.empty((n, n_sym)) for col in BAR_COLUMNS}
+    for k, seq in enumerate(block_seqs):
+        j0, j1 = k * _BLOCK, min(n_sym, (k + 1) * _BLOCK)
+        m = j1 - j0
+        rng = np.random.default_rng(seq)
+        sector = rng.integers(0, sectors.shape[1], m)
+        vol = rng.lognormal(np.log(0.018), 0.35, m)
+        drift = rng.normal(0.0003, 0.0004, m)
+        price0 = rng.lognormal(np.log(60.0), 0.9, m)
+        volume0 = rng.lognormal(np.log(2_000_000.0), 1.0, m)
+
+        z = a * market[:, None] + b * sectors[:, sector] + c * rng.standard_normal((n, m))
+        close = price0 * np.exp(np.cumsum(drift + vol * z, axis=0))
+        open_ = close * (1.0 + rng.normal(0.0, 0.002, (n, m)))
+        spread = np.abs(rng.normal(0.0, 0.3, (n, m))) * vol
+        arrays["close"][:, j0:j1] = close
+        arrays["open"][:, j0:j1] = open_
+        arrays["high"][:, j0:j1] = np.maximum(open_, close) * (1.0 + spread)
+        arrays["low"][:, j0:j1] = np.minimum(open_, close) * (1.0 - spread)
+        arrays["volume"][:, j0:j1] = np.round(volume0 * rng.lognormal(0.0, 0.3, (n, m)) * (1.0 + 1.5 * np.abs(z)))
+
+    return BarPanel(ts, symbols, arrays)
@@ -1,44 +1,106 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+import threading
+from typing import TYPE_CHECKING
 import pandas as pd
 import yfinance as yf
 
+if TYPE_CHECKING:
+    from ..common.instrumentation import RunMetrics
+    from .bar_store import BarStore
+    from .rate_limit import TokenBucket
+
+_DOWNLOAD_LOCK = threading.Lock()
+
+# yfinance interval names and how far back Yahoo serves each (intraday history is capped)
+_YF_INTERVALS = {"1d": "1d", "d": "1d", "day": "1d", "daily": "1d", "60m": "60m", "1h": "60m", "30m": "30m", "15m": "15m", "5m": "5m", "1m": "1m"}
+_MAX_LOOKBACK_DAYS = {"60m": 729, "30m": 59, "15m": 59, "5m": 59, "1m": 7}
+
+
+def _yf_interval(interval: str) -> str:
+    key = interval.strip().lower()
+    if key not in _YF_INTERVALS:
+        raise ValueError(f"Unsupported Yahoo interval: {interval}")
+    return _YF_INTERVALS[key]
+
+
+def _window(interval: str, lookback_days: int, now_utc: datetime | None, start_utc: datetime | None) -> tuple[str, str]:
+    # [start, end) as dates; intraday starts are clipped to what Yahoo still serves
+    if now_utc is None:
+        now_utc = datetime.now(timezone.utc)
+    if start_utc is None:
+        start_utc = now_utc - timedelta(days=int(lookback_days * 1.2) + 5)
+    cap = _MAX_LOOKBACK_DAYS.get(_yf_interval(interval))
+    if cap is not None:
+        start_utc = max(start_utc, now_utc - timedelta(days=cap))
+    return start_utc.date().isoformat(), (now_utc + timedelta(days=1)).date().isoformat()
+
 
 def fetch_stock_candles_yahoo(
     symbol: str,
     interval: str,
     lookback_days: int,
     now_utc: datetime | None = None,
+    store: BarStore | None = None,
+    start_utc: datetime | None = None,
+    limiter: TokenBucket | None = None,
+    metrics: RunMetrics | None = None,
 ) -> pd.DataFrame:
     """
     Fetch OHLCV candles from Yahoo Finance via yfinance.
 
     Returns DataFrame with columns:
       timestamp (UTC), open, high, low, close, volume, symbol
+
+    start_utc overrides the lookback window start (used for delta refreshes).
+    If store is given, the fetched bars are also appended to it.
+    limiter (shared TokenBucket) paces calls when several workers fetch concurrently.
+    metrics counts the call (yfinance does not expose status codes or byte counts).
+    Intraday intervals (60m/30m/15m/5m/1m) come back stamped with the bar start in UTC and
+    only as far back as Yahoo keeps them (60 days below 60m, 730 days for 60m).
     """
-    if interval.lower() not in ("1d", "d", "day", "daily"):
-        raise ValueError("Yahoo fallback currently supports daily only (1d).")
+    yf_interval = _yf_interval(interval)
+    start, end = _window(interval, lookback_days, now_utc, start_utc)
 
-    if now_utc is None:
-        now_utc = datetime.now(timezone.utc)
+    if limiter is not None:
+        limiter.acquire()
 
-    start = (now_utc - timedelta(days=int(lookback_days * 1.2) + 5)).date().isoformat()
-    end = (now_utc + timedelta(days=1)).date().isoformat()
-
-    df = yf.download(
-        tickers=symbol,
-        start=start,
-        end=end,
-        interval="1d",
-        auto_adjust=False,
-        progress=False,
-        threads=False,
-    )
+    # Ticker.history (unlike yf.download) keeps no module-level state, so it is safe to
+    # call from several fetch threads at once.
+    try:
+        df = yf.Ticker(symbol).history(
+            start=start,
+            end=end,
+            interval=yf_interval,
+            auto_adjust=False,
+            actions=False,
+        )
+    except Exception:
+        if metrics is not None:
+            metrics.call("yahoo", error=True)
+        raise
+    if metrics is not None:
+        metrics.call("yahoo")
+
+    out = _to_bars(df, symbol, intraday=yf_interval != "1d")
+    if store is not None and not out.empty:
+        store.append(out, interval, symbol=symbol)
+    return out
 
+
+def _to_bars(df: pd.DataFrame | None, symbol: str, intraday: bool = False) -> pd.DataFrame:
+    """yfinance frame (Open/High/Low/Close/Volume, date index) -> timestamp/open/high/low/close/volume/symbol."""
     if df is None or df.empty:
         return pd.DataFrame()
 
+    # daily bars come back at local midnight; keep the date at 00:00 UTC like yf.download.
+    # intraday bars keep their instant (exchange time -> UTC)
+    idx = df.index
+    if getattr(idx, "tz", None) is not None:
+        df = df.copy()
+        df.index = idx.tz_convert("UTC") if intraday else idx.tz_localize(None)
+
     # yfinance columns: Open High Low Close Adj Close Volume
     df = df.rename(
         columns={
@@ -65,5 +127,68 @@ def fetch_stock_candles_yahoo(
     for col in ("open", "high", "low", "close", "volume"):
         out[col] = pd.to_numeric(out[col], errors="coerce")
 
-    out = out.dropna(subset=["open", "high", "low", "close"]).reset_index(drop=True)
-    return out
\ No newline at end of file
+    return out.dropna(subset=["open", "high", "low", "close"]).reset_index(drop=True)
+
+
+def fetch_stock_candles_yahoo_batch(
+    symbols: list[str],
+    interval: str,
+    lookback_days: int,
+    chunk_size: int = 50,
+    now_utc: datetime | None = None,
+    store: BarStore | None = None,
+    start_utc: datetime | None = None,
+    limiter: TokenBucket | None = None,
+    metrics: RunMetrics | None = None,
+) -> tuple[dict[str, pd.DataFrame], list[str]]:
+    """
+    Fetch candles at any supported interval (1d, 60m/1h, 30m, 15m, 5m, 1m) for many symbols
+    with grouped multi-ticker yf.download calls.
+
+    Returns ({symbol: frame with the fetch_stock_candles_yahoo schema}, [symbols that came
+    back empty]). Each chunk of chunk_size tickers is one download (yfinance threads the
+    tickers inside it); downloads themselves are serialized because yf.download keeps
+    module-level state. Intraday bars are stamped with their start in UTC, and the window
+    is capped to what Yahoo still serves (730 days for 60m, 60 for 30m/15m/5m, 7 for 1m).
+    """
+    yf_interval = _yf_interval(interval)
+    intraday = yf_interval != "1d"
+    start, end = _window(interval, lookback_days, now_utc, start_utc)
+
+    frames: dict[str, pd.DataFrame] = {}
+    empty: list[str] = []
+    chunk_size = max(1, int(chunk_size))
+    for i in range(0, len(symbols), chunk_size):
+        chunk = list(symbols[i : i + chunk_size])
+        if limiter is not None:
+            limiter.acquire()
+        with _DOWNLOAD_LOCK:
+            raw = yf.download(
+                tickers=chunk,
+                start=start,
+                end=end,
+                interval=yf_interval,
+                auto_adjust=False,
+                group_by="ticker",
+                progress=False,
+                threads=True,
+            )
+        if metrics is not None:
+            metrics.call("yahoo")
+
+        for sym in chunk:
+            out = pd.DataFrame()
+            if raw is not None and not raw.empty:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    if sym in raw.columns.get_level_values(0):
+                        out = _to_bars(raw[sym], sym, intraday)
+                elif len(chunk) == 1:
+                    out = _to_bars(raw, sym, intraday)
+            if out.empty:
+                empty.append(sym)
+                continue
+            frames[sym] = out
+            if store is not None:
+                store.append(out, interval, symbol=sym)
+
+    return frames, empty
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Mapping
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .panel import BAR_COLUMNS, compute_daily_features_panel
+from .streaming import IncrementalFeatures
+
+# modules whose code decides the feature values; editing any of them invalidates the cache
+_VERSIONED = ("feature_set.py", "indicators.py", "panel.py", "streaming.py")
+
+
+@lru_cache(maxsize=1)
+def feature_version() -> str:
+    h = hashlib.sha1()
+    for name in _VERSIONED:
+        h.update((Path(__file__).parent / name).read_bytes())
+    return h.hexdigest()[:12]
+
+
+def bars_digest(bars: pd.DataFrame) -> str:
+    """Fingerprint of timestamps + OHLCV."""
+    h = hashlib.blake2b(digest_size=16)
+    ts = pd.DatetimeIndex(pd.to_datetime(bars["timestamp"], utc=True)).as_unit("ns").asi8
+    h.update(np.ascontiguousarray(ts).tobytes())
+    for c in BAR_COLUMNS:
+        h.update(np.ascontiguousarray(bars[c].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _iso(ts) -> str:
+    return pd.Timestamp(ts).isoformat()
+
+
+class FeatureCache:
+    """
+    Per-symbol feature frames persisted under root/interval=/symbol=/ (next to the bar store).
+
+    An entry is valid for one (symbol, interval, first/last timestamp, row count, feature code
+    version) and a digest of the bars. For a new bars frame:
+      - same bars                      -> cached features are returned (hit)
+      - same bars up to the checkpoint -> the IncrementalFeatures state saved at the
+        checkpoint (overlap_bars before the cached end) is resumed over the remaining rows,
+        so appended bars and revisions of the last overlap_bars bars cost O(new rows) (extended)
+      - anything else (revised history, new window start, code change) -> full recompute
+    Misses go through compute_daily_features_panel and extensions through IncrementalFeatures;
+    both run every window over the symbol's own bars only (see features.panel.pack_order), so
+    a symbol's features are the same whether they were extended or computed cold, and
+    whatever other symbols share the batch.
+    Entries beyond max_entries / max_bytes are evicted least recently used first.
+    With memory=True entries written or read by this process are also kept in memory, so a
+    long-running process (runtime.daemon) does not re-read them from disk every run.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_entries: int = 5000,
+        max_bytes: int = 512 * 1024 * 1024,
+        overlap_bars: int = 2,
+        memory: bool = False,
+    ):
+        self.root = Path(root)
+        self.memory = memory
+        self._mem: dict[tuple[str, str], tuple[dict, pd.DataFrame]] = {}
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.overlap_bars = max(0, int(overlap_bars))
+        self.hits = 0
+        self.extended = 0
+        self.misses = 0
+        self.revised = 0
+        self.evictions = 0
+        self.rows_incremental = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict, project_root: str | Path, memory: bool = False) -> FeatureCache | None:
+        c = cfg.get("data", {}).get("feature_cache", {}) or {}
+        if not c.get("enabled", False):
+            return None
+        return cls(
+            Path(project_root) / c.get("dir", "data/features"),
+            max_entries=int(c.get("max_entries", 5000)),
+            max_bytes=int(float(c.get("max_mb", 512)) * 1024 * 1024),
+            overlap_bars=int(c.get("overlap_bars", 2)),
+            memory=memory,
+        )
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / f"interval={interval}" / f"symbol={symbol}"
+
+    def _load_meta(self, symbol: str, interval: str) -> dict | None:
+        if (symbol, interval) in self._mem:
+            return self._mem[(symbol, interval)][0]
+        try:
+            meta = json.loads((self._dir(symbol, interval) / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == feature_version() else None
+
+    def get(self, symbol: str, interval: str, bars: pd.DataFrame) -> pd.DataFrame | None:
+        """Features for bars from the cache (exact or extended), or None if they must be recomputed."""
+        meta = self._load_meta(symbol, interval)
+        if meta is None or bars.empty:
+            self.misses += 1
+            return None
+
+        n = len(bars)
+        first = _iso(bars["timestamp"].iloc[0])
+        if meta["first_ts"] != first:
+            self.revised += 1
+            return None
+
+        d = self._dir(symbol, interval)
+        if n == meta["rows"] and meta["last_ts"] == _iso(bars["timestamp"].iloc[-1]) and meta["digest"] == bars_digest(bars):
+            try:
+                feat = self._load_features(symbol, interval)
+                os.utime(d / "meta.json")
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return feat
+
+        k = int(meta["checkpoint_rows"])
+        if n < k or meta["checkpoint_digest"] != bars_digest(bars.iloc[:k]):
+            self.revised += 1
+            return None
+        try:
+            cached = self._load_features(symbol, interval)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        inc = IncrementalFeatures.from_state(meta["state"])
+        rows = [inc.update(r) for r in bars.iloc[k:][["timestamp"] + BAR_COLUMNS].to_dict("records")]
+        new = pd.DataFrame(rows, columns=cached.columns)
+        new["timestamp"] = pd.to_datetime(new["timestamp"], utc=True)
+        feat = pd.concat([cached.iloc[:k], new], ignore_index=True) if k else new
+        self.extended += 1
+        self.rows_incremental += len(rows)
+        self.put(symbol, interval, bars, feat)
+        return feat
+
+    def _load_features(self, symbol: str, interval: str) -> pd.DataFrame:
+        if (symbol, interval) in self._mem:
+            return self._mem[(symbol, interval)][1]
+        feat = pd.read_parquet(self._dir(symbol, interval) / "features.parquet")
+        if self.memory:
+            meta = self._load_meta(symbol, interval)
+            if meta is not None:
+                self._mem[(symbol, interval)] = (meta, feat)
+        return feat
+
+    def put(self, symbol: str, interval: str, bars: pd.DataFrame, feat: pd.DataFrame) -> None:
+        if bars.empty:
+            return
+        n = len(bars)
+        k = max(0, n - self.overlap_bars)
+        state = IncrementalFeatures.from_history(feat.iloc[:k], symbol=symbol).to_state()
+        meta = {
+            "version": feature_version(),
+            "symbol": symbol,
+            "interval": interval,
+            "rows": n,
+            "first_ts": _iso(bars["timestamp"].iloc[0]),
+            "last_ts": _iso(bars["timestamp"].iloc[-1]),
+            "digest": bars_digest(bars),
+            "checkpoint_rows": k,
+            "checkpoint_digest": bars_digest(bars.iloc[:k]),
+            "state": state,
+        }
+        d = self._dir(symbol, interval)
+        d.mkdir(parents=True, exist_ok=True)
+        tag = uuid.uuid4().hex[:8]
+        tmp = d / f".features-{tag}.parquet"
+        feat.to_parquet(tmp, index=False)
+        tmp.replace(d / "features.parquet")
+        tmp = d / f".meta-{tag}.json"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        tmp.replace(d / "meta.json")
+        if self.memory:
+            self._mem[(symbol, interval)] = (meta, feat)
+
+    def compute(self, frames: Mapping[str, pd.DataFrame], interval: str) -> dict[str, pd.DataFrame]:
+        """compute_daily_features_panel with the cache in front: only misses go through the panel (per-symbol windows, as get's extension)."""
+        out: dict[str, pd.DataFrame] = {}
+        todo: dict[str, pd.DataFrame] = {}
+        for sym, bars in frames.items():
+            feat = self.get(sym, interval, bars)
+            if feat is None:
+                todo[sym] = bars
+            else:
+                out[sym] = feat
+        if todo:
+            computed = compute_daily_features_panel(todo)
+            for sym, feat in computed.items():
+                self.put(sym, interval, todo[sym], feat)
+            out.update(computed)
+        return {sym: out[sym] for sym in frames if sym in out}
+
+    def evict(self) -> None:
+        entries = []
+        for meta in self.root.glob("interval=*/symbol=*/meta.json"):
+            try:
+                st = meta.stat()
+                size = sum(f.stat().st_size for f in meta.parent.iterdir())
+            except OSError:
+                continue
+            entries.append((st.st_mtime, size, meta.parent))
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        count = len(entries)
+        for _, size, d in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            for f in d.iterdir():
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+            try:
+                d.rmdir()
+            except OSError:
+                pass
+            self._mem.pop((d.name.split("=", 1)[1], d.parent.name.split("=", 1)[1]), None)
+            total -= size
+            count -= 1
+            self.evictions += 1
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.extended + self.misses + self.revised
+        return {
+            "hits": self.hits,
+            "extended": self.extended,
+            "misses": self.misses,
+            "revised": self.revised,
+            "evictions": self.evictions,
+            "rows_incremental": self.rows_incremental,
+            "hit_rate_pct": round(100.0 * (self.hits + self.extended) / lookups, 1) if lookups else 0.0,
+            "version": feature_version(),
+        }
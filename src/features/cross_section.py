@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .snapshot import latest, build_snapshot
+
+
+def percentile_rank(values: np.ndarray, axis: int = -1) -> np.ndarray:
+    """
+    Exact cross-sectional percentile (rank / count, ties averaged, NaN left out), like
+    pandas rank(pct=True). Works on 1-D arrays or ranks each row of a 2-D (time x symbol) array.
+    """
+    a = np.asarray(values, dtype=np.float64)
+    if a.ndim == 1:
+        return pd.Series(a).rank(pct=True, method="average").to_numpy()
+    df = pd.DataFrame(a if axis in (-1, 1) else a.T)
+    out = df.rank(axis=1, pct=True, method="average").to_numpy()
+    return out if axis in (-1, 1) else out.T
+
+
+def rs_percentile_panel(ret60: np.ndarray, bench_ret60: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Relative strength for every date and symbol in one pass.
+
+    ret60 is (time x symbol), bench_ret60 is (time,) on the same timeline.
+    Returns (rs, rs_pct) where rs = ret60 - bench_ret60 and rs_pct is its per-date percentile.
+    """
+    rs = np.asarray(ret60, dtype=np.float64) - np.asarray(bench_ret60, dtype=np.float64)[:, None]
+    return rs, percentile_rank(rs, axis=1)
+
+
+def rs_percentile_frame(feats: Mapping[str, pd.DataFrame], bench_feat: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """rs_percentile_panel for per-symbol feature frames; returns (rs, rs_pct) as date x symbol frames."""
+    ret60 = pd.DataFrame(
+        {s: f.set_index(pd.to_datetime(f["timestamp"], utc=True))["ret60"] for s, f in feats.items() if not f.empty}
+    ).sort_index()
+    bench = bench_feat.set_index(pd.to_datetime(bench_feat["timestamp"], utc=True))["ret60"]
+    bench = bench.reindex(ret60.index)
+    rs, pct = rs_percentile_panel(ret60.to_numpy(dtype=np.float64), bench.to_numpy(dtype=np.float64))
+    return (
+        pd.DataFrame(rs, index=ret60.index, columns=ret60.columns),
+        pd.DataFrame(pct, index=ret60.index, columns=ret60.columns),
+    )
+
+
+def rank_latest_rs(latest_ret60: Mapping[str, float], bench_ret60: float) -> dict[str, tuple[float, float]]:
+    """
+    Universe-wide ranking on each symbol's latest ret60.
+
+    Returns {symbol: (rs, rs_percentile)} with rs = ret60 - bench_ret60.
+    """
+    syms = list(latest_ret60)
+    rs = np.array([latest_ret60[s] for s in syms], dtype=np.float64) - float(bench_ret60)
+    pct = percentile_rank(rs)
+    return {s: (float(r), float(p)) for s, r, p in zip(syms, rs, pct)}
+
+
+def rank_snapshot_rs(snap: np.ndarray, bench_row: np.void, min_history: int = 0) -> dict[str, tuple[float, float]]:
+    """
+    Ranking stage on a snapshot table (features.snapshot): each symbol's latest complete ret60
+    against the benchmark's. Symbols with fewer than min_history complete rows (or none) are
+    left out of the universe.
+    """
+    keep = (snap["n_valid"] > 0) & (snap["n_valid"] >= min_history)
+    if not keep.any() or bench_row["n_valid"] == 0:
+        return {}
+    return rank_latest_rs(dict(zip(snap["symbol"][keep].tolist(), snap["ret60"][keep].tolist())), float(bench_row["ret60"]))
+
+
+def rank_universe_rs(
+    feats: Mapping[str, pd.DataFrame],
+    bench_feat: pd.DataFrame,
+    min_history: int = 0,
+) -> dict[str, tuple[float, float]]:
+    """rank_snapshot_rs for per-symbol feature frames."""
+    return rank_snapshot_rs(build_snapshot(feats), latest(bench_feat), min_history)
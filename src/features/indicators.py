@@ -43,3 +43,43 @@ def rolling_max(close: pd.Series, n: int) -> pd.Series:
 
 def rolling_min(close: pd.Series, n: int) -> pd.Series:
     return close.rolling(n, min_periods=n).min()
+
+def wilder(x: pd.Series, n: int, seed: float | None = None) -> pd.Series:
+    """Wilder's smoothing (EMA with alpha=1/n); seed is the previous smoothed value when continuing a series."""
+    if seed is None:
+        return x.ewm(alpha=1/n, adjust=False).mean()
+    s = pd.concat([pd.Series([seed], dtype=float), x.reset_index(drop=True)], ignore_index=True)
+    return pd.Series(s.ewm(alpha=1/n, adjust=False).mean().to_numpy()[1:], index=x.index)
+
+def adx_frame(df: pd.DataFrame, n: int = 14, prev: dict | None = None) -> pd.DataFrame:
+    """
+    Wilder's ADX with its smoothed parts: columns tr, plus_dm, minus_dm (smoothed) and adx.
+    prev continues an earlier frame from its last row: that bar's high/low/close plus its
+    tr/plus_dm/minus_dm/adx. Appended bars then cost O(new rows) and match a full pass.
+    """
+    high = df["high"].astype(float)
+    low = df["low"].astype(float)
+    close = df["close"].astype(float)
+    prev_high, prev_low, prev_close = high.shift(1), low.shift(1), close.shift(1)
+    if prev is not None and len(df):
+        prev_high.iloc[0], prev_low.iloc[0], prev_close.iloc[0] = prev["high"], prev["low"], prev["close"]
+
+    up = high - prev_high
+    down = prev_low - low
+    plus = up.where((up > down) & (up > 0), 0.0).where(up.notna())
+    minus = down.where((down > up) & (down > 0), 0.0).where(down.notna())
+    tr = pd.concat([(high - low).abs(), (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1).where(prev_close.notna())
+
+    seed = prev or {}
+    tr_s = wilder(tr, n, seed.get("tr"))
+    plus_s = wilder(plus, n, seed.get("plus_dm"))
+    minus_s = wilder(minus, n, seed.get("minus_dm"))
+    # flat bars (no range / no directional move) give DI / DX of 0, not NaN, so the smoothing never gaps
+    plus_di = (100 * plus_s / tr_s).where(tr_s != 0, 0.0)
+    minus_di = (100 * minus_s / tr_s).where(tr_s != 0, 0.0)
+    di_sum = plus_di + minus_di
+    dx = (100 * (plus_di - minus_di).abs() / di_sum).where(di_sum != 0, 0.0).where(tr_s.notna())
+    return pd.DataFrame({"tr": tr_s, "plus_dm": plus_s, "minus_dm": minus_s, "adx": wilder(dx, n, seed.get("adx"))}, index=df.index)
+
+def adx(df: pd.DataFrame, n: int = 14) -> pd.Series:
+    return adx_frame(df, n)["adx"]
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+FEATURE_COLUMNS = [
+    "ma20", "ma50", "ma200", "atr14", "rsi14", "z20",
+    "ret20", "ret60", "high20", "vol20", "vol_multiple", "ma50_slope",
+]
+
+
+@dataclass
+class BarPanel:
+    """
+    Bars for a whole universe aligned on one timeline.
+
+    Every array is 2-D (time x symbol), float64, NaN where a symbol has no bar.
+    """
+    timestamps: pd.DatetimeIndex
+    symbols: list[str]
+    arrays: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self.arrays[col]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (len(self.timestamps), len(self.symbols))
+
+
+def _timestamps_ns(ts: pd.Series) -> np.ndarray:
+    if not isinstance(ts.dtype, pd.DatetimeTZDtype):
+        ts = pd.to_datetime(ts, utc=True)
+    return pd.DatetimeIndex(ts).as_unit("ns").asi8
+
+
+def build_bar_panel(frames: Mapping[str, pd.DataFrame]) -> BarPanel:
+    """Align per-symbol bar frames (timestamp/open/high/low/close/volume) on the union of their timestamps."""
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    if not symbols:
+        return BarPanel(pd.DatetimeIndex([], tz="UTC"), [], {c: np.empty((0, 0)) for c in BAR_COLUMNS})
+
+    ts_list = [_timestamps_ns(frames[s]["timestamp"]) for s in symbols]
+    timeline = np.unique(np.concatenate(ts_list))
+
+    arrays = {c: np.full((len(timeline), len(symbols)), np.nan) for c in BAR_COLUMNS}
+    for j, (s, ts) in enumerate(zip(symbols, ts_list)):
+        rows = np.searchsorted(timeline, ts)
+        df = frames[s]
+        for c in BAR_COLUMNS:
+            arrays[c][rows, j] = df[c].to_numpy(dtype=np.float64)
+
+    return BarPanel(pd.to_datetime(timeline, unit="ns", utc=True), symbols, arrays)
+
+
+def pack_order(present: np.ndarray) -> np.ndarray:
+    """
+    Row order that moves each column's present cells to the top, in time order (padding last).
+
+    Windows computed on the packed arrays run over a symbol's own bars, not over slots of the
+    union timeline, so a bar another symbol has (or this one lacks) does not shift them.
+    """
+    return np.argsort(~present, axis=0, kind="stable")
+
+
+def packed(x: np.ndarray, order: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(x, order, axis=0)
+
+
+def unpacked(x: np.ndarray, order: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Inverse of packed: values back on the union timeline, NaN where the symbol has no bar."""
+    out = np.empty_like(x)
+    np.put_along_axis(out, order, x, axis=0)
+    out[~present] = np.nan
+    return out
+
+
+def shift(x: np.ndarray, n: int) -> np.ndarray:
+    """Each column moved down n rows (NaN-filled), like Series.shift(n)."""
+    out = np.full_like(x, np.nan)
+    if n < len(x):
+        out[n:] = x[:-n]
+    return out
+
+
+def _rolling_mean(x: np.ndarray, n: int) -> np.ndarray:
+    # cumsum over values centred on a per-column reference; a window with any NaN is NaN (min_periods=n)
+    valid = ~np.isnan(x)
+    ref = np.nanmean(x, axis=0) if valid.any() else np.zeros(x.shape[1])
+    ref = np.where(np.isnan(ref), 0.0, ref)
+    xz = np.where(valid, x - ref, 0.0)
+    zero = np.zeros((1, x.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(xz, axis=0)])
+    cnt = np.concatenate([zero, np.cumsum(valid, axis=0, dtype=np.float64)])
+
+    out = np.full_like(x, np.nan)
+    if n <= len(x):
+        s = cs[n:] - cs[:-n]
+        c = cnt[n:] - cnt[:-n]
+        out[n - 1:] = np.where(c == n, s / n + ref, np.nan)
+    return out
+
+
+def _rolling_std(x: np.ndarray, mean: np.ndarray, n: int) -> np.ndarray:
+    # two-pass population std over n window offsets; NaN propagates like min_periods=n
+    acc = np.zeros_like(x)
+    for k in range(n):
+        d = shift(x, k) - mean if k else x - mean
+        acc += d * d
+    return np.sqrt(acc / n)
+
+
+def rolling_max(x: np.ndarray, n: int) -> np.ndarray:
+    """Max over the last n rows of each column; NaN while any of them is NaN (min_periods=n)."""
+    out = x.copy()
+    for k in range(1, n):
+        out = np.maximum(out, shift(x, k))
+    return out
+
+
+def wilder(x: np.ndarray, n: int) -> np.ndarray:
+    """ewm(alpha=1/n, adjust=False).mean() down each column, including pandas' gap weighting."""
+    alpha = 1.0 / n
+    decay = 1.0 - alpha
+    out = np.empty_like(x)
+    w = np.full(x.shape[1], np.nan)
+    old_wt = np.ones(x.shape[1])
+    for t in range(len(x)):
+        cur = x[t]
+        obs = ~np.isnan(cur)
+        started = ~np.isnan(w)
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        upd = started & obs
+        mixed = (old_wt * w + alpha * cur) / (old_wt + alpha)
+        w = np.where(upd & (w != cur), mixed, w)
+        old_wt = np.where(upd, 1.0, old_wt)
+        w = np.where(~started & obs, cur, w)
+        out[t] = w
+    return out
+
+
+def compute_panel_features(panel: BarPanel) -> dict[str, np.ndarray]:
+    """
+    Same features as compute_daily_features, computed for every symbol at once.
+
+    Returns {feature_name: (time x symbol) array}, NaN where a symbol has no bar. Windows
+    run over each symbol's own bars (see pack_order), so the values match
+    compute_daily_features on that symbol's frame whatever timestamps the others have.
+    """
+    present = ~np.isnan(panel["close"])
+    dense = bool(present.all())
+    order = None if dense else pack_order(present)
+
+    def own_bars(x: np.ndarray) -> np.ndarray:
+        return x if dense else packed(x, order)
+
+    close = own_bars(panel["close"])
+    high = own_bars(panel["high"])
+    low = own_bars(panel["low"])
+    volume = own_bars(panel["volume"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ma20 = _rolling_mean(close, 20)
+        ma50 = _rolling_mean(close, 50)
+        ma200 = _rolling_mean(close, 200)
+
+        prev_close = shift(close, 1)
+        tr = np.fmax(np.fmax(np.abs(high - low), np.abs(high - prev_close)), np.abs(low - prev_close))
+        atr14 = wilder(tr, 14)
+
+        delta = close - prev_close
+        up = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+        down = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+        roll_down = wilder(down, 14)
+        rs = wilder(up, 14) / np.where(roll_down == 0, np.nan, roll_down)
+        rsi14 = 100 - (100 / (1 + rs))
+
+        sd20 = _rolling_std(close, ma20, 20)
+        z20 = (close - ma20) / np.where(sd20 == 0, np.nan, sd20)
+
+        ret20 = close / shift(close, 20) - 1
+        ret60 = close / shift(close, 60) - 1
+        high20 = rolling_max(close, 20)
+
+        vol20 = _rolling_mean(volume, 20)
+        vol_multiple = volume / vol20
+        ma50_slope = (ma50 - shift(ma50, 20)) / np.where(close == 0, np.nan, close)
+
+    out = {
+        "ma20": ma20,
+        "ma50": ma50,
+        "ma200": ma200,
+        "atr14": atr14,
+        "rsi14": rsi14,
+        "z20": z20,
+        "ret20": ret20,
+        "ret60": ret60,
+        "high20": high20,
+        "vol20": vol20,
+        "vol_multiple": vol_multiple,
+        "ma50_slope": ma50_slope,
+    }
+    return out if dense else {k: unpacked(v, order, present) for k, v in out.items()}
+
+
+def panel_to_frames(panel: BarPanel, features: Mapping[str, np.ndarray]) -> dict[str, pd.DataFrame]:
+    """Split panel features back into per-symbol frames with compute_daily_features' columns."""
+    out: dict[str, pd.DataFrame] = {}
+    for j, sym in enumerate(panel.symbols):
+        rows = ~np.isnan(panel["close"][:, j])
+        cols: dict[str, object] = {"timestamp": panel.timestamps[rows]}
+        cols.update({c: panel[c][rows, j] for c in BAR_COLUMNS})
+        cols["symbol"] = sym
+        cols.update({c: features[c][rows, j] for c in FEATURE_COLUMNS})
+        out[sym] = pd.DataFrame(cols)
+    return out
+
+
+def compute_daily_features_panel(frames: Mapping[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Panel-mode replacement for calling compute_daily_features once per symbol."""
+    panel = build_bar_panel(frames)
+    return panel_to_frames(panel, compute_panel_features(panel))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+from .panel import BAR_COLUMNS, FEATURE_COLUMNS, BarPanel
+
+VALUE_COLUMNS = BAR_COLUMNS + FEATURE_COLUMNS
+
+# one record per symbol; every field except symbol/timestamp/n_valid is float64
+SNAPSHOT_DTYPE_BASE = [("timestamp", "datetime64[ns]")] + [(c, "f8") for c in VALUE_COLUMNS] + [("n_valid", "i8")]
+
+# what the filter / regime / strategy stages accept: a feature frame or one snapshot record
+FeatOrRow = Union[pd.DataFrame, np.void]
+
+
+def snapshot_dtype(symbol_len: int = 16) -> np.dtype:
+    return np.dtype([("symbol", f"U{max(1, symbol_len)}")] + SNAPSHOT_DTYPE_BASE)
+
+
+def _complete(feat: pd.DataFrame) -> np.ndarray:
+    # rows feat.dropna() would keep, as a mask (no filtered copy of the frame)
+    return ~feat.isna().to_numpy().any(axis=1)
+
+
+def _fill(rec: np.void, feat: pd.DataFrame, ok: np.ndarray) -> None:
+    n_valid = int(ok.sum())
+    rec["n_valid"] = n_valid
+    if not n_valid:
+        for c in VALUE_COLUMNS:
+            rec[c] = np.nan
+        rec["timestamp"] = np.datetime64("NaT")
+        return
+    i = len(ok) - 1 - int(np.argmax(ok[::-1]))
+    row = feat.iloc[i].to_numpy()
+    pos = feat.columns.get_loc
+    ts = pd.Timestamp(row[pos("timestamp")])
+    rec["timestamp"] = (ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo else ts).to_datetime64()
+    for c in VALUE_COLUMNS:
+        rec[c] = row[pos(c)]
+
+
+def snapshot_row(feat: pd.DataFrame, symbol: str | None = None) -> np.void:
+    """Snapshot record for one feature frame: its latest complete row (feat.dropna().iloc[-1]) and n_valid."""
+    if symbol is None:
+        symbol = str(feat["symbol"].iloc[0]) if "symbol" in feat.columns and len(feat) else ""
+    arr = np.zeros(1, dtype=snapshot_dtype(len(symbol)))
+    arr[0]["symbol"] = symbol
+    _fill(arr[0], feat, _complete(feat))
+    return arr[0]
+
+
+def build_snapshot(feats: Mapping[str, pd.DataFrame]) -> np.ndarray:
+    """
+    One structured record per symbol (in feats order) with the latest complete feature row
+    and the number of complete rows. NaN values / n_valid == 0 where a symbol has none.
+    """
+    syms = list(feats)
+    out = np.zeros(len(syms), dtype=snapshot_dtype(max((len(s) for s in syms), default=1)))
+    for i, sym in enumerate(syms):
+        out[i]["symbol"] = sym
+        _fill(out[i], feats[sym], _complete(feats[sym]))
+    return out
+
+
+def snapshot_from_panel(panel: BarPanel, features: Mapping[str, np.ndarray]) -> np.ndarray:
+    """build_snapshot straight from (time x symbol) arrays, vectorized over symbols."""
+    n_time, n_sym = panel.shape
+    ok = np.ones((n_time, n_sym), dtype=bool)
+    for c in BAR_COLUMNS:
+        ok &= ~np.isnan(panel[c])
+    for c in FEATURE_COLUMNS:
+        ok &= ~np.isnan(features[c])
+    n_valid = ok.sum(axis=0)
+    last = n_time - 1 - np.argmax(ok[::-1], axis=0) if n_time else np.zeros(n_sym, dtype=np.int64)
+    cols = np.arange(n_sym)
+    has = n_valid > 0
+
+    out = np.zeros(n_sym, dtype=snapshot_dtype(max((len(s) for s in panel.symbols), default=1)))
+    out["symbol"] = panel.symbols
+    out["n_valid"] = n_valid
+    if n_time:
+        ts = panel.timestamps.tz_convert("UTC").tz_localize(None).to_numpy()
+        out["timestamp"] = np.where(has, ts[last], np.datetime64("NaT"))
+        for c in BAR_COLUMNS:
+            out[c] = np.where(has, panel[c][last, cols], np.nan)
+        for c in FEATURE_COLUMNS:
+            out[c] = np.where(has, features[c][last, cols], np.nan)
+    else:
+        for c in VALUE_COLUMNS:
+            out[c] = np.nan
+        out["timestamp"] = np.datetime64("NaT")
+    return out
+
+
+def latest(feat: FeatOrRow) -> np.void:
+    """The latest complete row as a snapshot record; records pass through unchanged."""
+    if isinstance(feat, np.void):
+        return feat
+    return snapshot_row(feat)
+
+
+def universe_mask(snap: np.ndarray, cfg: dict) -> np.ndarray:
+    """passes_universe_filters for a whole snapshot at once."""
+    from ..common.settings import settings_for
+
+    uf = settings_for(cfg).universe_filter
+    exclude = sorted(uf.exclude_symbols)
+    with np.errstate(invalid="ignore"):
+        ok = (snap["close"] >= uf.min_price) & (snap["close"] * snap["vol20"] >= uf.min_avg_dollar_volume_20d)
+    if exclude:
+        ok &= ~np.isin(snap["symbol"], exclude)
+    return ok & (snap["n_valid"] > 0)
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+from collections import deque
+import math
+from typing import Any, Mapping
+
+import pandas as pd
+
+from .panel import BAR_COLUMNS, FEATURE_COLUMNS
+
+NAN = float("nan")
+
+
+def _nan_to_none(x: float | None) -> float | None:
+    return None if x is None or math.isnan(x) else x
+
+
+def _none_to_nan(x: float | None) -> float:
+    return NAN if x is None else float(x)
+
+
+class RollingMean:
+    """Windowed mean with a running sum; the sum is rebuilt from the window every n updates to stop drift."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.window: deque[float] = deque(maxlen=n)
+        self.total = 0.0
+        self._since_rebuild = 0
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.n:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.n:
+            self.total = math.fsum(self.window)
+            self._since_rebuild = 0
+        return self.total / self.n if len(self.window) == self.n else NAN
+
+    def state(self) -> dict:
+        return {"n": self.n, "window": list(self.window)}
+
+    @classmethod
+    def from_state(cls, st: dict) -> RollingMean:
+        obj = cls(int(st["n"]))
+        obj.window.extend(st["window"])
+        obj.total = math.fsum(obj.window)
+        return obj
+
+
+class RollingMoments:
+    """Windowed mean and population variance, updated Welford-style as values enter and leave."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.window: deque[float] = deque(maxlen=n)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_rebuild = 0
+
+    def _rebuild(self) -> None:
+        k = len(self.window)
+        self.mean = math.fsum(self.window) / k if k else 0.0
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.window)
+        self._since_rebuild = 0
+
+    def update(self, x: float) -> tuple[float, float]:
+        if len(self.window) < self.n:
+            self.window.append(x)
+            k = len(self.window)
+            delta = x - self.mean
+            self.mean += delta / k
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window[0]
+            self.window.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.n
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.n:
+            self._rebuild()
+        if len(self.window) < self.n:
+            return NAN, NAN
+        return self.mean, max(self.m2, 0.0) / self.n
+
+    def state(self) -> dict:
+        return {"n": self.n, "window": list(self.window)}
+
+    @classmethod
+    def from_state(cls, st: dict) -> RollingMoments:
+        obj = cls(int(st["n"]))
+        obj.window.extend(st["window"])
+        obj._rebuild()
+        return obj
+
+
+class Wilder:
+    """ewm(alpha=1/n, adjust=False) state: one value, updated in O(1)."""
+
+    def __init__(self, n: int, value: float | None = None):
+        self.n = n
+        self.alpha = 1.0 / n
+        self.decay = 1.0 - self.alpha
+        self.value = value
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        elif self.value != x:
+            self.value = (self.decay * self.value + self.alpha * x) / (self.decay + self.alpha)
+        return self.value
+
+    def state(self) -> dict:
+        return {"n": self.n, "value": self.value}
+
+    @classmethod
+    def from_state(cls, st: dict) -> Wilder:
+        return cls(int(st["n"]), st["value"])
+
+
+class RollingMax:
+    """Windowed max over a monotonic deque of (index, value)."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.i = 0
+        self.dq: deque[tuple[int, float]] = deque()
+
+    def update(self, x: float) -> float:
+        while self.dq and self.dq[-1][1] <= x:
+            self.dq.pop()
+        self.dq.append((self.i, x))
+        if self.dq[0][0] <= self.i - self.n:
+            self.dq.popleft()
+        self.i += 1
+        return self.dq[0][1] if self.i >= self.n else NAN
+
+    def state(self) -> dict:
+        return {"n": self.n, "i": self.i, "dq": [list(t) for t in self.dq]}
+
+    @classmethod
+    def from_state(cls, st: dict) -> RollingMax:
+        obj = cls(int(st["n"]))
+        obj.i = int(st["i"])
+        obj.dq.extend((int(i), float(v)) for i, v in st["dq"])
+        return obj
+
+
+class RollingMin(RollingMax):
+    def update(self, x: float) -> float:
+        return -super().update(-x)
+
+
+class IncrementalFeatures:
+    """
+    Per-symbol streaming version of compute_daily_features.
+
+    update(bar) takes one bar (timestamp/open/high/low/close/volume) and returns the newest
+    feature row in O(1) per indicator: rolling sums for the SMAs, windowed Welford moments for
+    z20, Wilder EMA state for RSI/ATR and a monotonic deque for high20. Values not yet warmed
+    up are NaN, matching the batch function. to_state()/from_state() round-trip through JSON
+    so the state can be saved between runs.
+    """
+
+    def __init__(self, symbol: str = ""):
+        self.symbol = symbol
+        self.bars = 0
+        self.last_timestamp: pd.Timestamp | None = None
+        self.prev_close: float | None = None
+        self.ma20 = RollingMoments(20)
+        self.ma50 = RollingMean(50)
+        self.ma200 = RollingMean(200)
+        self.atr14 = Wilder(14)
+        self.rsi_up = Wilder(14)
+        self.rsi_down = Wilder(14)
+        self.high20 = RollingMax(20)
+        self.vol20 = RollingMean(20)
+        # close[t-60..t] for ret20/ret60 and ma50[t-20..t] for the slope
+        self.closes: deque[float] = deque(maxlen=61)
+        self.ma50_hist: deque[float] = deque(maxlen=21)
+
+    def update(self, bar: Mapping[str, Any]) -> dict[str, Any]:
+        o, h, l, c = float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"])
+        v = float(bar["volume"])
+        ts = pd.Timestamp(bar["timestamp"]) if bar.get("timestamp") is not None else None
+
+        pc = self.prev_close
+        tr = abs(h - l) if pc is None else max(abs(h - l), abs(h - pc), abs(l - pc))
+        atr14 = self.atr14.update(tr)
+
+        if pc is None:
+            rsi14 = NAN
+        else:
+            delta = c - pc
+            up = self.rsi_up.update(delta if delta > 0 else 0.0)
+            down = self.rsi_down.update(-delta if delta < 0 else 0.0)
+            rsi14 = NAN if down == 0 else 100 - (100 / (1 + up / down))
+
+        ma20, var20 = self.ma20.update(c)
+        sd20 = math.sqrt(var20) if not math.isnan(var20) else NAN
+        z20 = (c - ma20) / sd20 if sd20 and not math.isnan(sd20) else NAN
+        ma50 = self.ma50.update(c)
+        ma200 = self.ma200.update(c)
+
+        self.closes.append(c)
+        ret20 = c / self.closes[-21] - 1 if len(self.closes) >= 21 else NAN
+        ret60 = c / self.closes[-61] - 1 if len(self.closes) >= 61 else NAN
+
+        self.ma50_hist.append(ma50)
+        ma50_prev = self.ma50_hist[0] if len(self.ma50_hist) == 21 else NAN
+        ma50_slope = (ma50 - ma50_prev) / c if c != 0 else NAN
+
+        high20 = self.high20.update(c)
+        vol20 = self.vol20.update(v)
+        vol_multiple = v / vol20 if vol20 != 0 else (math.inf if v > 0 else NAN)
+
+        self.prev_close = c
+        self.bars += 1
+        self.last_timestamp = ts
+
+        return {
+            "timestamp": ts,
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "volume": v,
+            "symbol": self.symbol,
+            "ma20": ma20,
+            "ma50": ma50,
+            "ma200": ma200,
+            "atr14": atr14,
+            "rsi14": rsi14,
+            "z20": z20,
+            "ret20": ret20,
+            "ret60": ret60,
+            "high20": high20,
+            "vol20": vol20,
+            "vol_multiple": vol_multiple,
+            "ma50_slope": ma50_slope,
+        }
+
+    def seed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feed a history of bars in order; returns the feature rows (same columns as compute_daily_features)."""
+        rows = [self.update(r) for r in df[["timestamp"] + BAR_COLUMNS].to_dict("records")]
+        return pd.DataFrame(rows, columns=["timestamp"] + BAR_COLUMNS + ["symbol"] + FEATURE_COLUMNS)
+
+    @classmethod
+    def from_history(cls, feat: pd.DataFrame, symbol: str = "") -> IncrementalFeatures:
+        """
+        The state seed(feat) would leave behind, built from an already computed feature frame:
+        windows are sliced off the tail and only the RSI averages are re-run.
+        """
+        obj = cls(symbol)
+        n = len(feat)
+        if n == 0:
+            return obj
+        close = feat["close"].to_numpy(dtype=float).tolist()
+        volume = feat["volume"].to_numpy(dtype=float).tolist()
+        obj.bars = n
+        obj.last_timestamp = pd.Timestamp(feat["timestamp"].iloc[-1])
+        obj.prev_close = close[-1]
+        obj.ma20 = RollingMoments.from_state({"n": 20, "window": close[-20:]})
+        obj.ma50 = RollingMean.from_state({"n": 50, "window": close[-50:]})
+        obj.ma200 = RollingMean.from_state({"n": 200, "window": close[-200:]})
+        obj.vol20 = RollingMean.from_state({"n": 20, "window": volume[-20:]})
+        obj.atr14 = Wilder(14, float(feat["atr14"].iloc[-1]))
+        for pc, c in zip(close, close[1:]):
+            delta = c - pc
+            obj.rsi_up.update(delta if delta > 0 else 0.0)
+            obj.rsi_down.update(-delta if delta < 0 else 0.0)
+        obj.high20.i = max(0, n - 20)
+        for c in close[-20:]:
+            obj.high20.update(c)
+        obj.closes.extend(close[-61:])
+        obj.ma50_hist.extend(feat["ma50"].to_numpy(dtype=float)[-21:].tolist())
+        return obj
+
+    def to_state(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "bars": self.bars,
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            "prev_close": self.prev_close,
+            "ma20": self.ma20.state(),
+            "ma50": self.ma50.state(),
+            "ma200": self.ma200.state(),
+            "atr14": self.atr14.state(),
+            "rsi_up": self.rsi_up.state(),
+            "rsi_down": self.rsi_down.state(),
+            "high20": self.high20.state(),
+            "vol20": self.vol20.state(),
+            "closes": list(self.closes),
+            "ma50_hist": [_nan_to_none(x) for x in self.ma50_hist],
+        }
+
+    @classmethod
+    def from_state(cls, st: dict) -> IncrementalFeatures:
+        obj = cls(st.get("symbol", ""))
+        obj.bars = int(st["bars"])
+        obj.last_timestamp = pd.Timestamp(st["last_timestamp"]) if st.get("last_timestamp") else None
+        obj.prev_close = st["prev_close"]
+        obj.ma20 = RollingMoments.from_state(st["ma20"])
+        obj.ma50 = RollingMean.from_state(st["ma50"])
+        obj.ma200 = RollingMean.from_state(st["ma200"])
+        obj.atr14 = Wilder.from_state(st["atr14"])
+        obj.rsi_up = Wilder.from_state(st["rsi_up"])
+        obj.rsi_down = Wilder.from_state(st["rsi_down"])
+        obj.high20 = RollingMax.from_state(st["high20"])
+        obj.vol20 = RollingMean.from_state(st["vol20"])
+        obj.closes.extend(st["closes"])
+        obj.ma50_hist.extend(_none_to_nan(x) for x in st["ma50_hist"])
+        return obj
@@ -1,22 +1,22 @@
 from __future__ import annotations
 import argparse
-import json
+from dataclasses import dataclass
 import os
-import time
 from pathlib import Path
-from datetime import datetime, timezone
-
-from .common.config_loader import load_config, load_score_maps
-from .data.loader import generate_synthetic_bars, load_local_parquet
-from .data.yahoo_client import fetch_stock_candles_yahoo
-from .data.finnhub_client import fetch_quote
-from .features.feature_set import compute_daily_features
-from .regime.classifier import classify_regime
-from .universe.filter import passes_universe_filters
-from .strategies import trend_breakout, rs_rotation
-from .scoring.scorer import total_score
-from .alerts.builder import build_alert
-from .alerts.storage import save_alerts_jsonl
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .alerts.history import AlertHistory
+    from .data.bar_store import BarStore
+    from .data.http_cache import ResponseCache
+    from .data.rate_limit import TokenBucket
+    from .features.cache import FeatureCache
+    from .pipeline.run import ScanRun
+    from .regime.timeline import RegimeCache
+
+# Only the standard library at module level: each mode imports what it runs (pandas, the
+# pipeline, vendor clients), so --help, cron wrappers and the publish steps start fast.
+# python -m src.common.importtime src.main shows the breakdown; tests/test_startup.py keeps it in budget.
 
 DEFAULT_SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META"]
 BENCH = "AAPL"
@@ -50,53 +50,106 @@ def _lookback_days_for_interval(cfg: dict, interval: str) -> int:
     return int(cfg.get("data", {}).get("min_history_days", 260))
 
 
-def run_demo(project_root: Path):
-    cfg = load_config(project_root)
-    maps = load_score_maps(project_root)
-
-    bench_df = generate_synthetic_bars(BENCH, n=520, seed=1)
-    bench_feat = compute_daily_features(bench_df)
-
-    regime_res = classify_regime(bench_feat, vix_last=None)
-    regime = {"regime": regime_res.regime, "benchmark": BENCH, "regime_reason": regime_res.reasons}
-
-    alerts = []
-    for sym in DEFAULT_SYMBOLS:
-        df = generate_synthetic_bars(sym, n=520, seed=3)
-        feat = compute_daily_features(df)
-
-        if not passes_universe_filters(feat, cfg):
-            continue
-
-        if regime_res.regime in cfg["strategies"]["TREND_BREAKOUT"]["allowed_regimes"]:
-            raw = trend_breakout.evaluate(sym, feat, cfg, maps)
-            if raw:
-                tscore = total_score(raw["scores"]["components"], cfg["scoring"]["weights_global"])
-                alerts.append(build_alert(raw, cfg, tscore, regime, data_provenance={"vendor":"synthetic","feed":"demo","bar_interval":"1d"}))
+def _fetch_settings(cfg: dict) -> dict:
+    f = cfg.get("data", {}).get("fetch", {}) or {}
+    return {
+        "max_workers": int(f.get("max_workers", 8)),
+        "rate_limit": f.get("rate_limit", "55/min"),
+        "yahoo_chunk_size": int(f.get("yahoo_chunk_size", 0) or 0),
+    }
 
-        if regime_res.regime in cfg["strategies"]["RS_ROTATION"]["allowed_regimes"]:
-            raw = rs_rotation.evaluate(sym, feat, bench_feat, cfg, maps)
-            if raw:
-                tscore = total_score(raw["scores"]["components"], cfg["scoring"]["weights_global"])
-                alerts.append(build_alert(raw, cfg, tscore, regime, data_provenance={"vendor":"synthetic","feed":"demo","bar_interval":"1d"}))
 
-    core_min = cfg["scoring"]["pools"]["CORE"]["min_total"]
-    alerts = [a for a in alerts if a["scores"]["total"] >= core_min]
-    alerts = sorted(alerts, key=lambda x: x["scores"]["total"], reverse=True)[:cfg["scoring"]["pools"]["CORE"]["max_alerts_per_run"]]
+def run_demo(project_root: Path, workers: int = 1):
+    from .common.config_loader import load_compiled
+    from .common.instrumentation import RunMetrics
+    from .data.loader import generate_synthetic_bars
+    from .features.cache import FeatureCache
+    from .pipeline.run import run_scan, write_outputs
+    from .pipeline.sources import synthetic_source
+    from .regime.timeline import RegimeCache
+
+    compiled = load_compiled(project_root)
+    cfg, maps = compiled.cfg, compiled.score_maps
+    metrics = RunMetrics()
+
+    run = run_scan(
+        synthetic_source(n=520, metrics=metrics),
+        DEFAULT_SYMBOLS, cfg, maps,
+        benchmark=BENCH,
+        bench_df=generate_synthetic_bars(BENCH, n=520, seed=1),
+        data_provenance={"vendor": "synthetic", "feed": "demo", "bar_interval": "1d"},
+        interval="1d-demo",
+        feature_cache=FeatureCache.from_config(cfg, project_root) if workers <= 1 else None,
+        workers=workers,
+        metrics=metrics,
+        regime_cache=RegimeCache.from_config(cfg, project_root),
+    )
 
     out = project_root / "data" / "processed" / "alerts_demo.jsonl"
-    save_alerts_jsonl(alerts, out)
-    print(f"Regime: {regime_res.regime} | Alerts saved to: {out}")
-
-
-def run_finnhub(
+    write_outputs(run, out)
+    print(f"Regime: {run.regime['regime']} | Alerts saved to: {out}")
+
+
+def _make_source(name: str, project_root: Path, interval: str, lookback_days: int, store: BarStore, api_key: str, http_cache=None, **kwargs):
+    from .pipeline.sources import finnhub_source, parquet_source, yahoo_source
+
+    if name == "parquet":
+        return parquet_source(project_root, interval, max_workers=kwargs["max_workers"], metrics=kwargs.get("metrics"))
+    if name == "finnhub":
+        return finnhub_source(interval, lookback_days, store, api_key, cache=http_cache, **kwargs)
+    if name == "yahoo":
+        return yahoo_source(interval, lookback_days, store, **kwargs)
+    raise ValueError(f"Unknown source: {name}")
+
+
+@dataclass
+class LiveSession:
+    """
+    State a live run needs that outlives one run: config, watchlist, stores, caches, the
+    alert history and the shared rate limiter. run_finnhub opens one per run; the scheduler
+    daemon (runtime.daemon) keeps one open, with the bar store and feature cache in memory.
+    """
+    project_root: Path
+    cfg: dict
+    maps: dict
+    symbols: list[str]
+    api_key: str
+    store: BarStore
+    limiter: TokenBucket
+    http_cache: ResponseCache | None = None
+    feature_cache: FeatureCache | None = None
+    history: AlertHistory | None = None
+    regime_cache: RegimeCache | None = None
+    source: str = "yahoo"
+    fetch_workers: int | None = None
+    yahoo_chunk_size: int | None = None
+    workers: int = 1
+
+    def close(self) -> None:
+        if self.history is not None:
+            self.history.close()
+
+
+def open_live(
     project_root: Path,
-    interval: str,
     watchlist_path: Path,
     max_symbols: int | None = None,
-    sleep_s: float = 1.05,
-):
-    """Real run using Finnhub REST API."""
+    sleep_s: float | None = None,
+    fetch_workers: int | None = None,
+    rate_limit: str | None = None,
+    yahoo_chunk_size: int | None = None,
+    workers: int = 1,
+    source: str = "yahoo",
+    memory: bool = False,
+) -> LiveSession:
+    from .alerts.history import AlertHistory
+    from .common.config_loader import load_compiled
+    from .data.bar_store import BarStore
+    from .data.http_cache import ResponseCache
+    from .data.rate_limit import TokenBucket
+    from .features.cache import FeatureCache
+    from .regime.timeline import RegimeCache
+
     api_key = os.getenv("FINNHUB_API_KEY")
     if not api_key:
         raise RuntimeError(
@@ -105,130 +158,148 @@ def run_finnhub(
             "- GitHub Actions: add Repo Settings -> Secrets -> Actions -> FINNHUB_API_KEY"
         )
 
-    cfg = load_config(project_root)
-    maps = load_score_maps(project_root)
-    lookback_days = _lookback_days_for_interval(cfg, interval)
-
+    compiled = load_compiled(project_root)
+    cfg = compiled.cfg
     symbols = _read_watchlist(watchlist_path)
     if max_symbols is not None:
         symbols = symbols[:max_symbols]
 
-    report = {
-        "meta": {
-            "run_ts_utc": datetime.now(timezone.utc).isoformat(),
-            "vendor": "finnhub",
-            "bar_interval": interval,
-            "lookback_days": lookback_days,
-            "benchmark": BENCH,
-        },
-        "universe": {"requested": len(symbols), "loaded": 0},
-        "stats": {"scanned": 0, "passed_filters": 0, "alerts_raw": 0, "alerts_final": 0, "errors": 0, "skipped": 0},
-        "skipped_items": [],
-        "errors": [],
-    }
+    # one limiter shared by every fetch worker; --sleep-s keeps its old meaning of a minimum spacing
+    fetch_cfg = _fetch_settings(cfg)
+    if sleep_s is not None:
+        limiter = TokenBucket(1.0 / max(sleep_s, 1e-6), burst=1)
+    else:
+        limiter = TokenBucket.from_spec(rate_limit or fetch_cfg["rate_limit"])
+
+    return LiveSession(
+        project_root, cfg, compiled.score_maps, symbols, api_key,
+        store=BarStore(project_root / "data" / "bars", memory=memory),
+        limiter=limiter,
+        http_cache=ResponseCache.from_config(cfg, project_root),
+        feature_cache=FeatureCache.from_config(cfg, project_root, memory=memory),
+        history=AlertHistory.from_config(cfg, project_root),
+        regime_cache=RegimeCache.from_config(cfg, project_root, memory=memory),
+        source=source,
+        fetch_workers=fetch_workers,
+        yahoo_chunk_size=yahoo_chunk_size,
+        workers=workers,
+    )
+
 
-    # Benchmark (SPY)
-    bench_df = fetch_stock_candles_yahoo(BENCH, interval=interval, lookback_days=lookback_days, api_key=api_key)
-    time.sleep(sleep_s)
-    if bench_df.empty:
-        raise RuntimeError("Finnhub returned no benchmark data for SPY. Check API key / plan / symbol.")
-    bench_feat = compute_daily_features(bench_df)
+def run_live(session: LiveSession, interval: str, full_refresh: bool = False) -> ScanRun:
+    """One scan of the session's watchlist at interval; writes alerts.jsonl and run_report.json."""
+    from .common.instrumentation import RunMetrics
+    from .data.resample import Session
+    from .pipeline.run import run_scan, write_outputs
+
+    project_root, cfg, source = session.project_root, session.cfg, session.source
+    lookback_days = _lookback_days_for_interval(cfg, interval)
+
+    # derive the run interval from finer stored bars when data.resample lists it
+    rs_cfg = cfg.get("data", {}).get("resample", {}) or {}
+    derive = [str(i) for i in rs_cfg.get("derive", []) or []]
+    resample_kwargs = {}
+    if rs_cfg.get("enabled") and interval in derive and source != "parquet":
+        resample_kwargs = {"derive_from": str(rs_cfg["base_interval"]), "derived": derive, "session": Session.from_config(cfg)}
+
+    fetch_cfg = _fetch_settings(cfg)
+    limiter, http_cache = session.limiter, session.http_cache
+    metrics = RunMetrics()
+    metrics.watch(limiter, from_now=True)
+
+    bars = _make_source(
+        source, project_root, interval, lookback_days, session.store, session.api_key, http_cache,
+        max_workers=session.fetch_workers or fetch_cfg["max_workers"],
+        chunk_size=fetch_cfg["yahoo_chunk_size"] if session.yahoo_chunk_size is None else int(session.yahoo_chunk_size),
+        full=full_refresh,
+        window_align=cfg.get("data", {}).get("window_align"),
+        limiter=limiter,
+        metrics=metrics,
+        **resample_kwargs,
+    )
 
     # Optional VIX quote for vol guard (best-effort)
-    vix_last = None
-    try:
-        vix_q = fetch_quote("VIX", api_key=api_key)
-        time.sleep(sleep_s)
+    def _vix():
+        from .data.finnhub_client import fetch_quote
+
+        vix_q = fetch_quote("VIX", api_key=session.api_key, limiter=limiter, cache=http_cache, metrics=metrics)
         if isinstance(vix_q, dict) and vix_q.get("c") is not None:
-            vix_last = float(vix_q["c"])
-    except Exception:
-        vix_last = None
-
-    regime_res = classify_regime(bench_feat, vix_last=vix_last)
-    regime = {"regime": regime_res.regime, "benchmark": BENCH, "regime_reason": regime_res.reasons}
-
-    alerts: list[dict] = []
-    for sym in symbols:
-        report["universe"]["loaded"] += 1
-        try:
-            df = fetch_stock_candles_yahoo(sym, interval=interval, lookback_days=lookback_days, api_key=api_key)
-            time.sleep(sleep_s)
-
-            if df.empty:
-                report["stats"]["skipped"] += 1
-                report["skipped_items"].append({"symbol": sym, "reason": "no_data"})
-                continue
-
-            feat = compute_daily_features(df)
-            report["stats"]["scanned"] += 1
-
-            # Min history guard
-            if len(feat.dropna()) < int(cfg["data"]["min_history_days"]):
-                report["stats"]["skipped"] += 1
-                report["skipped_items"].append({"symbol": sym, "reason": "insufficient_history"})
-                continue
-
-            if not passes_universe_filters(feat, cfg):
-                report["stats"]["skipped"] += 1
-                report["skipped_items"].append({"symbol": sym, "reason": "universe_filter"})
-                continue
-
-            report["stats"]["passed_filters"] += 1
-
-            if regime_res.regime in cfg["strategies"]["TREND_BREAKOUT"]["allowed_regimes"]:
-                raw = trend_breakout.evaluate(sym, feat, cfg, maps)
-                if raw:
-                    tscore = total_score(raw["scores"]["components"], cfg["scoring"]["weights_global"])
-                    alerts.append(
-                        build_alert(
-                            raw,
-                            cfg,
-                            tscore,
-                            regime,
-                            data_provenance={"vendor": "finnhub", "feed": "rest", "bar_interval": interval},
-                        )
-                    )
-
-            if regime_res.regime in cfg["strategies"]["RS_ROTATION"]["allowed_regimes"]:
-                raw = rs_rotation.evaluate(sym, feat, bench_feat, cfg, maps)
-                if raw:
-                    tscore = total_score(raw["scores"]["components"], cfg["scoring"]["weights_global"])
-                    alerts.append(
-                        build_alert(
-                            raw,
-                            cfg,
-                            tscore,
-                            regime,
-                            data_provenance={"vendor": "finnhub", "feed": "rest", "bar_interval": interval},
-                        )
-                    )
-
-        except Exception as e:
-            report["stats"]["errors"] += 1
-            report["errors"].append({"symbol": sym, "stage": "scan", "message": str(e)})
-
-    report["stats"]["alerts_raw"] = len(alerts)
-
-    core_min = cfg["scoring"]["pools"]["CORE"]["min_total"]
-    alerts = [a for a in alerts if a["scores"]["total"] >= core_min]
-    alerts = sorted(alerts, key=lambda x: x["scores"]["total"], reverse=True)[: cfg["scoring"]["pools"]["CORE"]["max_alerts_per_run"]]
-    report["stats"]["alerts_final"] = len(alerts)
+            return float(vix_q["c"])
+        return None
+
+    # The benchmark rides along with the watchlist fetch; see pipeline.run.run_scan for the stages.
+    run = run_scan(
+        bars, session.symbols, cfg, session.maps,
+        benchmark=BENCH,
+        data_provenance={"vendor": "finnhub", "feed": "rest", "bar_interval": interval},
+        report_meta={
+            "vendor": "finnhub", "source": source, "bar_interval": interval, "lookback_days": lookback_days, "benchmark": BENCH,
+            **({"derived_from": resample_kwargs["derive_from"]} if resample_kwargs else {}),
+        },
+        vix=_vix,
+        min_history=int(cfg["data"]["min_history_days"]),
+        interval=interval,
+        feature_cache=session.feature_cache,
+        workers=session.workers,
+        metrics=metrics,
+        history=session.history,
+        cooldown_days=int(cfg.get("alerts", {}).get("history", {}).get("cooldown_days", 0)),
+        regime_cache=session.regime_cache,
+    )
+    report = run.report
+    if http_cache is not None:
+        report["http_cache"] = http_cache.stats()
 
     out_alerts = project_root / "data" / "processed" / "alerts.jsonl"
     out_report = project_root / "data" / "processed" / "run_report.json"
-    save_alerts_jsonl(alerts, out_alerts)
-    out_report.parent.mkdir(parents=True, exist_ok=True)
-    out_report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_outputs(run, out_alerts, out_report)
 
-    print(f"Regime: {regime_res.regime} (vix={vix_last})")
+    print(f"Regime: {run.regime['regime']} (vix={run.vix_last})")
     print(f"Alerts saved to: {out_alerts} | Report saved to: {out_report}")
     print(
         f"Universe={report['universe']['requested']} "
         f"scanned={report['stats']['scanned']} "
         f"passed_filters={report['stats']['passed_filters']} "
         f"alerts_final={report['stats']['alerts_final']} "
-        f"errors={report['stats']['errors']}"
+        f"errors={report['stats']['errors']} "
+        f"suppressed={report['stats']['suppressed']}"
+    )
+    stages = report["timing"]["stages"]
+    print(
+        f"wall={report['timing']['wall_s']:.1f}s "
+        + " ".join(f"{k}={v['wall_s']:.1f}s" for k, v in stages.items())
     )
+    return run
+
+
+def run_finnhub(
+    project_root: Path,
+    interval: str,
+    watchlist_path: Path,
+    max_symbols: int | None = None,
+    sleep_s: float | None = None,
+    full_refresh: bool = False,
+    fetch_workers: int | None = None,
+    rate_limit: str | None = None,
+    yahoo_chunk_size: int | None = None,
+    workers: int = 1,
+    source: str = "yahoo",
+):
+    """Real run using Finnhub REST API."""
+    session = open_live(
+        project_root, watchlist_path,
+        max_symbols=max_symbols,
+        sleep_s=sleep_s,
+        fetch_workers=fetch_workers,
+        rate_limit=rate_limit,
+        yahoo_chunk_size=yahoo_chunk_size,
+        workers=workers,
+        source=source,
+    )
+    try:
+        run_live(session, interval, full_refresh=full_refresh)
+    finally:
+        session.close()
 
 
 def main():
@@ -238,22 +309,41 @@ def main():
     parser.add_argument("--interval", default="1d", help="Bar interval: 1d, 60m, 30m, ...")
     parser.add_argument("--watchlist", default="config/watchlist.txt", help="Path to watchlist file")
     parser.add_argument("--max-symbols", type=int, default=None, help="Optional cap to avoid rate limits")
-    parser.add_argument("--sleep-s", type=float, default=1.05, help="Sleep between Finnhub API calls (free tier: ~1.05s)")
+    parser.add_argument("--sleep-s", type=float, default=None, help="Minimum spacing between vendor calls across all workers (overrides --rate-limit)")
+    parser.add_argument("--rate-limit", default=None, help="Shared vendor call budget, e.g. 55/min or 5/s (default: config data.fetch.rate_limit)")
+    parser.add_argument("--fetch-workers", type=int, default=None, help="Concurrent fetch threads (default: config data.fetch.max_workers)")
+    parser.add_argument("--yahoo-chunk-size", type=int, default=None, help="Tickers per multi-ticker Yahoo download; 0/1 fetches one symbol per call (default: config data.fetch.yahoo_chunk_size)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for the feature/filter/strategy/score stage (1 = in-process)")
+    parser.add_argument("--source", default="yahoo", choices=["yahoo", "finnhub", "parquet"], help="Where --finnhub runs get bars: Yahoo (default), Finnhub candles, or local parquet only")
+    parser.add_argument("--profile", action="store_true", help="Write a cProfile dump (run_profile.pstats) and a top-N summary (run_profile.txt) to data/processed")
+    parser.add_argument("--profile-top", type=int, default=30, help="Functions listed in run_profile.txt")
+    parser.add_argument("--full-refresh", action="store_true", help="Re-download the whole lookback window instead of only new bars")
     args = parser.parse_args()
 
+    from .common.instrumentation import profiled
+
     project_root = Path(__file__).resolve().parents[1]
+    profile_dir = project_root / "data" / "processed" if args.profile else None
 
     if args.demo:
-        run_demo(project_root)
+        with profiled(profile_dir, top_n=args.profile_top):
+            run_demo(project_root, workers=args.workers)
     elif args.finnhub:
         wl = (project_root / args.watchlist).resolve() if not Path(args.watchlist).is_absolute() else Path(args.watchlist)
-        run_finnhub(
-            project_root,
-            interval=str(args.interval),
-            watchlist_path=wl,
-            max_symbols=args.max_symbols,
-            sleep_s=float(args.sleep_s),
-        )
+        with profiled(profile_dir, top_n=args.profile_top):
+            run_finnhub(
+                project_root,
+                interval=str(args.interval),
+                watchlist_path=wl,
+                max_symbols=args.max_symbols,
+                sleep_s=args.sleep_s,
+                full_refresh=bool(args.full_refresh),
+                fetch_workers=args.fetch_workers,
+                rate_limit=args.rate_limit,
+                yahoo_chunk_size=args.yahoo_chunk_size,
+                workers=args.workers,
+                source=args.source,
+            )
     else:
         print("Starter kit: run demo (--demo) or Finnhub (--finnhub).")
 
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from ..alerts.history import AlertHistory
+from ..alerts.storage import save_alerts_jsonl
+from ..common.instrumentation import RunMetrics
+from ..features.cache import FeatureCache
+from ..features.feature_set import compute_daily_features
+from ..features.panel import compute_daily_features_panel
+from ..features.snapshot import snapshot_row
+from ..regime.classifier import classify_regime, regime_of
+from ..regime.timeline import RegimeCache
+from ..scan.core import ScanContext
+from .sources import Source
+from .stages import Loaded, ReportSink, TopAlerts, bounded, feature_stage, scan_stage
+
+
+@dataclass
+class ScanRun:
+    """What one pipeline run produced."""
+    alerts: list[dict]
+    report: dict
+    regime: dict
+    vix_last: float | None = None
+    metrics: RunMetrics | None = None
+
+
+def new_report(meta: dict, requested: int) -> dict:
+    return {
+        "meta": {"run_ts_utc": datetime.now(timezone.utc).isoformat(), **meta},
+        "universe": {"requested": requested, "loaded": 0},
+        "stats": {"scanned": 0, "passed_filters": 0, "alerts_raw": 0, "alerts_final": 0, "errors": 0, "skipped": 0, "suppressed": 0},
+        "skipped_items": [],
+        "errors": [],
+    }
+
+
+def run_scan(
+    source: Source,
+    symbols: list[str],
+    cfg: dict,
+    maps: dict,
+    benchmark: str,
+    data_provenance: dict,
+    report_meta: dict | None = None,
+    bench_df: pd.DataFrame | None = None,
+    vix: Callable[[], float | None] | None = None,
+    min_history: int = 0,
+    interval: str = "1d",
+    feature_cache: FeatureCache | None = None,
+    workers: int = 1,
+    feature_batch: int = 64,
+    queue_size: int = 64,
+    metrics: RunMetrics | None = None,
+    history: AlertHistory | None = None,
+    cooldown_days: int = 0,
+    regime_cache: RegimeCache | None = None,
+) -> ScanRun:
+    """
+    source -> features -> [regime + ranking] -> filter/strategies/score -> top-K alerts + report.
+
+    The source runs on its own thread behind a bounded queue, so downloads continue while
+    this thread computes features batch by batch. The benchmark is fetched with the universe
+    unless bench_df is given. vix is called once for the HIGH_VOL guard (errors -> None).
+    Stage timings and vendor accounting from metrics (give the source the same instance)
+    land in report["timing"] / report["vendor"]. With a history, setups alerted within
+    cooldown_days on the same bar interval are suppressed during the scan and the final
+    alerts are appended to it.
+    With a regime_cache the benchmark's regime timeline is kept per benchmark/interval and
+    only the bars since the last run are classified.
+    """
+    metrics = metrics or RunMetrics()
+    report = new_report(report_meta or {}, len(symbols))
+    wanted = set(symbols)
+    fetch_syms = list(dict.fromkeys(([benchmark] if bench_df is None else []) + symbols))
+
+    if workers > 1:
+        compute = None
+    elif feature_cache is not None:
+        compute = lambda frames: feature_cache.compute(frames, interval)
+    else:
+        compute = compute_daily_features_panel
+
+    loaded: dict[str, Loaded] = {}
+    for item in feature_stage(bounded(source(fetch_syms), maxsize=queue_size, name="fetch"), compute, feature_batch, metrics):
+        if item.symbol == benchmark and bench_df is None:
+            bench_df = item.bars
+        if item.symbol in wanted:
+            report["universe"]["loaded"] += 1
+            loaded[item.symbol] = item
+
+    if bench_df is None or bench_df.empty:
+        raise RuntimeError(f"No benchmark data for {benchmark}. Check API key / plan / symbol.")
+    with metrics.stage("regime"):
+        bench_feat = compute_daily_features(bench_df)
+        bench_row = snapshot_row(bench_feat, benchmark)
+
+        vix_last = None
+        if vix is not None:
+            try:
+                vix_last = vix()
+            except Exception:
+                vix_last = None
+
+        if regime_cache is not None:
+            regime_res = regime_of(regime_cache.timeline(benchmark, interval, bench_feat, cfg, vix=vix_last).iloc[-1])
+        else:
+            regime_res = classify_regime(bench_feat, vix_last=vix_last, cfg=cfg)
+    regime = {"regime": regime_res.regime, "benchmark": benchmark, "regime_reason": regime_res.reasons}
+
+    ctx = ScanContext(
+        cfg, maps, regime_res.regime, regime, bench_feat,
+        data_provenance=data_provenance,
+        min_history=min_history,
+        bench_row=bench_row,
+    )
+    if history is not None and cooldown_days > 0:
+        ctx.cooldown = history.cooldown(cooldown_days, symbols=symbols, interval=data_provenance.get("bar_interval", interval))
+    core = ctx.settings.core
+    top = TopAlerts(core.max_alerts_per_run, core.min_total)
+    sink = ReportSink(report, top)
+    for item, outcome in scan_stage(loaded, symbols, ctx, workers, metrics):
+        sink.consume(item, outcome)
+
+    alerts = top.result()
+    report["stats"]["alerts_final"] = len(alerts)
+    if history is not None:
+        with metrics.stage("history"):
+            history.add_many(alerts)
+            history.flush()
+    if feature_cache is not None:
+        feature_cache.evict()
+        report["feature_cache"] = feature_cache.stats()
+    report.update(metrics.summary())
+    return ScanRun(alerts, report, regime, vix_last, metrics)
+
+
+def write_outputs(run: ScanRun, alerts_path: Path, report_path: Path | None = None) -> None:
+    """JSONL + report sinks (the report's timing includes writing the alerts)."""
+    metrics = run.metrics or RunMetrics()
+    with metrics.stage("write"):
+        save_alerts_jsonl(run.alerts, alerts_path)
+    if report_path is not None:
+        run.report.update(metrics.summary())
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(run.report, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, TypeVar
+
+import pandas as pd
+
+from ..common.instrumentation import RunMetrics
+from ..data.bar_store import BarStore
+from ..data.loader import generate_synthetic_bars, load_local_parquet
+from ..data.refresh import refresh_candles, refresh_candles_batch, window_start_for
+from ..data.resample import US_EQUITY, Session, update_resampled
+from ..data.scheduler import FetchResult, fetch_batched, fetch_concurrently
+from ..data.synthetic import symbol_seed
+
+# A source turns a symbol list into FetchResults (any order, one per symbol).
+Source = Callable[[list[str]], Iterator[FetchResult]]
+
+T = TypeVar("T")
+
+
+def _timed(fn: Callable[[T], Any], metrics: RunMetrics | None) -> Callable[[T], Any]:
+    # every fetch call counts towards the "fetch" stage (wall + CPU of its worker thread)
+    if metrics is None:
+        return fn
+
+    def run(arg: T) -> Any:
+        with metrics.stage("fetch"):
+            return fn(arg)
+
+    return run
+
+
+def synthetic_source(n: int = 520, seeds: Mapping[str, int] | None = None, default_seed: int | None = None, metrics: RunMetrics | None = None) -> Source:
+    """
+    Synthetic daily bars (data.loader.generate_synthetic_bars). Symbols missing from seeds use
+    default_seed, or a stable seed of their own (data.synthetic.symbol_seed) when that is None.
+    """
+    seeds = dict(seeds or {})
+
+    def _bars(sym: str) -> pd.DataFrame:
+        seed = seeds.get(sym, default_seed if default_seed is not None else symbol_seed(sym))
+        return generate_synthetic_bars(sym, n=n, seed=seed)
+
+    def source(symbols: list[str]) -> Iterator[FetchResult]:
+        return fetch_concurrently(symbols, _timed(_bars, metrics), max_workers=1)
+
+    return source
+
+
+def parquet_source(project_root: str | Path, interval: str, start=None, max_workers: int = 4, metrics: RunMetrics | None = None) -> Source:
+    """Local bars only (bar store, then the legacy data/raw parquet files); no network."""
+
+    def _bars(sym: str) -> pd.DataFrame:
+        try:
+            return load_local_parquet(sym, interval, project_root, start=start)
+        except FileNotFoundError:
+            return pd.DataFrame()
+
+    def source(symbols: list[str]) -> Iterator[FetchResult]:
+        return fetch_concurrently(symbols, _timed(_bars, metrics), max_workers=max_workers)
+
+    return source
+
+
+def vendor_source(
+    fetch_one: Callable[..., pd.DataFrame],
+    interval: str,
+    lookback_days: int,
+    store: BarStore,
+    fetch_batch: Callable[..., tuple[dict[str, pd.DataFrame], list[str]]] | None = None,
+    chunk_size: int = 0,
+    max_workers: int = 8,
+    full: bool = False,
+    window_align: str | None = None,
+    metrics: RunMetrics | None = None,
+    derive_from: str | None = None,
+    derived: list[str] | None = None,
+    session: Session = US_EQUITY,
+    **fetch_kwargs: Any,
+) -> Source:
+    """
+    Delta-refresh through the bar store (data.refresh) from a vendor client.
+
+    With fetch_batch and chunk_size > 1 symbols are downloaded in multi-ticker chunks,
+    otherwise one call per symbol on max_workers threads. fetch_kwargs (limiter, api_key,
+    cache, ...) go to the client, and so does metrics for per-call vendor accounting.
+
+    With derive_from (e.g. "5m") the vendor is asked for those bars only; interval and every
+    interval in derived are then rebuilt locally from them (data.resample.update_resampled),
+    so one intraday download serves all of them.
+    """
+    if metrics is not None:
+        fetch_kwargs["metrics"] = metrics
+    fetch_interval = derive_from or interval
+    targets = sorted(set(derived or []) | {interval}) if derive_from else []
+
+    def _derived(sym: str) -> pd.DataFrame:
+        update_resampled(store, sym, derive_from, targets, session)
+        return store.read(sym, interval, start=window_start_for(datetime.now(timezone.utc), lookback_days, window_align))
+
+    def _one(sym: str) -> pd.DataFrame:
+        df = refresh_candles(fetch_one, sym, fetch_interval, lookback_days, store, full=full, window_align=window_align, **fetch_kwargs)
+        return _derived(sym) if derive_from else df
+
+    def _chunk(chunk: list[str]) -> dict[str, pd.DataFrame]:
+        frames, _ = refresh_candles_batch(
+            fetch_batch, chunk, fetch_interval, lookback_days, store,
+            full=full, window_align=window_align, chunk_size=len(chunk), **fetch_kwargs,
+        )
+        if derive_from:
+            frames = {sym: _derived(sym) for sym in frames}
+        return frames
+
+    def source(symbols: list[str]) -> Iterator[FetchResult]:
+        if fetch_batch is not None and chunk_size > 1:
+            return fetch_batched(symbols, _timed(_chunk, metrics), chunk_size=chunk_size)
+        return fetch_concurrently(symbols, _timed(_one, metrics), max_workers=max_workers)
+
+    return source
+
+
+def yahoo_source(interval: str, lookback_days: int, store: BarStore, **kwargs: Any) -> Source:
+    from ..data.yahoo_client import fetch_stock_candles_yahoo, fetch_stock_candles_yahoo_batch
+
+    return vendor_source(fetch_stock_candles_yahoo, interval, lookback_days, store, fetch_batch=fetch_stock_candles_yahoo_batch, **kwargs)
+
+
+def finnhub_source(interval: str, lookback_days: int, store: BarStore, api_key: str, **kwargs: Any) -> Source:
+    from ..data.finnhub_client import fetch_stock_candles
+
+    kwargs.pop("chunk_size", None)
+    return vendor_source(fetch_stock_candles, interval, lookback_days, store, api_key=api_key, **kwargs)
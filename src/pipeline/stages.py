@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import heapq
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Mapping, TypeVar
+
+import pandas as pd
+
+from ..common.instrumentation import RunMetrics
+from ..data.scheduler import FetchResult
+from ..features.cross_section import rank_snapshot_rs
+from ..features.snapshot import build_snapshot
+from ..scan.core import ScanContext, ScanOutcome, merge_outcome, scan_symbol
+from ..scan.parallel import scan_parallel
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def bounded(items: Iterable[T], maxsize: int = 64, name: str = "stage") -> Iterator[T]:
+    """
+    Pull items on a background thread into a queue of at most maxsize.
+
+    The upstream stage keeps working while the consumer is busy and blocks once the queue is
+    full (backpressure). Upstream exceptions are re-raised in the consumer. Closing the
+    returned generator early stops the producer at its next put.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, int(maxsize)))
+    stop = threading.Event()
+
+    def _put(x) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(x, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for x in items:
+                if not _put(x):
+                    return
+            _put(_DONE)
+        except BaseException as e:
+            _put(_Failed(e))
+
+    t = threading.Thread(target=_produce, name=name, daemon=True)
+    t.start()
+    try:
+        while True:
+            x = q.get()
+            if x is _DONE:
+                return
+            if isinstance(x, _Failed):
+                raise x.exc
+            yield x
+    finally:
+        stop.set()
+
+
+@dataclass
+class Loaded:
+    """One symbol after the feature stage: status is ok / no_data / error."""
+    symbol: str
+    status: str
+    message: str | None = None
+    bars: pd.DataFrame | None = None
+    feat: pd.DataFrame | None = None
+
+
+def feature_stage(
+    results: Iterable[FetchResult],
+    compute: Callable[[Mapping[str, pd.DataFrame]], Mapping[str, pd.DataFrame]] | None,
+    batch_size: int = 64,
+    metrics: RunMetrics | None = None,
+) -> Iterator[Loaded]:
+    """
+    Fetch results -> Loaded, with features computed batch_size symbols at a time through
+    compute (compute_daily_features_panel / FeatureCache.compute). compute=None passes bars
+    through untouched (the process-pool scan computes features itself). With metrics, fetch
+    latencies and the "features" stage are recorded.
+    """
+    metrics = metrics or RunMetrics()
+    batch: dict[str, pd.DataFrame] = {}
+
+    def _flush() -> Iterator[Loaded]:
+        with metrics.stage("features"):
+            feats = compute(batch)
+        for sym, bars in batch.items():
+            yield Loaded(sym, "ok", bars=bars, feat=feats.get(sym))
+        batch.clear()
+
+    for res in results:
+        metrics.observe("fetch", res.elapsed_s)
+        if res.error is not None:
+            yield Loaded(res.symbol, "error", message=str(res.error))
+        elif res.df is None or res.df.empty:
+            yield Loaded(res.symbol, "no_data")
+        elif compute is None:
+            yield Loaded(res.symbol, "ok", bars=res.df)
+        else:
+            batch[res.symbol] = res.df
+            if len(batch) >= batch_size:
+                yield from _flush()
+    if batch:
+        yield from _flush()
+
+
+def scan_stage(
+    loaded: Mapping[str, Loaded],
+    symbols: list[str],
+    ctx: ScanContext,
+    workers: int = 1,
+    metrics: RunMetrics | None = None,
+) -> Iterator[tuple[Loaded, ScanOutcome | None]]:
+    """
+    Ranking + filter/strategy/score over everything the feature stage produced, yielded in
+    symbols order. Ranking needs the whole universe, so this is where the stream joins.
+    Symbols that did not load come through with outcome None. With metrics, the in-process
+    path records "rank" and "scan" stages and per-symbol scan latency; the process pool is
+    timed as a whole ("scan_parallel").
+    """
+    metrics = metrics or RunMetrics()
+    ok = [s for s in symbols if s in loaded and loaded[s].status == "ok"]
+    if workers > 1:
+        with metrics.stage("scan_parallel"):
+            outcomes = {o.symbol: o for o in scan_parallel({s: loaded[s].bars for s in ok}, ctx, workers)}
+        for sym in symbols:
+            yield loaded.get(sym, Loaded(sym, "no_data")), outcomes.get(sym)
+        return
+
+    with metrics.stage("rank"):
+        feats = {s: loaded[s].feat for s in ok}
+        # one snapshot record per symbol feeds ranking, filters and strategies;
+        # universe-wide RS ranking over every symbol that clears the history guard
+        snap = build_snapshot(feats)
+        rows = dict(zip(feats, snap))
+        ctx.rs_ranks = rank_snapshot_rs(snap, ctx.bench_row, min_history=ctx.min_history)
+    for sym in symbols:
+        item = loaded.get(sym, Loaded(sym, "no_data"))
+        outcome = None
+        if sym in rows:
+            w0, c0 = time.perf_counter(), time.thread_time()
+            outcome = scan_symbol(sym, rows[sym], ctx)
+            wall = time.perf_counter() - w0
+            metrics.add_stage("scan", wall, time.thread_time() - c0)
+            metrics.observe("scan", wall)
+        yield item, outcome
+
+
+class TopAlerts:
+    """
+    Streaming replacement for "filter on min_total, sort by total, keep the first k": a
+    bounded min-heap, so only k alerts are held. Ties keep arrival order, as the stable sort did.
+    """
+
+    def __init__(self, k: int, min_total: float):
+        self.k = int(k)
+        self.min_total = float(min_total)
+        self.seen = 0
+        self._heap: list[tuple[float, int, dict]] = []
+
+    def push(self, alert: dict) -> None:
+        seq = self.seen
+        self.seen += 1
+        total = alert["scores"]["total"]
+        if total < self.min_total or self.k <= 0:
+            return
+        item = (total, -seq, alert)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def result(self) -> list[dict]:
+        return [a for _, _, a in sorted(self._heap, key=lambda x: (-x[0], -x[1]))]
+
+
+class ReportSink:
+    """Builds run_report.json's universe/stats/skipped/errors sections from the scan stream."""
+
+    def __init__(self, report: dict, top: TopAlerts):
+        self.report = report
+        self.top = top
+
+    def consume(self, item: Loaded, outcome: ScanOutcome | None) -> None:
+        r = self.report
+        if item.status == "error":
+            r["stats"]["errors"] += 1
+            r["errors"].append({"symbol": item.symbol, "stage": "fetch", "message": item.message})
+            return
+        if item.status == "no_data" or outcome is None:
+            r["stats"]["skipped"] += 1
+            r["skipped_items"].append({"symbol": item.symbol, "reason": "no_data"})
+            return
+        alerts: list[dict] = []
+        merge_outcome(r, alerts, outcome)
+        r["stats"]["alerts_raw"] += len(alerts)
+        for a in alerts:
+            self.top.push(a)
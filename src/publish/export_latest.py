@@ -1,54 +1,131 @@
 from __future__ import annotations
 import argparse
+import gzip
+import hashlib
+import heapq
 import json
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import Iterable, Iterator
 
-def read_jsonl(path: Path) -> list[dict]:
-    if not path.exists():
-        return []
-    out = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        out.append(json.loads(line))
-    return out
+try:  # optional: .br variant only when the brotli package is installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--input", required=True, help="Input alerts JSONL path")
-    ap.add_argument("--output", required=True, help="Output latest.json path")
-    ap.add_argument("--max", type=int, default=20, help="Max alerts to publish")
-    ap.add_argument("--report", default=None, help="Optional run_report.json to include for diagnostics")
-    args = ap.parse_args()
+def iter_jsonl(path: Path) -> Iterator[dict]:
+    """Alerts one line at a time, so the input can be far larger than memory."""
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)
 
-    in_path = Path(args.input)
-    out_path = Path(args.output)
-    alerts = read_jsonl(in_path)
+def read_jsonl(path: Path) -> list[dict]:
+    return list(iter_jsonl(path))
 
-<<<<<<< HEAD
-    alerts = sorted(alerts, key=lambda a: a.get("scores", {}).get("total", 0), reverse=True)
-    alerts = alerts[: args.max]
-=======
-    alerts = sorted(alerts, key=lambda a: a.get("scores", {}).get("total", 0), reverse=True)[: args.max]
->>>>>>> 8faa76d (Finnhub run + publish report)
+def top_alerts(alerts: Iterable[dict], max_alerts: int) -> list[dict]:
+    # heapq.nlargest holds max_alerts items and keeps input order on ties, like the stable sort it replaces
+    return heapq.nlargest(max(0, max_alerts), alerts, key=lambda a: a.get("scores", {}).get("total", 0))
 
+def build_payload(alerts: Iterable[dict], max_alerts: int, report_path: Path | None = None) -> dict:
     payload = {
         "generated_at_utc": datetime.now(timezone.utc).isoformat(),
-        "alerts": alerts,
+        "alerts": top_alerts(alerts, max_alerts),
     }
 
-    if args.report:
-        rp = Path(args.report)
+    if report_path is not None:
+        rp = Path(report_path)
         if rp.exists():
             try:
                 payload["report"] = json.loads(rp.read_text(encoding="utf-8"))
             except Exception:
                 payload["report"] = {"error": "failed_to_parse_report"}
+    return payload
+
+def dumps_compact(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# per-run fields that differ on every run even when the published signals do not
+_RUN_ALERT_KEYS = ("alert_id", "created_at_utc")
+_RUN_REPORT_KEYS = ("timing", "vendor", "feature_cache")
+
+def _stable_report(report):
+    if not isinstance(report, dict):
+        return report
+    out = {k: v for k, v in report.items() if k not in _RUN_REPORT_KEYS}
+    if isinstance(out.get("meta"), dict):
+        out["meta"] = {k: v for k, v in out["meta"].items() if k != "run_ts_utc"}
+    return out
 
+def content_hash(payload: dict) -> str:
+    """
+    sha256 of the payload without its per-run fields: the publish timestamps, each alert's
+    id and creation time, and the report's run timestamp, timings, vendor accounting and
+    cache stats. A run that found the same alerts hashes the same.
+    """
+    body = {k: v for k, v in payload.items() if k not in ("generated_at_utc", "content_sha256")}
+    if "alerts" in body:
+        body["alerts"] = [{k: v for k, v in a.items() if k not in _RUN_ALERT_KEYS} for a in body["alerts"]]
+    if "report" in body:
+        body["report"] = _stable_report(body["report"])
+    return hashlib.sha256(dumps_compact(body)).hexdigest()
+
+def _published_hash(path: Path) -> str | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("content_sha256")
+    except Exception:
+        return None
+
+def _variants(out_path: Path, compress: Iterable[str]) -> dict[str, Path]:
+    out = {}
+    for ext in compress:
+        if ext == "gz" or (ext == "br" and brotli is not None):
+            out[ext] = out_path.with_name(out_path.name + "." + ext)
+    return out
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+def publish(payload: dict, out_path: Path, compress: Iterable[str] = ("gz", "br")) -> bool:
+    """
+    Write payload as compact JSON plus precompressed variants (.gz; .br when brotli is
+    installed). Nothing is written when the published file already has the same content
+    hash (content_hash) and every variant exists. Returns whether anything was written.
+    """
+    payload = {**payload, "content_sha256": content_hash(payload)}
+    variants = _variants(out_path, compress)
+    if _published_hash(out_path) == payload["content_sha256"] and all(p.exists() for p in variants.values()):
+        return False
+
+    data = dumps_compact(payload)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    for ext, p in variants.items():
+        # mtime=0 keeps the .gz bytes a pure function of the content
+        _write(p, gzip.compress(data, compresslevel=9, mtime=0) if ext == "gz" else brotli.compress(data, quality=11))
+    _write(out_path, data)
+    return True
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", required=True, help="Input alerts JSONL path")
+    ap.add_argument("--output", required=True, help="Output latest.json path")
+    ap.add_argument("--max", type=int, default=20, help="Max alerts to publish")
+    ap.add_argument("--report", default=None, help="Optional run_report.json to include for diagnostics")
+    ap.add_argument("--compress", default="gz,br", help="Precompressed variants to write next to the output ('' for none)")
+    args = ap.parse_args()
+
+    in_path = Path(args.input)
+    out_path = Path(args.output)
+
+    payload = build_payload(iter_jsonl(in_path), args.max, report_path=Path(args.report) if args.report else None)
+    written = publish(payload, out_path, [c.strip() for c in args.compress.split(",") if c.strip()])
+    print(f"{'Published' if written else 'Unchanged'}: {out_path} ({len(payload['alerts'])} alerts)")
 
 if __name__ == "__main__":
     main()
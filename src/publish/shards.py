@@ -0,0 +1,183 @@
+"""
+Content-addressed publish output for public/index.html.
+
+    {out}/manifest.json                  small, the only file that must not be cached
+    {out}/runs/run-{hash}.json           top alerts of one run
+    {out}/reports/report-{hash}.json     run_report of one run
+    {out}/symbols/{SYMBOL}-{hash}.json   recent alerts of one symbol
+
+Shard names carry a hash of their bytes, so a name never changes content and the page
+fetches shards with the browser cache (forever) and only revalidates the manifest. An
+unchanged shard keeps its name, so repeat visits download the manifest and nothing else.
+
+    python -m src.publish.shards --input data/processed/alerts.jsonl --output public \
+        --report data/processed/run_report.json --history data/alerts/history.sqlite
+"""
+from __future__ import annotations
+import argparse
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+import gzip
+import hashlib
+import json
+from pathlib import Path
+import re
+from typing import Iterable
+
+from .export_latest import _write, dumps_compact, iter_jsonl, top_alerts
+
+MANIFEST = "manifest.json"
+SHARD_DIRS = ("runs", "reports", "symbols")
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+def shard_name(prefix: str, data: bytes) -> str:
+    return f"{_UNSAFE.sub('_', prefix)}-{hashlib.sha256(data).hexdigest()[:16]}.json"
+
+def write_shard(out_dir: Path, folder: str, prefix: str, obj, compress: Iterable[str] = ("gz",)) -> str:
+    """Write obj under folder/ (once: an existing name already holds these bytes). Returns its path relative to out_dir."""
+    data = dumps_compact(obj)
+    rel = f"{folder}/{shard_name(prefix, data)}"
+    p = out_dir / rel
+    if not p.exists():
+        p.parent.mkdir(parents=True, exist_ok=True)
+        if "gz" in compress:
+            _write(p.with_name(p.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+        _write(p, data)
+    return rel
+
+def _summary(alert: dict) -> dict:
+    setup = alert.get("setup", {})
+    return {
+        "symbol": alert.get("symbol"),
+        "setup": setup.get("setup_name"),
+        "pool": setup.get("pool"),
+        "action": setup.get("action"),
+        "total": alert.get("scores", {}).get("total"),
+        "created_at_utc": alert.get("created_at_utc"),
+    }
+
+def _recent_by_symbol(alerts: Iterable[dict], per_symbol: int) -> dict[str, list[dict]]:
+    # newest per_symbol alerts of each symbol, oldest first; memory is symbols x per_symbol
+    out: dict[str, deque] = defaultdict(lambda: deque(maxlen=per_symbol))
+    for a in alerts:
+        out[str(a.get("symbol"))].append(a)
+    return {s: list(d) for s, d in out.items()}
+
+def _read_manifest(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def publish_shards(
+    alerts: Iterable[dict],
+    out_dir: Path,
+    max_alerts: int = 20,
+    report: dict | None = None,
+    history: dict[str, list[dict]] | None = None,
+    per_symbol: int = 50,
+    keep_runs: int = 30,
+    compress: Iterable[str] = ("gz",),
+    prune: bool = True,
+) -> dict:
+    """
+    Write the run, report and per-symbol shards for one publish and then the manifest.
+
+    alerts is streamed into the top max_alerts. Symbol shards cover the published symbols:
+    their alerts from history ({symbol: alerts, oldest first}) when given, else from this
+    run. The manifest lists the newest keep_runs runs (older entries come from the previous
+    manifest); with prune, shard files no entry references any more are deleted.
+    """
+    out_dir = Path(out_dir)
+    compress = tuple(compress)
+    top = top_alerts(alerts, max_alerts)
+    now = datetime.now(timezone.utc).isoformat()
+
+    run_ts = (report or {}).get("meta", {}).get("run_ts_utc") or now
+    run = {
+        "run_ts_utc": run_ts,
+        "alerts": write_shard(out_dir, "runs", "run", {"run_ts_utc": run_ts, "alerts": top}, compress),
+        "count": len(top),
+    }
+    if report is not None:
+        run["report"] = write_shard(out_dir, "reports", "report", report, compress)
+
+    recent = _recent_by_symbol(top, per_symbol) if history is None else history
+    symbols = {}
+    for sym in dict.fromkeys(str(a.get("symbol")) for a in top):
+        symbols[sym] = write_shard(out_dir, "symbols", sym, {"symbol": sym, "alerts": recent.get(sym, [])[-per_symbol:]}, compress)
+
+    previous = [r for r in _read_manifest(out_dir).get("runs", []) if r.get("run_ts_utc") != run_ts]
+    manifest = {
+        "generated_at_utc": now,
+        "alerts": [_summary(a) for a in top],
+        "symbols": symbols,
+        "runs": [run] + previous[: max(0, keep_runs - 1)],
+    }
+    if report is not None:
+        manifest["stats"] = report.get("stats", {})
+    data = dumps_compact(manifest)
+    if "gz" in compress:
+        _write(out_dir / (MANIFEST + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+    _write(out_dir / MANIFEST, data)
+
+    if prune:
+        prune_shards(out_dir, manifest)
+    return manifest
+
+def prune_shards(out_dir: Path, manifest: dict) -> int:
+    """Delete shard files (and their .gz) that the manifest does not reference."""
+    live = set(manifest.get("symbols", {}).values())
+    for r in manifest.get("runs", []):
+        live.update(v for k, v in r.items() if k in ("alerts", "report"))
+    removed = 0
+    for folder in SHARD_DIRS:
+        d = out_dir / folder
+        if not d.is_dir():
+            continue
+        for p in d.iterdir():
+            rel = f"{folder}/{p.name[:-3] if p.name.endswith('.gz') else p.name}"
+            if rel not in live:
+                p.unlink()
+                removed += 1
+    return removed
+
+def _history_by_symbol(path: Path, symbols: Iterable[str], days: int) -> dict[str, list[dict]]:
+    from ..alerts.history import AlertHistory
+
+    start = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+    with AlertHistory(path) as h:
+        return {s: h.query(symbol=s, start=start) for s in symbols}
+
+def main():
+    ap = argparse.ArgumentParser(description="Publish a manifest plus content-hashed shards for public/index.html.")
+    ap.add_argument("--input", required=True, help="Input alerts JSONL path")
+    ap.add_argument("--output", required=True, help="Output directory (e.g. public)")
+    ap.add_argument("--max", type=int, default=20, help="Max alerts to publish")
+    ap.add_argument("--report", default=None, help="Optional run_report.json to publish as a report shard")
+    ap.add_argument("--history", default=None, help="Optional alert history (alerts.history) for per-symbol shards")
+    ap.add_argument("--history-days", type=int, default=180, help="Days of history per symbol shard")
+    ap.add_argument("--per-symbol", type=int, default=50, help="Max alerts per symbol shard")
+    ap.add_argument("--keep-runs", type=int, default=30, help="Runs listed in the manifest")
+    ap.add_argument("--no-prune", action="store_true", help="Keep shards the manifest no longer references")
+    args = ap.parse_args()
+
+    top = top_alerts(iter_jsonl(Path(args.input)), args.max)
+    report = None
+    if args.report and Path(args.report).exists():
+        try:
+            report = json.loads(Path(args.report).read_text(encoding="utf-8"))
+        except Exception:
+            report = {"error": "failed_to_parse_report"}
+    history = None
+    if args.history and Path(args.history).exists():
+        history = _history_by_symbol(Path(args.history), {str(a.get("symbol")) for a in top}, args.history_days)
+
+    manifest = publish_shards(
+        top, Path(args.output), args.max, report=report, history=history,
+        per_symbol=args.per_symbol, keep_runs=args.keep_runs, prune=not args.no_prune,
+    )
+    print(f"Published {len(manifest['alerts'])} alerts, {len(manifest['symbols'])} symbol shards, {len(manifest['runs'])} runs -> {args.output}")
+
+if __name__ == "__main__":
+    main()
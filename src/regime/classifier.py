@@ -1,20 +1,37 @@
 from __future__ import annotations
 from dataclasses import dataclass
+
 import pandas as pd
 
+from ..features.snapshot import FeatOrRow, latest
+
 @dataclass
 class RegimeResult:
     regime: str
     reasons: list[str]
 
-def classify_regime(bench_feat: pd.DataFrame, vix_last: float | None = None) -> RegimeResult:
-    # use last available row
-    last = bench_feat.dropna().iloc[-1]
+def regime_of(timeline_row: pd.Series) -> RegimeResult:
+    """RegimeResult of one regime.timeline row."""
+    return RegimeResult(str(timeline_row["regime"]), str(timeline_row["reason"]).split(";"))
+
+def classify_regime(bench_feat: FeatOrRow, vix_last: float | None = None, cfg: dict | None = None) -> RegimeResult:
+    """
+    Regime of the last benchmark bar. Given cfg and the benchmark's feature frame it follows
+    config regime.rules, ADX14 included (the last row of regime.timeline.regime_timeline);
+    otherwise the MA-only rules below, which is all a snapshot row supports.
+    """
+    if cfg is not None and isinstance(bench_feat, pd.DataFrame) and not bench_feat.empty:
+        from .timeline import regime_timeline
+
+        return regime_of(regime_timeline(bench_feat, cfg, vix=vix_last).iloc[-1])
+
+    # use last available row (snapshot record)
+    last = latest(bench_feat)
     reasons = []
     close = float(last["close"])
     ma50 = float(last["ma50"])
     ma200 = float(last["ma200"])
-    # Simple TREND / RISK_OFF decision; RANGE will be determined later via ADX proxy (not implemented)
+    # Simple TREND / RISK_OFF decision; RANGE needs ADX history (see regime.timeline)
     close_above_ma200 = close > ma200
     ma50_above_ma200 = ma50 > ma200
 
@@ -0,0 +1,314 @@
+"""
+Regime for every benchmark bar, from the config's regime rules, in one vectorized pass.
+
+    PYTHONPATH=. python -m src.regime.timeline --benchmark SPY --interval 1d --tail 10
+
+Rules are tried in PRECEDENCE order and the first whose conditions all hold (and whose
+vol_guard max_vix passes, where the vol proxy is known) names the bar; a bar no rule claims
+falls back to RANGE. A min_vix guard only confirms: it adds a reason when the vol proxy is
+at or above it, but never moves a bar whose conditions hold (a calm bear market below its
+200-day average is still RISK_OFF, with or without a VIX reading). RegimeCache keeps the timeline per benchmark/interval and extends it by the
+new bars only, resuming the ADX smoothing from the cached rows.
+"""
+from __future__ import annotations
+
+import argparse
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+from typing import Mapping
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from ..common.settings import Condition, RegimeRule, settings_for
+from ..features.cache import bars_digest, feature_version
+from ..features.indicators import adx_frame
+
+# first match wins: a volatility spike overrides everything; TREND (ADX is only optional
+# there) and RISK_OFF exclude each other; RANGE takes what a vol guard or a mixed MA stack
+# left unclaimed when ADX shows no direction
+PRECEDENCE = ("HIGH_VOL", "TREND", "RISK_OFF", "RANGE")
+FALLBACK = ("RANGE", "fallback_range")
+ADX_PERIOD = 14
+ADX_COLUMNS = ("tr14", "plus_dm14", "minus_dm14", "adx14")
+
+_OPS = {"==": np.equal, "!=": np.not_equal, ">=": np.greater_equal, "<=": np.less_equal, ">": np.greater, "<": np.less}
+_VERSIONED = ("timeline.py", "../features/indicators.py", "../common/settings.py")
+
+
+@lru_cache(maxsize=1)
+def timeline_version() -> str:
+    h = hashlib.sha1(feature_version().encode())
+    for name in _VERSIONED:
+        h.update((Path(__file__).parent / name).read_bytes())
+    return h.hexdigest()[:12]
+
+
+def align_vix(timestamps: pd.Series, vix: pd.Series | float | None) -> np.ndarray:
+    """
+    Vol proxy per bar (NaN where unknown): a Series indexed by timestamp is matched as of each
+    bar (last value at or before it); a single number is the current reading, so it only
+    applies to the last bar.
+    """
+    ts = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True))
+    out = np.full(len(ts), np.nan)
+    if vix is None or not len(ts):
+        return out
+    if isinstance(vix, pd.Series):
+        s = vix.dropna()
+        s.index = pd.DatetimeIndex(pd.to_datetime(s.index, utc=True))
+        s = s[~s.index.duplicated(keep="last")].sort_index()
+        return s.reindex(s.index.union(ts)).ffill().reindex(ts).to_numpy(dtype=np.float64)
+    out[-1] = float(vix)
+    return out
+
+
+def _inputs(feat: pd.DataFrame, adx14: np.ndarray, vix: np.ndarray) -> dict[str, np.ndarray]:
+    close = feat["close"].to_numpy(dtype=np.float64)
+    ma50 = feat["ma50"].to_numpy(dtype=np.float64)
+    ma200 = feat["ma200"].to_numpy(dtype=np.float64)
+
+    def flag(x: np.ndarray, known: np.ndarray) -> np.ndarray:
+        return np.where(known, x.astype(np.float64), np.nan)
+
+    with np.errstate(invalid="ignore"):
+        return {
+            "benchmark_close_above_ma200": flag(close > ma200, ~np.isnan(close) & ~np.isnan(ma200)),
+            "benchmark_close_below_ma200": flag(close < ma200, ~np.isnan(close) & ~np.isnan(ma200)),
+            "benchmark_ma50_above_ma200": flag(ma50 > ma200, ~np.isnan(ma50) & ~np.isnan(ma200)),
+            "benchmark_adx14": adx14,
+            "vix": vix,
+        }
+
+
+def _met(c: Condition, inputs: Mapping[str, np.ndarray]) -> np.ndarray:
+    x = inputs[c.variable]
+    with np.errstate(invalid="ignore"):
+        return _OPS[c.op](x, c.value) & ~np.isnan(x)  # unknown never satisfies a condition
+
+
+def classify(inputs: Mapping[str, np.ndarray], rules: Mapping[str, RegimeRule]) -> tuple[np.ndarray, np.ndarray]:
+    """(regime, reason) per bar; reason is the rule's condition labels joined by ';'."""
+    vix = inputs["vix"]
+    n = len(vix)
+    regime = np.full(n, FALLBACK[0], dtype=object)
+    reason = np.full(n, FALLBACK[1], dtype=object)
+    todo = np.ones(n, dtype=bool)
+    known_vix = ~np.isnan(vix)
+    for name in PRECEDENCE:
+        rule = rules.get(name)
+        if rule is None:
+            continue
+        hit = todo.copy()
+        for c in rule.conditions:
+            hit &= _met(c, inputs)
+        if rule.max_vix is not None:
+            with np.errstate(invalid="ignore"):
+                hit &= ~known_vix | (vix <= rule.max_vix)
+        regime[hit] = name
+        reason[hit] = ";".join(c.label for c in rule.conditions)
+        confirm = list(rule.optional)
+        if rule.min_vix is not None:
+            confirm.append(Condition("vix", ">=", rule.min_vix))
+        for c in confirm:
+            extra = hit & _met(c, inputs)
+            reason[extra] = reason[extra] + f";{c.label}"
+        todo &= ~hit
+    return regime, reason
+
+
+def _timeline_rows(feat: pd.DataFrame, vix: np.ndarray, rules: Mapping[str, RegimeRule], prev: dict | None = None) -> pd.DataFrame:
+    parts = adx_frame(feat, ADX_PERIOD, prev=prev)
+    adx14 = parts["adx"].to_numpy(dtype=np.float64)
+    regime, reason = classify(_inputs(feat, adx14, vix), rules)
+    out = pd.DataFrame({"timestamp": pd.to_datetime(feat["timestamp"], utc=True).to_numpy()})
+    out["timestamp"] = pd.to_datetime(out["timestamp"], utc=True)
+    for col, src in zip(ADX_COLUMNS, ("tr", "plus_dm", "minus_dm", "adx")):
+        out[col] = parts[src].to_numpy(dtype=np.float64)
+    out["vix"] = vix
+    out["regime"] = regime.astype(str)
+    out["reason"] = reason.astype(str)
+    return out
+
+
+def regime_timeline(bench_feat: pd.DataFrame, cfg: dict, vix: pd.Series | float | None = None) -> pd.DataFrame:
+    """
+    One row per bar of bench_feat (compute_daily_features output): timestamp, the ADX14
+    parts (tr14, plus_dm14, minus_dm14 smoothed, adx14), vix, regime and reason.
+    """
+    feat = bench_feat.reset_index(drop=True)
+    return _timeline_rows(feat, align_vix(feat["timestamp"], vix), settings_for(cfg).regime_rules)
+
+
+def _resume_state(bars_row: pd.Series, timeline_row: pd.Series) -> dict | None:
+    prev = {
+        "high": float(bars_row["high"]), "low": float(bars_row["low"]), "close": float(bars_row["close"]),
+        "tr": float(timeline_row["tr14"]), "plus_dm": float(timeline_row["plus_dm14"]),
+        "minus_dm": float(timeline_row["minus_dm14"]), "adx": float(timeline_row["adx14"]),
+    }
+    # a gap (NaN bar) changes the smoothing weights of what follows: only resume from a clean row
+    return prev if all(np.isfinite(v) for v in prev.values()) else None
+
+
+def _digest(bars: pd.DataFrame, vix: np.ndarray) -> str:
+    return hashlib.blake2b(bars_digest(bars).encode() + np.ascontiguousarray(vix).tobytes(), digest_size=16).hexdigest()
+
+
+class RegimeCache:
+    """
+    Regime timelines persisted per benchmark/interval under root/interval=/benchmark=/.
+
+    Like features.cache.FeatureCache: the same bars, vol proxy and rules are a hit; bars that
+    only add to (or revise the last overlap_bars of) the cached ones are extended from the
+    checkpoint, so a daily update classifies the new bars only; anything else (revised
+    history, new start, rules or code changed) is recomputed in full.
+    """
+
+    def __init__(self, root: str | Path, overlap_bars: int = 2, memory: bool = False):
+        self.root = Path(root)
+        self.overlap_bars = max(0, int(overlap_bars))
+        self.memory = memory
+        self._mem: dict[tuple[str, str], tuple[dict, pd.DataFrame]] = {}
+        self.hits = 0
+        self.extended = 0
+        self.misses = 0
+        self.rows_incremental = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict, project_root: str | Path, memory: bool = False) -> RegimeCache | None:
+        c = cfg.get("regime", {}).get("timeline_cache", {}) or {}
+        if not c.get("enabled", False):
+            return None
+        return cls(Path(project_root) / c.get("dir", "data/regime"), overlap_bars=int(c.get("overlap_bars", 2)), memory=memory)
+
+    def _dir(self, benchmark: str, interval: str) -> Path:
+        return self.root / f"interval={interval}" / f"benchmark={benchmark}"
+
+    def _load(self, benchmark: str, interval: str, key: str) -> tuple[dict, pd.DataFrame] | None:
+        hit = self._mem.get((benchmark, interval))
+        if hit is not None:
+            return hit if hit[0]["key"] == key else None
+        d = self._dir(benchmark, interval)
+        try:
+            meta = json.loads((d / "meta.json").read_text(encoding="utf-8"))
+            if meta.get("key") != key:
+                return None
+            return meta, pd.read_parquet(d / "timeline.parquet")
+        except (OSError, ValueError):
+            return None
+
+    def timeline(
+        self,
+        benchmark: str,
+        interval: str,
+        bench_feat: pd.DataFrame,
+        cfg: dict,
+        vix: pd.Series | float | None = None,
+    ) -> pd.DataFrame:
+        """regime_timeline(bench_feat, cfg, vix), served from / saved to the cache."""
+        feat = bench_feat.reset_index(drop=True)
+        if feat.empty:
+            return regime_timeline(feat, cfg, vix)
+        rules = settings_for(cfg).regime_rules
+        vix_arr = align_vix(feat["timestamp"], vix)
+        key = hashlib.sha1(f"{timeline_version()}|{json.dumps(cfg['regime']['rules'], sort_keys=True)}".encode()).hexdigest()[:16]
+        n = len(feat)
+        first = pd.Timestamp(feat["timestamp"].iloc[0]).isoformat()
+
+        cached = self._load(benchmark, interval, key)
+        if cached is not None and cached[0]["first_ts"] == first:
+            meta, old = cached
+            if n == meta["rows"] and meta["digest"] == _digest(feat, vix_arr):
+                self.hits += 1
+                return old
+            k = int(meta["checkpoint_rows"])
+            if 0 < k <= n and meta["checkpoint_digest"] == _digest(feat.iloc[:k], vix_arr[:k]):
+                prev = _resume_state(feat.iloc[k - 1], old.iloc[k - 1])
+                if prev is not None:
+                    new = _timeline_rows(feat.iloc[k:], vix_arr[k:], rules, prev=prev)
+                    out = pd.concat([old.iloc[:k], new], ignore_index=True)
+                    self.extended += 1
+                    self.rows_incremental += n - k
+                    self._put(benchmark, interval, key, feat, vix_arr, out)
+                    return out
+
+        self.misses += 1
+        out = _timeline_rows(feat, vix_arr, rules)
+        self._put(benchmark, interval, key, feat, vix_arr, out)
+        return out
+
+    def _put(self, benchmark: str, interval: str, key: str, feat: pd.DataFrame, vix: np.ndarray, out: pd.DataFrame) -> None:
+        n = len(feat)
+        k = max(0, n - self.overlap_bars)
+        meta = {
+            "key": key,
+            "benchmark": benchmark,
+            "interval": interval,
+            "rows": n,
+            "first_ts": pd.Timestamp(feat["timestamp"].iloc[0]).isoformat(),
+            "last_ts": pd.Timestamp(feat["timestamp"].iloc[-1]).isoformat(),
+            "digest": _digest(feat, vix),
+            "checkpoint_rows": k,
+            "checkpoint_digest": _digest(feat.iloc[:k], vix[:k]),
+        }
+        d = self._dir(benchmark, interval)
+        tag = uuid.uuid4().hex[:8]
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            tmp = d / f".timeline-{tag}.parquet"
+            out.to_parquet(tmp, index=False)
+            tmp.replace(d / "timeline.parquet")
+            tmp = d / f".meta-{tag}.json"
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            tmp.replace(d / "meta.json")
+        except OSError:
+            for f in d.glob(f".*-{tag}.*"):
+                f.unlink(missing_ok=True)
+        if self.memory:
+            self._mem[(benchmark, interval)] = (meta, out)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "extended": self.extended, "misses": self.misses, "rows_incremental": self.rows_incremental}
+
+
+def main(argv: list[str] | None = None) -> int:
+    from ..common.config_loader import load_config
+    from ..data.loader import load_local_parquet
+    from ..features.feature_set import compute_daily_features
+
+    ap = argparse.ArgumentParser(description="Regime for every benchmark bar (from the local bar store).")
+    ap.add_argument("--benchmark", default=None, help="Benchmark symbol (default: regime.benchmark)")
+    ap.add_argument("--interval", default="1d")
+    ap.add_argument("--vix", default=None, help="Symbol of the vol proxy in the local bar store (default: none)")
+    ap.add_argument("--tail", type=int, default=10, help="Last bars to print")
+    ap.add_argument("--out", default=None, help="Also write the timeline here (.parquet or .csv)")
+    args = ap.parse_args(argv)
+
+    project_root = Path(__file__).resolve().parents[2]
+    cfg = load_config(project_root)
+    benchmark = args.benchmark or settings_for(cfg).regime_benchmark
+    bench_feat = compute_daily_features(load_local_parquet(benchmark, args.interval, project_root))
+    vix = None
+    if args.vix:
+        v = load_local_parquet(args.vix, args.interval, project_root)
+        vix = pd.Series(v["close"].to_numpy(dtype=np.float64), index=pd.to_datetime(v["timestamp"], utc=True))
+
+    cache = RegimeCache.from_config(cfg, project_root)
+    tl = cache.timeline(benchmark, args.interval, bench_feat, cfg, vix) if cache else regime_timeline(bench_feat, cfg, vix)
+    counts = tl["regime"].value_counts()
+    print(f"{benchmark} {args.interval}: {len(tl)} bars, " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    if cache:
+        print(f"cache: {cache.stats()}")
+    print(tl[["timestamp", "adx14", "vix", "regime", "reason"]].tail(args.tail).to_string(index=False))
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tl.to_csv(out, index=False) if out.suffix == ".csv" else tl.to_parquet(out, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
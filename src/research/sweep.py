@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import itertools
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..common.config_loader import load_compiled, load_yaml
+from ..features.panel import BarPanel, build_bar_panel, compute_panel_features
+from ..strategies import rs_rotation, trend_breakout
+from ..strategies.history import SignalHistory
+
+STRATEGIES = ("TREND_BREAKOUT", "RS_ROTATION")
+# params the live evaluate() reads (settings.TrendBreakoutParams / RsRotationParams), so a
+# selected point can be copied into config.yaml as is
+SWEEP_PARAMS = {
+    "TREND_BREAKOUT": ("require_close_confirm", "stop_atr_multiple", "min_rr"),
+    "RS_ROTATION": ("rs_percentile_min", "stop_atr_multiple", "min_rr"),
+}
+
+SUMMARY_SCHEMA = pa.schema([
+    ("point", pa.int64()),
+    ("strategy", pa.string()),
+    ("params", pa.string()),
+    ("fold", pa.int64()),
+    ("train_start", pa.timestamp("ns", tz="UTC")),
+    ("test_start", pa.timestamp("ns", tz="UTC")),
+    ("test_end", pa.timestamp("ns", tz="UTC")),
+    ("train_trades", pa.int64()),
+    ("train_mean_r", pa.float64()),
+    ("train_hit_rate", pa.float64()),
+    ("test_trades", pa.int64()),
+    ("test_mean_r", pa.float64()),
+    ("test_hit_rate", pa.float64()),
+])
+
+
+class FeatureMemo:
+    """
+    Memo of the features the sweep evaluates on over one bar panel.
+
+    Entries are keyed by (feature, window) and hold the (time x symbol) array. The
+    compute_panel_features set the live scan uses is the "base" entry; "bench_ret" is the
+    benchmark's return over window bars on the panel timeline. Grid points reuse both.
+    """
+
+    def __init__(self, panel: BarPanel, bench: pd.DataFrame | None = None):
+        self.panel = panel
+        self.bench = bench
+        self._cache: dict[tuple[str, int], Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, feature: str, window: int = 0) -> Any:
+        key = (feature, int(window))
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        val = self._compute(feature, int(window))
+        self._cache[key] = val
+        return val
+
+    def _compute(self, feature: str, n: int) -> Any:
+        p = self.panel
+        if feature == "base":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return compute_panel_features(p)
+        if feature == "bench_ret":
+            b = self.bench.dropna(subset=["close"])
+            s = pd.Series(b["close"].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(pd.to_datetime(b["timestamp"], utc=True)))
+            s = (s / s.shift(n) - 1).dropna()
+            return s.reindex(s.index.union(p.timestamps)).ffill().reindex(p.timestamps).to_numpy(dtype=np.float64)
+        raise KeyError(feature)
+
+
+def expand_grid(grid: Mapping[str, Mapping[str, list]]) -> list[tuple[str, dict]]:
+    """
+    {strategy: {param: [values]}} -> [(strategy, params)], every combination.
+
+    Only SWEEP_PARAMS can be swept: the live strategies read their windows from the fixed
+    feature set (high20, ret60, atr14), so a tuned window could never be applied to a scan.
+    """
+    points = []
+    for strategy in STRATEGIES:
+        spec = grid.get(strategy) or {}
+        for key in spec:
+            if key not in SWEEP_PARAMS[strategy]:
+                raise ValueError(f"grid.{strategy}.{key}: not a parameter the live strategy reads ({', '.join(SWEEP_PARAMS[strategy])})")
+        keys = sorted(spec)
+        for values in itertools.product(*(spec[k] for k in keys)):
+            points.append((strategy, dict(zip(keys, values))))
+    return points
+
+
+def walk_forward_folds(n_time: int, train_bars: int, test_bars: int) -> list[tuple[slice, slice]]:
+    """Rolling (train, test) row ranges; each test window follows its train window and the next fold steps by test_bars."""
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_time:
+        folds.append((slice(start, start + train_bars), slice(start + train_bars, start + train_bars + test_bars)))
+        start += test_bars
+    return folds
+
+
+def trade_outcomes(
+    panel: BarPanel,
+    signal: np.ndarray,
+    atr: np.ndarray,
+    stop_atr_multiple: float,
+    rr: float,
+    horizon: int,
+) -> np.ndarray:
+    """
+    R multiple of a trade entered at the close of every signal cell: stop at
+    stop_atr_multiple*ATR below, target rr times the risk above, otherwise closed after
+    horizon bars. The stop wins when both are touched in the same bar. NaN where there is
+    no signal or the horizon runs past the data.
+    """
+    if horizon < 1:
+        raise ValueError(f"horizon must be >= 1 bar, got {horizon}")
+    close, high, low = panel["close"], panel["high"], panel["low"]
+    risk = stop_atr_multiple * atr
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stop = close - risk
+        target = close + rr * risk
+        live = signal & (risk > 0)
+        out = np.full(close.shape, np.nan)
+        done = np.zeros(close.shape, dtype=bool)
+        n_time = close.shape[0]
+        for d in range(1, horizon + 1):
+            if d >= n_time:
+                break
+            lo = np.full_like(low, np.nan)
+            hi = np.full_like(high, np.nan)
+            lo[:-d] = low[d:]
+            hi[:-d] = high[d:]
+            hit_stop = live & ~done & (lo <= stop)
+            out[hit_stop] = -1.0
+            done |= hit_stop
+            hit_target = live & ~done & (hi >= target)
+            out[hit_target] = rr
+            done |= hit_target
+        if horizon < n_time:
+            exit_close = np.full_like(close, np.nan)
+            exit_close[:-horizon] = close[horizon:]
+            rest = live & ~done
+            out[rest] = ((exit_close - close) / risk)[rest]
+        # no full horizon of data after the entry
+        out[max(n_time - horizon, 0):] = np.nan
+    return out
+
+
+def _with_params(cfg: dict, strategy: str, params: dict) -> dict:
+    out = dict(cfg)
+    out["strategies"] = copy.deepcopy(cfg["strategies"])
+    out["strategies"][strategy]["params"].update(params)
+    return out
+
+
+def evaluate_point(
+    memo: FeatureMemo,
+    cfg: dict,
+    score_maps: dict,
+    strategy: str,
+    params: dict,
+) -> tuple[SignalHistory, np.ndarray]:
+    """Signal history for one grid point plus the signal mask after the point's entry gates."""
+    cfg = _with_params(cfg, strategy, params)
+    features = memo.get("base")
+    if strategy == "TREND_BREAKOUT":
+        hist = trend_breakout.evaluate_history(memo.panel, features, cfg, score_maps)
+    else:
+        hist = rs_rotation.evaluate_history(memo.panel, features, memo.get("bench_ret", 60), cfg, score_maps)
+    return hist, hist.signal
+
+
+def _fold_stats(r: np.ndarray) -> tuple[int, float, float]:
+    v = r[~np.isnan(r)]
+    if not len(v):
+        return 0, float("nan"), float("nan")
+    return int(len(v)), float(v.mean()), float((v > 0).mean())
+
+
+def sweep_point(
+    memo: FeatureMemo,
+    cfg: dict,
+    score_maps: dict,
+    point: int,
+    strategy: str,
+    params: dict,
+    folds: list[tuple[slice, slice]],
+    horizon: int,
+) -> list[dict]:
+    """Summary rows (one per fold) for one grid point."""
+    _, signal = evaluate_point(memo, cfg, score_maps, strategy, params)
+    p = {**cfg["strategies"][strategy]["params"], **params}
+    # stops on atr14, as the live trade plans
+    r = trade_outcomes(memo.panel, signal, memo.get("base")["atr14"], float(p["stop_atr_multiple"]), float(p["min_rr"]), horizon)
+
+    ts = memo.panel.timestamps
+    rows = []
+    for k, (train, test) in enumerate(folds):
+        tr_n, tr_mean, tr_hit = _fold_stats(r[train])
+        te_n, te_mean, te_hit = _fold_stats(r[test])
+        rows.append({
+            "point": point,
+            "strategy": strategy,
+            "params": json.dumps(params, sort_keys=True),
+            "fold": k,
+            "train_start": ts[train.start],
+            "test_start": ts[test.start],
+            "test_end": ts[test.stop - 1],
+            "train_trades": tr_n,
+            "train_mean_r": tr_mean,
+            "train_hit_rate": tr_hit,
+            "test_trades": te_n,
+            "test_mean_r": te_mean,
+            "test_hit_rate": te_hit,
+        })
+    return rows
+
+
+# per-process state for pool workers
+_W: dict = {}
+
+
+def _init_worker(panel: BarPanel, bench: pd.DataFrame, cfg: dict, score_maps: dict, folds: list, horizon: int) -> None:
+    _W.update(memo=FeatureMemo(panel, bench), cfg=cfg, score_maps=score_maps, folds=folds, horizon=horizon)
+
+
+def _run_chunk(chunk: list[tuple[int, str, dict]]) -> list[dict]:
+    rows = []
+    for point, strategy, params in chunk:
+        rows.extend(sweep_point(_W["memo"], _W["cfg"], _W["score_maps"], point, strategy, params, _W["folds"], _W["horizon"]))
+    return rows
+
+
+def run_sweep(
+    frames: Mapping[str, pd.DataFrame],
+    bench: pd.DataFrame,
+    cfg: dict,
+    score_maps: dict,
+    grid: Mapping[str, Mapping[str, list]],
+    out_path: str | Path,
+    train_bars: int = 252,
+    test_bars: int = 63,
+    horizon_bars: int = 10,
+    workers: int | None = None,
+) -> int:
+    """
+    Evaluate every grid point on every walk-forward fold and stream the summary to Parquet.
+
+    Grid points are split into chunks and run on a process pool; each worker keeps its own
+    FeatureMemo for the whole sweep. Rows are written one row group per chunk, in grid order,
+    as chunks finish. Returns the number of rows.
+    """
+    for name, value in (("train_bars", train_bars), ("test_bars", test_bars), ("horizon_bars", horizon_bars)):
+        if int(value) < 1:
+            raise ValueError(f"walk_forward.{name} must be >= 1, got {value}")
+    panel = build_bar_panel(frames)
+    folds = walk_forward_folds(panel.shape[0], train_bars, test_bars)
+    points = [(i, s, p) for i, (s, p) in enumerate(expand_grid(grid))]
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    size = max(1, -(-len(points) // (workers * 2)))
+    chunks = [points[i : i + size] for i in range(0, len(points), size)]
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    n_rows = 0
+    with pq.ParquetWriter(out_path, SUMMARY_SCHEMA) as writer:
+        def _write(rows: list[dict]) -> None:
+            nonlocal n_rows
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=SUMMARY_SCHEMA))
+                n_rows += len(rows)
+
+        if workers == 1:
+            _init_worker(panel, bench, cfg, score_maps, folds, horizon_bars)
+            for chunk in chunks:
+                _write(_run_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(panel, bench, cfg, score_maps, folds, horizon_bars),
+            ) as pool:
+                for rows in pool.map(_run_chunk, chunks):
+                    _write(rows)
+    return n_rows
+
+
+def best_per_fold(summary: pd.DataFrame, metric: str = "train_mean_r", min_trades: int = 20) -> pd.DataFrame:
+    """Walk-forward selection: per strategy and fold, the point with the best train metric and its test result."""
+    s = summary[summary["train_trades"] >= min_trades]
+    s = s.sort_values(["strategy", "fold", metric, "point"], ascending=[True, True, False, True])
+    return s.groupby(["strategy", "fold"], as_index=False).head(1).reset_index(drop=True)
+
+
+def _iter_frames(symbols: list[str], interval: str, project_root: Path) -> Iterator[tuple[str, pd.DataFrame]]:
+    from ..data.loader import load_local_parquet
+
+    for sym in symbols:
+        try:
+            yield sym, load_local_parquet(sym, interval, project_root)
+        except FileNotFoundError:
+            print(f"skip {sym}: no local bars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep with walk-forward evaluation.")
+    parser.add_argument("--grid", default="config/sweep_grid.yaml", help="Grid file (see config/sweep_grid.yaml)")
+    parser.add_argument("--watchlist", default="config/watchlist.txt", help="Symbols to load from the local bar store")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--benchmark", default="AAPL", help="Benchmark symbol for RS_ROTATION")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic symbols instead of local bars")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument("--out", default="data/research/sweep.parquet")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parents[2]
+    compiled = load_compiled(project_root)
+    cfg, score_maps = compiled.cfg, compiled.score_maps
+    spec = load_yaml(project_root / args.grid)
+    wf = spec.get("walk_forward", {}) or {}
+
+    if args.synthetic:
+        from ..data.loader import generate_synthetic_bars
+
+        frames = {f"SYN{i:04d}": generate_synthetic_bars(f"SYN{i:04d}", n=1500, seed=100 + i) for i in range(args.synthetic)}
+        bench = generate_synthetic_bars(args.benchmark, n=1500, seed=1)
+    else:
+        wl = project_root / args.watchlist
+        symbols = [s.strip().upper() for s in wl.read_text(encoding="utf-8").splitlines() if s.strip() and not s.startswith("#")]
+        frames = dict(_iter_frames(symbols, args.interval, project_root))
+        bench = frames.get(args.benchmark)
+        if bench is None:
+            raise RuntimeError(f"No local bars for benchmark {args.benchmark}")
+
+    out = project_root / args.out
+    n = run_sweep(
+        frames, bench, cfg, score_maps, spec["grid"], out,
+        train_bars=int(wf.get("train_bars", 252)),
+        test_bars=int(wf.get("test_bars", 63)),
+        horizon_bars=int(wf.get("horizon_bars", 10)),
+        workers=args.workers,
+    )
+    best = best_per_fold(pd.read_parquet(out))
+    print(f"{n} rows -> {out}")
+    if not best.empty:
+        print(best[["strategy", "fold", "params", "train_mean_r", "test_trades", "test_mean_r"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Resident scheduler for config runtime.alert_runs.
+
+    FINNHUB_API_KEY=... python -m src.runtime.daemon --watchlist config/watchlist.txt
+    python -m src.runtime.daemon --once hourly        # one run now, then exit
+    python -m src.runtime.daemon --health             # exit 0 if the status file is fresh and the last run succeeded
+
+Run times are read in meta.timezone: "HH:MM" runs once a day, "every_N_minutes" on wall-clock
+multiples of N minutes. One process keeps the imports, parsed config, bar store and feature
+cache (both in memory), HTTP cache, alert history and rate limiter warm between runs, so a
+run only fetches and computes the bars that are new. Runs execute one at a time on the main
+thread; a slot that passes while a run is in progress is skipped, not queued. The status
+file (runtime.daemon.status_path) is rewritten on every state change and heartbeat.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import re
+import sys
+import time
+from typing import Any, Callable
+from zoneinfo import ZoneInfo
+
+_EVERY = re.compile(r"^every_(\d+)_minutes?$")
+_HHMM = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+
+@dataclass(frozen=True)
+class AlertRun:
+    """One runtime.alert_runs entry."""
+    name: str
+    bar_interval: str
+    run_time_local: str
+
+    def __post_init__(self):
+        if not (_EVERY.match(self.run_time_local) or _HHMM.match(self.run_time_local)):
+            raise ValueError(f"runtime.alert_runs[{self.name}]: unsupported run_time_local {self.run_time_local!r}")
+
+    def next_after(self, now: datetime, trading_days_only: bool = False) -> datetime:
+        """First scheduled time strictly after now (aware, in now's timezone)."""
+        m = _EVERY.match(self.run_time_local)
+        if m:
+            step = int(m.group(1))
+            midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            minutes = (now - midnight) // timedelta(minutes=1)
+            t = midnight + timedelta(minutes=(minutes // step + 1) * step)
+        else:
+            h, mi = (int(g) for g in _HHMM.match(self.run_time_local).groups())
+            t = now.replace(hour=h, minute=mi, second=0, microsecond=0)
+            if t <= now:
+                t = _add_days(t, 1)
+        if trading_days_only and t.weekday() >= 5:
+            t = _add_days(t.replace(hour=0, minute=0) if m else t, 7 - t.weekday())
+        return t
+
+
+def _add_days(t: datetime, days: int) -> datetime:
+    # arithmetic on a ZoneInfo datetime is wall-clock, so "16:10" stays 16:10 across DST
+    return t + timedelta(days=days)
+
+
+def alert_runs_from_config(cfg: dict) -> list[AlertRun]:
+    runs = (cfg.get("runtime", {}) or {}).get("alert_runs", []) or []
+    return [AlertRun(str(r["name"]), str(r["bar_interval"]), str(r["run_time_local"])) for r in runs]
+
+
+def _iso(t: datetime | None) -> str | None:
+    return t.astimezone(timezone.utc).isoformat() if t is not None else None
+
+
+class Scheduler:
+    """
+    Runs execute(run) for each AlertRun when it is due and records status.
+
+    clock returns an aware datetime; sleep is time.sleep (both injectable for tests). execute
+    returns a dict of stats for the status file or raises; a failing run is recorded and the
+    scheduler carries on.
+    """
+
+    def __init__(
+        self,
+        runs: list[AlertRun],
+        tz: str,
+        execute: Callable[[AlertRun], dict],
+        status_path: Path | None = None,
+        trading_days_only: bool = True,
+        heartbeat_s: float = 30.0,
+        clock: Callable[[], datetime] | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if not runs:
+            raise ValueError("runtime.alert_runs is empty")
+        self.runs = runs
+        self.tz = ZoneInfo(tz)
+        self.execute = execute
+        self.status_path = Path(status_path) if status_path is not None else None
+        self.trading_days_only = trading_days_only
+        self.heartbeat_s = float(heartbeat_s)
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.sleep = sleep
+        now = self.now()
+        self.next_at = {r.name: r.next_after(now, trading_days_only) for r in runs}
+        self.status: dict[str, Any] = {
+            "pid": os.getpid(),
+            "started_at_utc": _iso(now),
+            "timezone": tz,
+            "state": "idle",
+            "current": None,
+            "runs_total": 0,
+            "failures": 0,
+            "last_runs": {},
+        }
+        self.write_status()
+
+    def now(self) -> datetime:
+        return self.clock().astimezone(self.tz)
+
+    def write_status(self) -> None:
+        if self.status_path is None:
+            return
+        self.status["heartbeat_utc"] = _iso(self.now())
+        self.status["next_runs"] = {k: _iso(v) for k, v in self.next_at.items()}
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.status_path.with_name(f".{self.status_path.name}.tmp")
+        tmp.write_text(json.dumps(self.status, indent=2), encoding="utf-8")
+        tmp.replace(self.status_path)
+
+    def run_one(self, run: AlertRun) -> dict:
+        started = self.now()
+        self.status.update(state="running", current=run.name)
+        self.write_status()
+        rec: dict[str, Any] = {"bar_interval": run.bar_interval, "started_at_utc": _iso(started)}
+        try:
+            rec.update(self.execute(run) or {})
+            rec["ok"] = True
+        except Exception as e:
+            rec.update(ok=False, error=f"{type(e).__name__}: {e}")
+            self.status["failures"] += 1
+        finished = self.now()
+        rec.update(finished_at_utc=_iso(finished), duration_s=round(finished.timestamp() - started.timestamp(), 3))
+        self.status["runs_total"] += 1
+        self.status["last_runs"][run.name] = rec
+        self.status.update(state="idle", current=None, last_run=run.name)
+        # slots that passed while running are skipped
+        self.next_at[run.name] = run.next_after(finished, self.trading_days_only)
+        self.write_status()
+        return rec
+
+    def step(self) -> dict | None:
+        """Run the earliest due run, or sleep until it is due (at most heartbeat_s). Returns the run record."""
+        run = min(self.runs, key=lambda r: self.next_at[r.name])
+        wait = self.next_at[run.name].timestamp() - self.now().timestamp()
+        if wait > 0:
+            self.sleep(min(wait, self.heartbeat_s))
+            self.write_status()
+            return None
+        return self.run_one(run)
+
+    def run_forever(self, max_runs: int | None = None) -> None:
+        done = 0
+        while max_runs is None or done < max_runs:
+            if self.step() is not None:
+                done += 1
+
+
+def acquire_lock(path: Path) -> Any:
+    """Exclusive lock on path, held while the returned file stays open (one daemon per data dir)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = open(path, "a+")
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - no advisory locks on Windows; one process per machine is on the user
+        return f
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        raise RuntimeError(f"Another scheduler holds {path}")
+    return f
+
+
+def health(status_path: Path, max_age_s: float = 300.0, now: datetime | None = None) -> tuple[bool, str]:
+    """(healthy, reason) from a status file: a recent heartbeat and no failed last run."""
+    try:
+        status = json.loads(Path(status_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        return False, f"no status: {e}"
+    now = now or datetime.now(timezone.utc)
+    age = (now - datetime.fromisoformat(status["heartbeat_utc"])).total_seconds()
+    if age > max_age_s and status.get("state") != "running":
+        return False, f"stale heartbeat ({age:.0f}s)"
+    last = status.get("last_runs", {}).get(status.get("last_run"), {})
+    if last and not last.get("ok", False):
+        return False, f"last run {status['last_run']} failed: {last.get('error')}"
+    return True, "ok"
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Run runtime.alert_runs on schedule in one warm process.")
+    ap.add_argument("--watchlist", default="config/watchlist.txt", help="Path to watchlist file")
+    ap.add_argument("--max-symbols", type=int, default=None, help="Optional cap to avoid rate limits")
+    ap.add_argument("--source", default="yahoo", choices=["yahoo", "finnhub", "parquet"])
+    ap.add_argument("--workers", type=int, default=1, help="Processes for the scan stage (1 = in-process)")
+    ap.add_argument("--once", default=None, metavar="NAME", help="Execute one alert run now and exit")
+    ap.add_argument("--health", action="store_true", help="Check the status file and exit 0 (healthy) or 1")
+    ap.add_argument("--max-age-s", type=float, default=300.0, help="Heartbeat age that --health treats as dead")
+    args = ap.parse_args(argv)
+
+    from ..common.config_loader import load_config
+
+    project_root = Path(__file__).resolve().parents[2]
+    cfg = load_config(project_root)
+    dcfg = (cfg.get("runtime", {}) or {}).get("daemon", {}) or {}
+    status_path = project_root / dcfg.get("status_path", "data/runtime/status.json")
+
+    if args.health:
+        ok, reason = health(status_path, args.max_age_s)
+        print(reason)
+        return 0 if ok else 1
+
+    from ..main import open_live, run_live
+
+    lock = acquire_lock(status_path.with_name(status_path.name + ".lock"))
+    wl = Path(args.watchlist)
+    session = open_live(
+        project_root, wl if wl.is_absolute() else project_root / wl,
+        max_symbols=args.max_symbols, workers=args.workers, source=args.source, memory=True,
+    )
+
+    def execute(run: AlertRun) -> dict:
+        res = run_live(session, run.bar_interval)
+        return {"regime": res.regime["regime"], "stats": res.report["stats"], "wall_s": res.report["timing"]["wall_s"]}
+
+    runs = alert_runs_from_config(cfg)
+    sched = Scheduler(
+        runs, cfg["meta"].get("timezone", "UTC"), execute, status_path,
+        trading_days_only=bool(dcfg.get("trading_days_only", True)),
+        heartbeat_s=float(dcfg.get("heartbeat_s", 30)),
+    )
+    try:
+        if args.once:
+            by_name = {r.name: r for r in runs}
+            if args.once not in by_name:
+                ap.error(f"unknown alert run {args.once!r}; expected one of {sorted(by_name)}")
+            rec = sched.run_one(by_name[args.once])
+            return 0 if rec["ok"] else 1
+        print("Scheduled: " + ", ".join(f"{k} at {v.isoformat()}" for k, v in sched.next_at.items()), flush=True)
+        sched.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sched.status.update(state="stopped", current=None)
+        sched.write_status()
+        session.close()
+        lock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from ..features.snapshot import FeatOrRow, latest
+from ..universe.filter import passes_universe_filters
+from ..strategies import trend_breakout, rs_rotation
+from ..scoring.scorer import total_score
+from ..alerts.builder import build_alert
+from ..alerts.history import Cooldown
+from ..common.settings import Settings, compile_config, remember
+
+
+@dataclass
+class ScanContext:
+    """Everything a symbol's scan needs besides its own features (picklable, sent once per worker)."""
+    cfg: dict
+    maps: dict
+    regime_name: str
+    regime: dict
+    bench_feat: pd.DataFrame
+    data_provenance: dict
+    min_history: int = 0
+    rs_ranks: dict[str, tuple[float, float]] = field(default_factory=dict)
+    bench_row: np.void | None = None
+    cooldown: Cooldown | None = None
+    settings: Settings | None = None
+
+    def __post_init__(self):
+        # compiled (and validated) here, from the dict as it is when the scan starts
+        self.settings = remember(self.cfg, compile_config(self.cfg))
+        if self.bench_row is None:
+            self.bench_row = latest(self.bench_feat)
+
+
+@dataclass
+class ScanOutcome:
+    symbol: str
+    skip_reason: str | None = None
+    passed_filters: bool = False
+    alerts: list[dict] = field(default_factory=list)
+    error: str | None = None
+    suppressed: list[str] = field(default_factory=list)
+
+
+def _emit(out: ScanOutcome, raw: dict | None, ctx: ScanContext) -> None:
+    if not raw:
+        return
+    # same symbol/setup alerted within the cooldown window (alerts.history)
+    if ctx.cooldown is not None and ctx.cooldown.blocks(out.symbol, raw["setup_name"]):
+        out.suppressed.append(raw["setup_name"])
+        return
+    tscore = total_score(raw["scores"]["components"], ctx.settings.weights)
+    out.alerts.append(build_alert(raw, ctx.cfg, tscore, ctx.regime, data_provenance=ctx.data_provenance))
+
+
+def scan_symbol(sym: str, feat: FeatOrRow, ctx: ScanContext, rs_rank: tuple[float, float] | None = None) -> ScanOutcome:
+    """
+    History guard -> universe filter -> strategies -> score -> alert for one symbol.
+    feat is the symbol's feature frame or, cheaper, its snapshot record (features.snapshot).
+    """
+    cfg = ctx.cfg
+    out = ScanOutcome(sym)
+    if rs_rank is None:
+        rs_rank = ctx.rs_ranks.get(sym)
+    try:
+        row = latest(feat)
+
+        # Min history guard
+        if row["n_valid"] == 0 or row["n_valid"] < ctx.min_history:
+            out.skip_reason = "insufficient_history"
+            return out
+
+        if not passes_universe_filters(row, cfg):
+            out.skip_reason = "universe_filter"
+            return out
+
+        out.passed_filters = True
+
+        if ctx.regime_name in ctx.settings.trend_breakout.allowed_regimes:
+            _emit(out, trend_breakout.evaluate(sym, row, cfg, ctx.maps), ctx)
+
+        if ctx.regime_name in ctx.settings.rs_rotation.allowed_regimes:
+            _emit(out, rs_rotation.evaluate(sym, row, ctx.bench_row, cfg, ctx.maps, rs_rank=rs_rank), ctx)
+
+    except Exception as e:
+        out.error = str(e)
+    return out
+
+
+def merge_outcome(report: dict, alerts: list[dict], outcome: ScanOutcome) -> None:
+    """Fold one symbol's outcome into the run report and alert list."""
+    report["stats"]["scanned"] += 1
+    alerts.extend(outcome.alerts)
+    if outcome.skip_reason is not None:
+        report["stats"]["skipped"] += 1
+        report["skipped_items"].append({"symbol": outcome.symbol, "reason": outcome.skip_reason})
+    if outcome.passed_filters:
+        report["stats"]["passed_filters"] += 1
+    if outcome.suppressed:
+        report["stats"]["suppressed"] = report["stats"].get("suppressed", 0) + len(outcome.suppressed)
+    if outcome.error is not None:
+        report["stats"]["errors"] += 1
+        report["errors"].append({"symbol": outcome.symbol, "stage": "scan", "message": outcome.error})
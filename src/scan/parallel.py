@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import traceback
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..common.settings import remember
+from ..features.cross_section import rank_snapshot_rs
+from ..features.panel import BAR_COLUMNS, FEATURE_COLUMNS, BarPanel, build_bar_panel, compute_panel_features
+from ..features.snapshot import snapshot_from_panel
+from .core import ScanContext, ScanOutcome, scan_symbol
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Where the shared panels live; this (not the arrays) is what workers receive."""
+    bars_name: str
+    feats_name: str
+    n_time: int
+    n_sym: int
+
+
+# per-worker state set by _init_worker
+_W: dict = {}
+
+
+def _views(layout: _Layout, bars_buf, feats_buf) -> tuple[np.ndarray, np.ndarray]:
+    t, n = layout.n_time, layout.n_sym
+    bars = np.ndarray((len(BAR_COLUMNS), t, n), dtype=np.float64, buffer=bars_buf)
+    feats = np.ndarray((len(FEATURE_COLUMNS), t, n), dtype=np.float64, buffer=feats_buf)
+    return bars, feats
+
+
+def _init_worker(layout: _Layout, timestamps: pd.DatetimeIndex, symbols: list[str], ctx: ScanContext) -> None:
+    bars_shm = shared_memory.SharedMemory(name=layout.bars_name)
+    feats_shm = shared_memory.SharedMemory(name=layout.feats_name)
+    bars, feats = _views(layout, bars_shm.buf, feats_shm.buf)
+    _W.update(bars_shm=bars_shm, feats_shm=feats_shm, bars=bars, feats=feats, timestamps=timestamps, symbols=symbols, ctx=ctx)
+    remember(ctx.cfg, ctx.settings)  # ctx.cfg arrived as a copy: reuse the compiled settings for it
+
+
+def _slice_panel(j0: int, j1: int) -> BarPanel:
+    bars = _W["bars"]
+    return BarPanel(_W["timestamps"], _W["symbols"][j0:j1], {c: bars[i, :, j0:j1] for i, c in enumerate(BAR_COLUMNS)})
+
+
+def _features_task(j0: int, j1: int) -> None:
+    feats = compute_panel_features(_slice_panel(j0, j1))
+    out = _W["feats"]
+    for i, c in enumerate(FEATURE_COLUMNS):
+        out[i, :, j0:j1] = feats[c]
+
+
+def _slice_features(j0: int, j1: int) -> dict[str, np.ndarray]:
+    feats = _W["feats"]
+    return {c: feats[i, :, j0:j1] for i, c in enumerate(FEATURE_COLUMNS)}
+
+
+def _scan_task(j0: int, j1: int, rs_ranks: dict[str, tuple[float, float]]) -> list[ScanOutcome]:
+    panel = _slice_panel(j0, j1)
+    snap = snapshot_from_panel(panel, _slice_features(j0, j1))
+    ctx: ScanContext = _W["ctx"]
+    return [scan_symbol(sym, row, ctx, rs_rank=rs_ranks.get(sym)) for sym, row in zip(panel.symbols, snap)]
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    # unlink even when close() fails, so a failed scan never leaves a segment behind
+    try:
+        shm.close()
+    finally:
+        shm.unlink()
+
+
+def _scan_shared(
+    panel: BarPanel,
+    ctx: ScanContext,
+    workers: int,
+    ranges: list[tuple[int, int]],
+    bars_shm: shared_memory.SharedMemory,
+    feats_shm: shared_memory.SharedMemory,
+) -> list[ScanOutcome]:
+    n_time, n_sym = panel.shape
+    bars = feats = full = snap = None
+    try:
+        layout = _Layout(bars_shm.name, feats_shm.name, n_time, n_sym)
+        bars, feats = _views(layout, bars_shm.buf, feats_shm.buf)
+        for i, c in enumerate(BAR_COLUMNS):
+            bars[i] = panel[c]
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(layout, panel.timestamps, panel.symbols, ctx),
+        ) as pool:
+            list(pool.map(_features_task, *zip(*ranges)))
+
+            full = BarPanel(panel.timestamps, panel.symbols, {c: bars[i] for i, c in enumerate(BAR_COLUMNS)})
+            snap = snapshot_from_panel(full, {c: feats[i] for i, c in enumerate(FEATURE_COLUMNS)})
+            rs_ranks = rank_snapshot_rs(snap, ctx.bench_row, ctx.min_history)
+
+            results = pool.map(
+                _scan_task,
+                [j0 for j0, _ in ranges],
+                [j1 for _, j1 in ranges],
+                [{s: rs_ranks[s] for s in panel.symbols[j0:j1] if s in rs_ranks} for j0, j1 in ranges],
+            )
+            return [o for chunk in results for o in chunk]
+    except BaseException as e:
+        # frames kept alive by the traceback may still hold views of the buffers
+        traceback.clear_frames(e.__traceback__)
+        raise
+    finally:
+        # the views export the shared buffers; close() raises BufferError while any is alive
+        bars = feats = full = snap = None
+
+
+def scan_parallel(
+    frames: Mapping[str, pd.DataFrame],
+    ctx: ScanContext,
+    workers: int,
+    chunk_size: int | None = None,
+) -> list[ScanOutcome]:
+    """
+    Features + ranking + filter/strategy/score stage on a process pool.
+
+    Bars go to the workers once through shared memory as a (field x time x symbol) panel;
+    workers write features into a second shared panel, the parent ranks relative strength on
+    its snapshot, and workers then scan the snapshot records of their column ranges. Outcomes come back in the input symbol
+    order, so merging is deterministic whatever the worker count.
+    """
+    panel = build_bar_panel(frames)
+    n_time, n_sym = panel.shape
+    if n_sym == 0:
+        return []
+
+    workers = max(1, int(workers))
+    chunk_size = chunk_size or max(1, -(-n_sym // (workers * 4)))
+    ranges = [(j, min(j + chunk_size, n_sym)) for j in range(0, n_sym, chunk_size)]
+
+    nbytes_bars = len(BAR_COLUMNS) * n_time * n_sym * 8
+    nbytes_feats = len(FEATURE_COLUMNS) * n_time * n_sym * 8
+    bars_shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes_bars))
+    try:
+        feats_shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes_feats))
+        try:
+            outcomes = _scan_shared(panel, ctx, workers, ranges, bars_shm, feats_shm)
+        finally:
+            _release(feats_shm)
+    finally:
+        _release(bars_shm)
+
+    return outcomes
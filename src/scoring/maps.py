@@ -1,6 +1,12 @@
 from __future__ import annotations
+from bisect import bisect_left
 from typing import Any
 
+import numpy as np
+
+_OPS = ("lte", "lt", "gte", "gt")
+
+
 def piecewise_score(value: float, rules: list[dict[str, Any]]) -> int:
     for r in rules:
         if "lte" in r and value <= float(r["lte"]):
@@ -12,3 +18,62 @@ def piecewise_score(value: float, rules: list[dict[str, Any]]) -> int:
         if "gt" in r and value > float(r["gt"]):
             return int(r["score"])
     return 0
+
+
+class CompiledScoreMap:
+    """
+    A piecewise rule list compiled to sorted breakpoints.
+
+    The k distinct thresholds split the real line into 2k+1 pieces (the open gaps and the
+    thresholds themselves); every lt/lte/gt/gte test is constant on each piece, so the
+    first-match score is worked out once per piece with piecewise_score itself. A lookup is
+    then a binary search plus an equality check. NaN scores 0, as with piecewise_score.
+    """
+
+    def __init__(self, rules: list[dict[str, Any]]):
+        bounds = sorted({float(r[op]) for r in rules for op in _OPS if op in r})
+        self.bounds = np.array(bounds, dtype=np.float64)
+        self._bounds = bounds
+        probes = []
+        for i, b in enumerate(bounds):
+            probes.append(np.nextafter(b, -np.inf) if i == 0 else np.nextafter(bounds[i - 1], np.inf))
+            probes.append(b)
+        probes.append(np.nextafter(bounds[-1], np.inf) if bounds else 0.0)
+        self.scores = np.array([piecewise_score(float(p), rules) for p in probes], dtype=np.int64)
+        self._scores = [int(s) for s in self.scores]
+
+    def __call__(self, value: float) -> int:
+        x = float(value)
+        if x != x:
+            return 0
+        i = bisect_left(self._bounds, x)
+        exact = i < len(self._bounds) and self._bounds[i] == x
+        return self._scores[2 * i + 1 if exact else 2 * i]
+
+    def score(self, values: Any) -> np.ndarray:
+        """Vectorized lookup; same shape as values, int64."""
+        x = np.asarray(values, dtype=np.float64)
+        i = np.searchsorted(self.bounds, x, side="left")
+        hit = np.take(self.bounds, np.minimum(i, len(self.bounds) - 1)) == x if len(self.bounds) else np.zeros(x.shape, bool)
+        out = self.scores[2 * i + hit]
+        return np.where(np.isnan(x), 0, out)
+
+
+def compile_score_maps(score_maps: dict) -> dict[str, CompiledScoreMap]:
+    """Compile every rule list under score_maps["maps"]."""
+    return {name: CompiledScoreMap(rules) for name, rules in score_maps["maps"].items()}
+
+
+_COMPILED: dict[int, tuple[dict, dict[str, CompiledScoreMap]]] = {}
+
+
+def compiled_maps(score_maps: dict) -> dict[str, CompiledScoreMap]:
+    """compile_score_maps, memoized on the loaded score_maps dict (compiled once per load)."""
+    hit = _COMPILED.get(id(score_maps))
+    if hit is not None and hit[0] is score_maps:
+        return hit[1]
+    compiled = compile_score_maps(score_maps)
+    if len(_COMPILED) >= 8:
+        _COMPILED.clear()
+    _COMPILED[id(score_maps)] = (score_maps, compiled)
+    return compiled
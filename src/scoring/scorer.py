@@ -1,13 +1,59 @@
 from __future__ import annotations
+from typing import Iterable
+
+import numpy as np
+
+# weighted components, in accumulation order; the penalty is added unweighted
+COMPONENT_KEYS = ("regime_fit", "trend_momo", "mean_reversion", "volume_flow", "risk_reward", "liquidity", "event_risk_penalty")
+
+
+def weight_vector(weights: dict) -> np.ndarray:
+    """Weights in COMPONENT_KEYS order; event_risk_penalty (negative or 0) counts in full."""
+    return np.array([float(weights.get(k, 0)) for k in COMPONENT_KEYS[:-1]] + [1.0], dtype=np.float64)
+
+
+def components_matrix(components: Iterable[dict]) -> np.ndarray:
+    """Stack component dicts into an (n x len(COMPONENT_KEYS)) float array; missing keys are 0."""
+    rows = [[c.get(k, 0) for k in COMPONENT_KEYS] for c in components]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(COMPONENT_KEYS))
+
+
+def total_scores(components: np.ndarray, weights: dict | np.ndarray) -> np.ndarray:
+    """
+    Weighted totals for a whole components matrix (rows = alerts, symbols or dates).
+
+    The dot product is accumulated column by column in COMPONENT_KEYS order, which is the
+    same sequence of float operations as total_score, so each row equals total_score of the
+    matching dict exactly (rounding included).
+    """
+    m = np.asarray(components, dtype=np.float64)
+    w = weight_vector(weights) if isinstance(weights, dict) else np.asarray(weights, dtype=np.float64)
+    s = np.zeros(m.shape[:-1])
+    for j in range(len(COMPONENT_KEYS)):
+        s = s + m[..., j] * w[j]
+    return round2(s)
+
+
+def round2(x: np.ndarray) -> np.ndarray:
+    """
+    round(v, 2) for every element, vectorized. np.round scales by 100 first, which can land
+    on the other side of a half-way point than Python's exact rounding; only values that
+    close to a tie are rounded again in Python.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.round(x, 2)
+    with np.errstate(invalid="ignore"):
+        scaled = x * 100.0
+        tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if tie.any():
+        out[tie] = [round(float(v), 2) for v in x[tie]]
+    return out
+
 
 def total_score(components: dict, weights: dict) -> float:
     s = 0.0
-    s += components.get("regime_fit", 0) * weights.get("regime_fit", 0)
-    s += components.get("trend_momo", 0) * weights.get("trend_momo", 0)
-    s += components.get("mean_reversion", 0) * weights.get("mean_reversion", 0)
-    s += components.get("volume_flow", 0) * weights.get("volume_flow", 0)
-    s += components.get("risk_reward", 0) * weights.get("risk_reward", 0)
-    s += components.get("liquidity", 0) * weights.get("liquidity", 0)
+    for k in COMPONENT_KEYS[:-1]:
+        s += components.get(k, 0) * weights.get(k, 0)
     # penalty is negative or 0; add directly
     s += components.get("event_risk_penalty", 0)
     return round(float(s), 2)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..features.panel import BAR_COLUMNS, FEATURE_COLUMNS, BarPanel
+from ..scoring.scorer import COMPONENT_KEYS, total_scores
+
+
+@dataclass
+class SignalHistory:
+    """
+    A strategy evaluated on every (date x symbol) cell of a panel.
+
+    valid marks cells whose feature row is complete (the rows evaluate() can pick as
+    feat.dropna().iloc[-1]); signal marks cells where evaluate() on that row would return
+    an alert. conditions holds the strategy's intermediate arrays (breakout, rs, ...);
+    points, components and total are NaN outside valid.
+    """
+    timestamps: pd.DatetimeIndex
+    symbols: list[str]
+    valid: np.ndarray
+    signal: np.ndarray
+    points: np.ndarray
+    components: dict[str, np.ndarray]
+    total: np.ndarray
+    conditions: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """One matrix (signal, total, a component or a condition) as a date x symbol frame."""
+        arr = getattr(self, name) if name in ("valid", "signal", "points", "total") else self.components.get(name, self.conditions.get(name))
+        if arr is None:
+            raise KeyError(name)
+        return pd.DataFrame(arr, index=self.timestamps, columns=self.symbols)
+
+
+def complete_rows(panel: BarPanel, features: Mapping[str, np.ndarray]) -> np.ndarray:
+    """(time x symbol) mask of cells with every bar and feature present."""
+    ok = np.ones(panel.shape, dtype=bool)
+    for c in BAR_COLUMNS:
+        ok &= ~np.isnan(panel[c])
+    for c in FEATURE_COLUMNS:
+        ok &= ~np.isnan(features[c])
+    return ok
+
+
+def bench_on_timeline(bench_feat: pd.DataFrame, timestamps: pd.DatetimeIndex, column: str = "ret60") -> np.ndarray:
+    """
+    Benchmark column on the panel timeline as of each date: the value from the benchmark's
+    latest complete row at or before that date (bench_feat.dropna().iloc[-1] on a truncated frame).
+    """
+    b = bench_feat.dropna()
+    s = pd.Series(b[column].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(pd.to_datetime(b["timestamp"], utc=True)))
+    s = s[~s.index.duplicated(keep="last")].sort_index()
+    return s.reindex(s.index.union(timestamps)).ffill().reindex(timestamps).to_numpy(dtype=np.float64)
+
+
+def finish_history(
+    panel: BarPanel,
+    valid: np.ndarray,
+    signal: np.ndarray,
+    points: np.ndarray,
+    components: dict[str, np.ndarray],
+    weights: dict,
+    conditions: dict[str, np.ndarray],
+) -> SignalHistory:
+    """Mask everything to valid cells and add the weighted total."""
+    comps = {k: np.where(valid, np.asarray(components.get(k, 0), dtype=np.float64), np.nan) for k in COMPONENT_KEYS}
+    total = total_scores(np.stack([comps[k] for k in COMPONENT_KEYS], axis=-1), weights)
+    return SignalHistory(
+        timestamps=panel.timestamps,
+        symbols=list(panel.symbols),
+        valid=valid,
+        signal=signal & valid,
+        points=np.where(valid, points, np.nan),
+        components=comps,
+        total=total,
+        conditions=conditions,
+    )
@@ -1,40 +1,70 @@
 from __future__ import annotations
-import pandas as pd
-from ..scoring.maps import piecewise_score
-
-def evaluate(symbol: str, feat: pd.DataFrame, bench_feat: pd.DataFrame, cfg: dict, score_maps: dict) -> dict | None:
-    p = cfg["strategies"]["RS_ROTATION"]["params"]
-    last = feat.dropna().iloc[-1]
-    bench_last = bench_feat.dropna().iloc[-1]
-
-    # relative strength proxy: 60d return difference
-    rs = float(last.get("ret60", 0.0)) - float(bench_last.get("ret60", 0.0))
-    # percentile requires cross-sectional ranking; for starter we approximate with mapping on rs itself
-    # You will replace this with real percentile ranking across universe.
+from typing import Mapping
+
+import numpy as np
+from ..features.cross_section import percentile_rank
+from ..features.panel import BarPanel
+from ..features.snapshot import FeatOrRow, latest
+from ..common.settings import settings_for
+from ..scoring.maps import compiled_maps
+from .history import SignalHistory, complete_rows, finish_history
+
+def _rs_pct_proxy(rs: float) -> float:
+    # single-symbol fallback when no universe ranking is available
     # Map: rs >= 0.10 -> high; rs >= 0.05 -> medium; else low.
     if rs >= 0.10:
-        rs_pct = 0.95
-    elif rs >= 0.05:
-        rs_pct = 0.85
-    elif rs >= 0.00:
-        rs_pct = 0.70
+        return 0.95
+    if rs >= 0.05:
+        return 0.85
+    if rs >= 0.00:
+        return 0.70
+    return 0.50
+
+
+def evaluate(
+    symbol: str,
+    feat: FeatOrRow,
+    bench_feat: FeatOrRow,
+    cfg: dict,
+    score_maps: dict,
+    rs_rank: tuple[float, float] | None = None,
+) -> dict | None:
+    """
+    rs_rank is (rs, rs_percentile) from features.cross_section.rank_latest_rs. With it the
+    setup requires rs_percentile >= rs_percentile_min; without it a bucketed proxy is used.
+    """
+    settings = settings_for(cfg)
+    s = settings.rs_rotation
+    p = s.params
+    maps = compiled_maps(score_maps)
+    last = latest(feat)
+
+    if rs_rank is not None:
+        rs, rs_pct = rs_rank
+        if rs_pct < p.rs_percentile_min:
+            return None
+        pct_label = "RS percentile (universe rank)"
     else:
-        rs_pct = 0.50
+        bench_last = latest(bench_feat)
+        # relative strength proxy: 60d return difference
+        rs = float(last["ret60"]) - float(bench_last["ret60"])
+        rs_pct = _rs_pct_proxy(rs)
+        pct_label = "RS percentile proxy"
 
-    rs_score = piecewise_score(rs_pct, score_maps["maps"]["rs_percentile"])
+    rs_score = maps["rs_percentile"](rs_pct)
 
     # trend health
     points = 0
     points += 1 if float(last["close"]) > float(last["ma50"]) else 0
     points += 1 if float(last["ma50"]) > float(last["ma200"]) else 0
     points += 1 if float(last["ma50_slope"]) > 0 else 0
-    trend_score = piecewise_score(points, score_maps["maps"]["trend_structure_points"])
+    trend_score = maps["trend_structure_points"](points)
 
-    rr = float(p["min_rr"])
-    rr_score = piecewise_score(rr, score_maps["maps"]["rr"])
+    rr = p.min_rr
+    rr_score = maps["rr"](rr)
 
     dollar_vol = float(last["close"]) * float(last["vol20"])
-    liq_score = piecewise_score(dollar_vol, score_maps["maps"]["avg_dollar_volume_20d"])
+    liq_score = maps["avg_dollar_volume_20d"](dollar_vol)
 
     components = {
         "regime_fit": 90,
@@ -49,20 +79,76 @@ def evaluate(symbol: str, feat: pd.DataFrame, bench_feat: pd.DataFrame, cfg: dic
     return {
         "symbol": symbol,
         "setup_name": "RS_ROTATION",
-        "pool": cfg["strategies"]["RS_ROTATION"]["pool_default"],
+        "pool": s.pool_default,
         "direction": "LONG",
         "action": "WATCH",  # usually rotation is a watchlist unless price trigger hit
         "scores": {"components": components},
         "evidence": [
-            f"RS proxy (ret60 diff vs benchmark): {rs:.3f}",
-            f"RS percentile proxy: {rs_pct:.2f}",
+            f"RS (ret60 diff vs benchmark): {rs:.3f}",
+            f"{pct_label}: {rs_pct:.2f}",
             f"Trend health points: {points}/3"
         ],
         "trade_plan": {
             "entry": {"trigger_type": "LIMIT_ENTRY", "entry_zone": [float(last["ma20"]), float(last["ma50"])]},
             "invalidation": {"rule": "CLOSE_BELOW_LEVEL", "price": float(last["ma50"])},
-            "stop": {"stop_type": "VOLATILITY_ATR", "atr_multiple": float(p["stop_atr_multiple"])},
+            "stop": {"stop_type": "VOLATILITY_ATR", "atr_multiple": p.stop_atr_multiple},
             "targets": [{"name": "T1", "rr": rr, "size_pct": 1.0}],
-            "position_sizing": {"max_risk_pct_of_equity": cfg["scoring"]["pools"]["CORE"]["max_risk_pct_of_equity"]}
+            "position_sizing": {"max_risk_pct_of_equity": settings.core.max_risk_pct_of_equity}
         }
     }
+
+
+def evaluate_history(
+    panel: BarPanel,
+    features: Mapping[str, np.ndarray],
+    bench_ret60: np.ndarray,
+    cfg: dict,
+    score_maps: dict,
+    universe_rank: bool = True,
+    min_history: int = 0,
+) -> SignalHistory:
+    """
+    evaluate() for every date and symbol at once. bench_ret60 is the benchmark's ret60 on the
+    panel timeline (history.bench_on_timeline). With universe_rank each date is ranked across
+    the symbols that have a complete row then (and at least min_history complete rows so far),
+    as rank_universe_rs does for the latest date; otherwise the bucketed proxy is used.
+    """
+    settings = settings_for(cfg)
+    p = settings.rs_rotation.params
+    maps = compiled_maps(score_maps)
+    valid = complete_rows(panel, features)
+    close = panel["close"]
+
+    rs = features["ret60"] - np.asarray(bench_ret60, dtype=np.float64)[:, None]
+    if universe_rank:
+        ranked = valid & (np.cumsum(valid, axis=0) >= max(min_history, 1))
+        rs_pct = percentile_rank(np.where(ranked, rs, np.nan), axis=1)
+        with np.errstate(invalid="ignore"):
+            signal = rs_pct >= p.rs_percentile_min
+    else:
+        with np.errstate(invalid="ignore"):
+            rs_pct = np.select([rs >= 0.10, rs >= 0.05, rs >= 0.00], [0.95, 0.85, 0.70], 0.50)
+        signal = ~np.isnan(rs)
+    rs_score = maps["rs_percentile"].score(rs_pct)
+
+    with np.errstate(invalid="ignore"):
+        points = (
+            (close > features["ma50"]).astype(np.int64)
+            + (features["ma50"] > features["ma200"])
+            + (features["ma50_slope"] > 0)
+        )
+    trend_score = maps["trend_structure_points"].score(points)
+
+    components = {
+        "regime_fit": 90,
+        "trend_momo": np.trunc(0.6 * rs_score + 0.4 * trend_score),
+        "mean_reversion": 0,
+        "volume_flow": 50,
+        "risk_reward": maps["rr"](p.min_rr),
+        "liquidity": maps["avg_dollar_volume_20d"].score(close * features["vol20"]),
+        "event_risk_penalty": 0,
+    }
+    return finish_history(
+        panel, valid, signal, points, components, settings.weights,
+        conditions={"rs": np.where(valid, rs, np.nan), "rs_pct": np.where(valid, rs_pct, np.nan)},
+    )
@@ -1,18 +1,27 @@
 from __future__ import annotations
-import pandas as pd
-from ..scoring.maps import piecewise_score
+from typing import Mapping
 
-def evaluate(symbol: str, feat: pd.DataFrame, cfg: dict, score_maps: dict) -> dict | None:
-    p = cfg["strategies"]["TREND_BREAKOUT"]["params"]
-    last = feat.dropna().iloc[-1]
+import numpy as np
+from ..features.panel import BarPanel
+from ..features.snapshot import FeatOrRow, latest
+from ..common.settings import settings_for
+from ..scoring.maps import compiled_maps
+from .history import SignalHistory, complete_rows, finish_history
+
+def evaluate(symbol: str, feat: FeatOrRow, cfg: dict, score_maps: dict) -> dict | None:
+    settings = settings_for(cfg)
+    s = settings.trend_breakout
+    p = s.params
+    maps = compiled_maps(score_maps)
+    last = latest(feat)
 
     # simple breakout condition: close >= 20d high (using high20 as rolling max of close in this starter)
     breakout = float(last["close"]) >= float(last["high20"])
-    if not breakout and bool(p["require_close_confirm"]):
+    if not breakout and p.require_close_confirm:
         return None
 
-    vol_mult = float(last.get("vol_multiple", 0.0))
-    vol_score = piecewise_score(vol_mult, score_maps["maps"]["volume_multiple"])
+    vol_mult = float(last["vol_multiple"])
+    vol_score = maps["volume_multiple"](vol_mult)
 
     # trend structure points (0-4)
     points = 0
@@ -20,15 +29,15 @@ def evaluate(symbol: str, feat: pd.DataFrame, cfg: dict, score_maps: dict) -> di
     points += 1 if float(last["ma50"]) > float(last["ma200"]) else 0
     points += 1 if float(last["ma50_slope"]) > 0 else 0
     points += 1 if breakout else 0
-    trend_score = piecewise_score(points, score_maps["maps"]["trend_structure_points"])
+    trend_score = maps["trend_structure_points"](points)
 
     # risk-reward proxy: require min_rr in config; score mapping uses rr
-    rr = float(p["min_rr"])
-    rr_score = piecewise_score(rr, score_maps["maps"]["rr"])
+    rr = p.min_rr
+    rr_score = maps["rr"](rr)
 
     # liquidity: based on dollar volume proxy
     dollar_vol = float(last["close"]) * float(last["vol20"])
-    liq_score = piecewise_score(dollar_vol, score_maps["maps"]["avg_dollar_volume_20d"])
+    liq_score = maps["avg_dollar_volume_20d"](dollar_vol)
 
     # assemble
     components = {
@@ -44,7 +53,7 @@ def evaluate(symbol: str, feat: pd.DataFrame, cfg: dict, score_maps: dict) -> di
     return {
         "symbol": symbol,
         "setup_name": "TREND_BREAKOUT",
-        "pool": cfg["strategies"]["TREND_BREAKOUT"]["pool_default"],
+        "pool": s.pool_default,
         "direction": "LONG",
         "action": "BUY",
         "scores": {"components": components},
@@ -56,8 +65,44 @@ def evaluate(symbol: str, feat: pd.DataFrame, cfg: dict, score_maps: dict) -> di
         "trade_plan": {
             "entry": {"trigger_type": "CLOSE_CONFIRM", "trigger_price": float(last["close"])},
             "invalidation": {"rule": "CLOSE_BELOW_LEVEL", "price": float(last["high20"])},
-            "stop": {"stop_type": "VOLATILITY_ATR", "atr_multiple": float(p["stop_atr_multiple"])},
-            "targets": [{"name": "T1", "rr": float(t["rr"]), "size_pct": float(t["size_pct"])} for t in p["targets"]],
-            "position_sizing": {"max_risk_pct_of_equity": cfg["scoring"]["pools"]["CORE"]["max_risk_pct_of_equity"]}
+            "stop": {"stop_type": "VOLATILITY_ATR", "atr_multiple": p.stop_atr_multiple},
+            "targets": [{"name": "T1", "rr": t.rr, "size_pct": t.size_pct} for t in p.targets],
+            "position_sizing": {"max_risk_pct_of_equity": settings.core.max_risk_pct_of_equity}
         }
     }
+
+
+def evaluate_history(panel: BarPanel, features: Mapping[str, np.ndarray], cfg: dict, score_maps: dict) -> SignalHistory:
+    """
+    evaluate() for every date and symbol at once (panel/features as from features.panel).
+    Each cell gets the result evaluate() would give if that row were the symbol's latest.
+    """
+    settings = settings_for(cfg)
+    p = settings.trend_breakout.params
+    maps = compiled_maps(score_maps)
+    valid = complete_rows(panel, features)
+    close = panel["close"]
+
+    with np.errstate(invalid="ignore"):
+        breakout = close >= features["high20"]
+        points = (
+            (close > features["ma50"]).astype(np.int64)
+            + (features["ma50"] > features["ma200"])
+            + (features["ma50_slope"] > 0)
+            + breakout
+        )
+    signal = breakout if p.require_close_confirm else np.ones_like(valid)
+
+    components = {
+        "regime_fit": 90,
+        "trend_momo": maps["trend_structure_points"].score(points),
+        "mean_reversion": 0,
+        "volume_flow": maps["volume_multiple"].score(features["vol_multiple"]),
+        "risk_reward": maps["rr"](p.min_rr),
+        "liquidity": maps["avg_dollar_volume_20d"].score(close * features["vol20"]),
+        "event_risk_penalty": 0,
+    }
+    return finish_history(
+        panel, valid, signal, points, components, settings.weights,
+        conditions={"breakout": breakout & valid},
+    )
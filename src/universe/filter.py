@@ -1,16 +1,16 @@
 from __future__ import annotations
-import pandas as pd
+from ..common.settings import settings_for
+from ..features.snapshot import FeatOrRow, latest
 
-def passes_universe_filters(feat: pd.DataFrame, cfg: dict) -> bool:
-    last = feat.dropna().iloc[-1]
-    symbol = str(last.get("symbol", ""))
-    exclude = set(cfg.get("universe_filter", {}).get("exclude_symbols", []) or [])
-    if symbol and symbol in exclude:
+def passes_universe_filters(feat: FeatOrRow, cfg: dict) -> bool:
+    # feat: feature frame or its snapshot record (features.snapshot); vectorized form: snapshot.universe_mask
+    last = latest(feat)
+    uf = settings_for(cfg).universe_filter
+    symbol = str(last["symbol"])
+    if symbol and symbol in uf.exclude_symbols:
         return False
 
-    min_price = float(cfg["universe_filter"]["min_price"])
-    min_dv = float(cfg["universe_filter"]["min_avg_dollar_volume_20d"])
     close = float(last["close"])
     avg_vol20 = float(last["vol20"])
     dollar_vol = close * avg_vol20
-    return (close >= min_price) and (dollar_vol >= min_dv)
+    return (close >= uf.min_price) and (dollar_vol >= uf.min_avg_dollar_volume_20d)
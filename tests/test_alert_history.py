@@ -0,0 +1,99 @@
+from datetime import date
+from pathlib import Path
+import pickle
+
+from src.alerts.history import AlertHistory, Cooldown
+from src.common.config_loader import load_config, load_score_maps
+from src.data.loader import generate_synthetic_bars
+from src.pipeline.run import run_scan
+from src.pipeline.sources import synthetic_source
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _alert(symbol, setup, day, total=80.0):
+    return {
+        "alert_id": f"{symbol}-{setup}-{day}",
+        "created_at_utc": f"{day}T21:00:00+00:00",
+        "symbol": symbol,
+        "setup": {"setup_name": setup},
+        "scores": {"total": total},
+    }
+
+
+def test_history_batches_and_queries(tmp_path):
+    path = tmp_path / "history.sqlite"
+    with AlertHistory(path, batch_size=3) as h:
+        for d in range(1, 6):
+            h.add(_alert("AAA", "TREND_BREAKOUT", f"2024-01-0{d}"))
+        h.add(_alert("BBB", "RS_ROTATION", "2024-01-03"))
+        assert len(h._pending) == 0  # two full batches of 3 written
+        h.add(_alert("AAA", "RS_ROTATION", "2024-01-02"))
+        assert len(h._pending) == 1
+
+    with AlertHistory(path) as h:
+        assert h.count() == 7
+        assert h.last("AAA", "TREND_BREAKOUT")["alert_id"] == "AAA-TREND_BREAKOUT-2024-01-05"
+        assert h.last("CCC", "TREND_BREAKOUT") is None
+        assert [a["created_at_utc"][:10] for a in h.query("AAA", "TREND_BREAKOUT", start="2024-01-02", end=date(2024, 1, 4))] == [
+            "2024-01-02", "2024-01-03", "2024-01-04"
+        ]
+        assert {a["symbol"] for a in h.query(start="2024-01-03", end="2024-01-03")} == {"AAA", "BBB"}
+        assert len(h.query("AAA", limit=2)) == 2
+
+        # an older alert added late does not move the latest date back
+        h.add(_alert("AAA", "TREND_BREAKOUT", "2023-12-01"))
+        cd = h.cooldown(5, today=date(2024, 1, 8), symbols=["AAA"])
+        assert cd.last == {("AAA", "TREND_BREAKOUT"): "2024-01-05", ("AAA", "RS_ROTATION"): "2024-01-02"}
+
+
+def test_cooldown_window():
+    cd = Cooldown({("AAA", "TREND_BREAKOUT"): "2024-01-05"}, days=5, today=date(2024, 1, 9))
+    assert cd.blocks("AAA", "TREND_BREAKOUT")
+    assert not cd.blocks("AAA", "RS_ROTATION") and not cd.blocks("BBB", "TREND_BREAKOUT")
+    cd.today = date(2024, 1, 10)
+    assert not cd.blocks("AAA", "TREND_BREAKOUT")
+    assert not Cooldown(cd.last, days=0, today=date(2024, 1, 5)).blocks("AAA", "TREND_BREAKOUT")
+    assert pickle.loads(pickle.dumps(cd)) == cd
+
+
+def test_run_scan_suppresses_recent_setups(tmp_path):
+    cfg = load_config(ROOT)
+    cfg["scoring"]["pools"]["CORE"].update(min_total=0, max_alerts_per_run=100)
+    maps = load_score_maps(ROOT)
+    symbols = [f"S{i}" for i in range(12)]
+    kw = dict(
+        benchmark="SPY",
+        bench_df=generate_synthetic_bars("SPY", n=520, seed=1),
+        data_provenance={"vendor": "synthetic", "feed": "test", "bar_interval": "1d"},
+        min_history=100,
+    )
+    source = synthetic_source(n=520, seeds={s: i for i, s in enumerate(symbols)})
+
+    with AlertHistory(tmp_path / "history.sqlite") as h:
+        first = run_scan(source, symbols, cfg, maps, history=h, cooldown_days=5, **kw)
+        assert first.alerts and first.report["stats"]["suppressed"] == 0
+        assert h.count() == len(first.alerts)
+
+        for workers in (1, 2):
+            again = run_scan(source, symbols, cfg, maps, history=h, cooldown_days=5, workers=workers, **kw)
+            assert again.alerts == []
+            assert again.report["stats"]["suppressed"] == first.report["stats"]["alerts_raw"]
+
+        # outside the window (no cooldown) everything comes back
+        assert len(run_scan(source, symbols, cfg, maps, history=h, cooldown_days=0, **kw).alerts) == len(first.alerts)
+
+
+def test_cooldown_is_per_bar_interval(tmp_path):
+    def at(interval, day):
+        return {**_alert("AAA", "TREND_BREAKOUT", day), "data_provenance": {"bar_interval": interval}}
+
+    with AlertHistory(tmp_path / "history.sqlite") as h:
+        h.add_many([at("1d", "2024-01-05"), at("1h", "2024-01-08")])
+        assert h.cooldown(5, today=date(2024, 1, 9)).last == {("AAA", "TREND_BREAKOUT"): "2024-01-05"}
+        assert h.cooldown(5, today=date(2024, 1, 9), interval="1h").last == {("AAA", "TREND_BREAKOUT"): "2024-01-08"}
+        assert h.cooldown(5, interval="5m").last == {}
+        assert h.last("AAA", "TREND_BREAKOUT")["data_provenance"]["bar_interval"] == "1h"
+        assert h.last("AAA", "TREND_BREAKOUT", interval="1d")["alert_id"] == "AAA-TREND_BREAKOUT-2024-01-05"
+        assert len(h.query("AAA", interval="1h")) == 1
+
@@ -0,0 +1,131 @@
+import pandas as pd
+
+from src.data.bar_store import BarStore
+from src.data.loader import generate_synthetic_bars
+from src.data.refresh import window_start_for
+
+
+def test_append_read_roundtrip_with_pushdown(tmp_path):
+    store = BarStore(tmp_path)
+    df = generate_synthetic_bars("AAA", n=400, seed=1)
+    assert store.append(df, "1d") == 400
+
+    full = store.read("AAA", "1d")
+    assert len(full) == 400
+    assert (full["close"].to_numpy() == df["close"].to_numpy()).all()
+
+    start, end = df["timestamp"].iloc[100], df["timestamp"].iloc[149]
+    part = store.read("AAA", "1d", columns=["close"], start=start, end=end)
+    assert list(part.columns) == ["timestamp", "close", "symbol"]
+    assert len(part) == 50
+    assert part["timestamp"].iloc[0] == start and part["timestamp"].iloc[-1] == end
+
+
+def test_later_append_wins_and_compact_keeps_it(tmp_path):
+    store = BarStore(tmp_path)
+    df = generate_synthetic_bars("AAA", n=50, seed=2)
+    store.append(df, "1d")
+    revised = df.tail(2).assign(close=1.0)
+    store.append(revised, "1d")
+
+    assert store.read("AAA", "1d")["close"].tail(2).tolist() == [1.0, 1.0]
+    store.compact("AAA", "1d")
+    out = store.read("AAA", "1d")
+    assert len(out) == 50
+    assert out["close"].tail(2).tolist() == [1.0, 1.0]
+
+
+def test_refresh_fetches_only_the_tail(tmp_path):
+    from src.data.refresh import refresh_candles
+
+    history = generate_synthetic_bars("AAA", n=300, seed=3)
+    now = history["timestamp"].iloc[-1].to_pydatetime()
+    calls = []
+
+    def fake_fetch(symbol, interval, lookback_days, now_utc=None, store=None, start_utc=None):
+        calls.append(start_utc)
+        df = history if start_utc is None else history[history["timestamp"] >= start_utc]
+        store.append(df, interval, symbol=symbol)
+        return df
+
+    store = BarStore(tmp_path)
+    first = refresh_candles(fake_fetch, "AAA", "1d", 200, store, now_utc=now)
+    second = refresh_candles(fake_fetch, "AAA", "1d", 200, store, overlap_bars=2, now_utc=now)
+
+    assert calls[0] == window_start_for(now, 200)
+    assert calls[1] == history["timestamp"].iloc[-2]
+    assert len(first) == len(second)
+    assert (first["close"].to_numpy() == second["close"].to_numpy()).all()
+
+
+def test_refresh_backfills_a_missing_head(tmp_path):
+    from src.data.refresh import refresh_candles
+
+    history = generate_synthetic_bars("AAA", n=300, seed=3)
+    now = history["timestamp"].iloc[-1].to_pydatetime()
+    window_start = window_start_for(now, 200)
+    calls = []
+
+    def fake_fetch(symbol, interval, lookback_days, now_utc=None, store=None, start_utc=None, listed=None):
+        calls.append(start_utc)
+        df = history[history["timestamp"] >= max(start_utc, listed or start_utc)]
+        store.append(df, interval, symbol=symbol)
+        return df
+
+    # the store only holds recent bars (lookback_days grew): the whole window is fetched again
+    store = BarStore(tmp_path / "a")
+    store.append(history.tail(50), "1d", symbol="AAA")
+    out = refresh_candles(fake_fetch, "AAA", "1d", 200, store, now_utc=now)
+    assert calls == [window_start]
+    assert out["timestamp"].iloc[0] == history.loc[history["timestamp"] >= window_start, "timestamp"].iloc[0]
+    refresh_candles(fake_fetch, "AAA", "1d", 200, store, now_utc=now)
+    assert calls[1] == history["timestamp"].iloc[-2]
+
+    # a recent listing: the vendor has nothing older, so the next refresh is a delta again
+    calls.clear()
+    listed = history["timestamp"].iloc[-30]
+    store = BarStore(tmp_path / "b")
+    for _ in range(2):
+        refresh_candles(fake_fetch, "AAA", "1d", 200, store, now_utc=now, listed=listed)
+    assert calls == [window_start, history["timestamp"].iloc[-2]]
+
+
+def test_memory_bar_store_matches_disk(tmp_path):
+    disk, mem = BarStore(tmp_path), BarStore(tmp_path, memory=True)
+    ts = pd.date_range("2023-12-20", periods=30, freq="D", tz="UTC")
+    df = pd.DataFrame({"timestamp": ts, "open": 1.0, "high": 2.0, "low": 0.5, "close": range(30), "volume": 10.0})
+    disk.append(df.iloc[:20], "1d", symbol="AAA")
+    assert mem.read("AAA", "1d").equals(disk.read("AAA", "1d"))
+
+    # new parts (with a revised overlap) are merged in; compaction forces a full re-read
+    disk.append(df.iloc[18:].assign(close=-1.0), "1d", symbol="AAA")
+    for kw in ({}, {"start": "2024-01-01"}, {"start": "2024-01-05", "end": "2024-01-07", "columns": ["close"]}):
+        pd.testing.assert_frame_equal(mem.read("AAA", "1d", **kw), disk.read("AAA", "1d", **kw))
+    assert mem.last_timestamps("AAA", "1d", n=2) == disk.last_timestamps("AAA", "1d", n=2)
+    disk.compact("AAA", "1d")
+    pd.testing.assert_frame_equal(mem.read("AAA", "1d"), disk.read("AAA", "1d"))
+    assert mem.read("ZZZ", "1d").empty and mem.last_timestamps("ZZZ", "1d") == []
+
+
+def test_refresh_batch_refetches_the_window_when_one_head_is_missing(tmp_path):
+    from src.data.refresh import refresh_candles_batch
+
+    bars = {s: generate_synthetic_bars(s, n=300, seed=i) for i, s in enumerate(["AAA", "BBB"])}
+    now = bars["AAA"]["timestamp"].iloc[-1].to_pydatetime()
+    window_start = window_start_for(now, 200)
+    calls = []
+
+    def fake_batch(symbols, interval, lookback_days, now_utc=None, store=None, start_utc=None):
+        calls.append(start_utc)
+        for s in symbols:
+            store.append(bars[s][bars[s]["timestamp"] >= start_utc], interval, symbol=s)
+
+    store = BarStore(tmp_path)
+    store.append(bars["AAA"], "1d", symbol="AAA")
+    store.append(bars["BBB"].tail(20), "1d", symbol="BBB")
+    frames, empty = refresh_candles_batch(fake_batch, ["AAA", "BBB"], "1d", 200, store, now_utc=now)
+    assert calls == [window_start] and not empty
+    assert frames["BBB"]["timestamp"].iloc[0] == frames["AAA"]["timestamp"].iloc[0]
+
+    refresh_candles_batch(fake_batch, ["AAA", "BBB"], "1d", 200, store, now_utc=now)
+    assert calls[1] == bars["AAA"]["timestamp"].iloc[-2]
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.common.config_loader import load_config, load_score_maps
+from src.data.loader import generate_synthetic_bars
+from src.features.cross_section import percentile_rank, rank_latest_rs, rank_universe_rs, rs_percentile_panel
+from src.features.feature_set import compute_daily_features
+from src.strategies import rs_rotation
+
+ROOT = Path(__file__).resolve().parents[1]
+nan = np.nan
+
+
+def test_percentile_rank_averages_ties_and_skips_nan():
+    np.testing.assert_allclose(percentile_rank([0.3, 0.1, 0.3, 0.2]), [0.875, 0.25, 0.875, 0.5])
+    np.testing.assert_allclose(percentile_rank([0.2, nan, 0.1]), [1.0, nan, 0.5])
+    assert np.isnan(percentile_rank([nan, nan])).all()
+
+    a = np.array([[1.0, 2.0, nan], [5.0, 5.0, 5.0]])
+    np.testing.assert_allclose(percentile_rank(a, axis=1), [[0.5, 1.0, nan], [2 / 3, 2 / 3, 2 / 3]])
+    np.testing.assert_allclose(percentile_rank(a.T, axis=0), percentile_rank(a, axis=1).T)
+
+
+def test_rs_percentile_panel_ranks_each_date():
+    ret60 = np.array([[0.10, 0.20, 0.05], [0.00, nan, 0.00], [nan, nan, nan]])
+    bench = np.array([0.05, 0.10, nan])
+    rs, pct = rs_percentile_panel(ret60, bench)
+    np.testing.assert_allclose(rs, [[0.05, 0.15, 0.0], [-0.10, nan, -0.10], [nan, nan, nan]])
+    # the benchmark shifts a date by a constant, so the ranks are those of ret60
+    np.testing.assert_allclose(pct, [[2 / 3, 1.0, 1 / 3], [0.75, nan, 0.75], [nan, nan, nan]])
+
+
+def test_rank_latest_rs_ties_and_nan():
+    got = rank_latest_rs({"A": 0.10, "B": 0.30, "C": 0.10, "D": nan}, bench_ret60=0.05)
+    assert list(got) == ["A", "B", "C", "D"]
+    assert got["A"] == got["C"] == (pytest.approx(0.05), pytest.approx(0.5))
+    assert got["B"] == (pytest.approx(0.25), 1.0)
+    assert np.isnan(got["D"][0]) and np.isnan(got["D"][1])
+
+
+def test_min_history_leaves_short_symbols_out_of_the_universe():
+    bench = compute_daily_features(generate_synthetic_bars("SPY", n=400, seed=0))
+    feats = {
+        "LONG1": compute_daily_features(generate_synthetic_bars("LONG1", n=400, seed=1)),
+        "LONG2": compute_daily_features(generate_synthetic_bars("LONG2", n=400, seed=2)),
+        "SHORT": compute_daily_features(generate_synthetic_bars("SHORT", n=260, seed=3)),
+        "EMPTY": compute_daily_features(generate_synthetic_bars("EMPTY", n=150, seed=4)),
+    }
+    # EMPTY has no complete row (no ma200 yet); SHORT has 61
+    everyone = rank_universe_rs(feats, bench)
+    assert set(everyone) == {"LONG1", "LONG2", "SHORT"}
+    assert sorted(p for _, p in everyone.values()) == pytest.approx([1 / 3, 2 / 3, 1.0])
+
+    ranked = rank_universe_rs(feats, bench, min_history=100)
+    assert set(ranked) == {"LONG1", "LONG2"}
+    assert sorted(p for _, p in ranked.values()) == [0.5, 1.0]
+    assert rank_universe_rs(feats, bench, min_history=1000) == {}
+
+
+def test_rs_rotation_requires_the_universe_percentile():
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    cutoff = cfg["strategies"]["RS_ROTATION"]["params"]["rs_percentile_min"]
+    feat = compute_daily_features(generate_synthetic_bars("AAA", n=300, seed=1))
+    bench = compute_daily_features(generate_synthetic_bars("SPY", n=300, seed=0))
+
+    assert rs_rotation.evaluate("AAA", feat, bench, cfg, maps, rs_rank=(0.2, cutoff - 0.01)) is None
+    at = rs_rotation.evaluate("AAA", feat, bench, cfg, maps, rs_rank=(0.2, cutoff))
+    assert at is not None and f"RS percentile (universe rank): {cutoff:.2f}" in at["evidence"]
+    top = rs_rotation.evaluate("AAA", feat, bench, cfg, maps, rs_rank=(0.2, 1.0))
+    assert top["scores"]["components"]["trend_momo"] >= at["scores"]["components"]["trend_momo"]
+
+    # without a universe ranking the bucketed proxy never gates the setup
+    assert rs_rotation.evaluate("AAA", feat, bench, cfg, maps) is not None
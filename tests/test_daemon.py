@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.runtime.daemon import AlertRun, Scheduler, acquire_lock, alert_runs_from_config, health
+
+LA = ZoneInfo("America/Los_Angeles")
+
+
+def test_next_run_times_follow_local_wall_clock():
+    daily = AlertRun("daily_close", "1d", "16:10")
+    hourly = AlertRun("hourly", "60m", "every_60_minutes")
+
+    fri = datetime(2024, 3, 8, 15, 0, tzinfo=LA)
+    assert daily.next_after(fri) == datetime(2024, 3, 8, 16, 10, tzinfo=LA)
+    assert daily.next_after(fri.replace(hour=17), trading_days_only=True) == datetime(2024, 3, 11, 16, 10, tzinfo=LA)
+    # US DST starts 2024-03-10: still 16:10 local, an hour earlier in UTC
+    assert daily.next_after(datetime(2024, 3, 9, 17, 0, tzinfo=LA)).utcoffset() == timedelta(hours=-7)
+
+    assert hourly.next_after(fri.replace(minute=20)) == datetime(2024, 3, 8, 16, 0, tzinfo=LA)
+    assert hourly.next_after(fri) == datetime(2024, 3, 8, 16, 0, tzinfo=LA)
+    assert hourly.next_after(datetime(2024, 3, 8, 23, 30, tzinfo=LA), trading_days_only=True) == datetime(2024, 3, 11, 0, 0, tzinfo=LA)
+    assert AlertRun("q", "15m", "every_15_minutes").next_after(fri.replace(minute=14)) == fri.replace(minute=15)
+
+    with pytest.raises(ValueError):
+        AlertRun("bad", "1d", "at dusk")
+
+
+class FakeClock:
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, s):
+        self.t += timedelta(seconds=s)
+
+
+def test_scheduler_runs_due_jobs_without_overlap(tmp_path):
+    clock = FakeClock(datetime(2024, 3, 8, 22, 55, tzinfo=timezone.utc))  # 14:55 Los Angeles
+    runs = alert_runs_from_config({"runtime": {"alert_runs": [
+        {"name": "daily_close", "bar_interval": "1d", "run_time_local": "16:10"},
+        {"name": "hourly", "bar_interval": "60m", "run_time_local": "every_60_minutes"},
+    ]}})
+    log = []
+
+    def execute(run):
+        log.append((run.name, clock().astimezone(LA).strftime("%H:%M")))
+        clock.sleep(25 * 60 if run.name == "hourly" else 1)  # slow enough to overrun the next slot
+        if len(log) == 3:
+            raise RuntimeError("vendor down")
+        return {"stats": {"alerts_final": 1}}
+
+    status = tmp_path / "status.json"
+    sched = Scheduler(runs, "America/Los_Angeles", execute, status, heartbeat_s=60, clock=clock, sleep=clock.sleep)
+    sched.run_forever(max_runs=4)
+
+    # 15:00 hourly ends 15:25; 16:00 hourly ends 16:25, so 16:10 daily runs late (once);
+    # the next hourly slot is 17:00
+    assert log == [("hourly", "15:00"), ("hourly", "16:00"), ("daily_close", "16:25"), ("hourly", "17:00")]
+    ok, reason = health(status, max_age_s=120, now=clock())
+    assert ok, reason
+
+    st = sched.status
+    assert st["runs_total"] == 4 and st["failures"] == 1 and st["state"] == "idle"
+    assert st["last_runs"]["daily_close"]["ok"] is False and "vendor down" in st["last_runs"]["daily_close"]["error"]
+    assert st["next_runs"]["daily_close"] == "2024-03-11T23:10:00+00:00"  # Monday 16:10, now PDT
+    assert not health(status, max_age_s=120, now=clock() + timedelta(minutes=10))[0]
+
+
+def test_lock_is_exclusive(tmp_path):
+    pytest.importorskip("fcntl")
+    lock = acquire_lock(tmp_path / "status.json.lock")
+    with pytest.raises(RuntimeError, match="Another scheduler"):
+        acquire_lock(tmp_path / "status.json.lock")
+    lock.close()
+    acquire_lock(tmp_path / "status.json.lock").close()
+
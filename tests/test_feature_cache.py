@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from src.data.loader import generate_synthetic_bars
+from src.features.cache import FeatureCache
+from src.features.feature_set import compute_daily_features
+from src.features.panel import FEATURE_COLUMNS
+
+
+def _assert_features(got, bars):
+    ref = compute_daily_features(bars)
+    assert len(got) == len(ref)
+    assert (got["timestamp"].to_numpy() == pd.to_datetime(ref["timestamp"], utc=True).to_numpy()).all()
+    for c in FEATURE_COLUMNS:
+        np.testing.assert_allclose(got[c].to_numpy(float), pd.to_numeric(ref[c]).to_numpy(float), rtol=1e-9, equal_nan=True, err_msg=c)
+
+
+def test_hit_extend_and_revise(tmp_path):
+    full = generate_synthetic_bars("AAA", n=330, seed=5)
+    cache = FeatureCache(tmp_path, overlap_bars=2)
+
+    bars = full.iloc[:300].reset_index(drop=True)
+    _assert_features(cache.compute({"AAA": bars}, "1d")["AAA"], bars)
+    assert cache.misses == 1
+
+    _assert_features(cache.compute({"AAA": bars}, "1d")["AAA"], bars)
+    assert cache.hits == 1
+
+    # new bars appended and the last cached bar revised
+    bars = full.copy()
+    bars.loc[299, "close"] *= 1.01
+    _assert_features(cache.compute({"AAA": bars}, "1d")["AAA"], bars)
+    assert cache.extended == 1 and cache.rows_incremental == 32
+
+    # older history revised -> full recompute
+    bars.loc[100, "close"] *= 0.98
+    _assert_features(cache.compute({"AAA": bars}, "1d")["AAA"], bars)
+    assert cache.revised == 1
+
+    # window start moved -> full recompute
+    bars = bars.iloc[5:].reset_index(drop=True)
+    _assert_features(cache.compute({"AAA": bars}, "1d")["AAA"], bars)
+    assert cache.revised == 2
+
+
+def test_extended_matches_cold_compute_with_gaps(tmp_path):
+    full = {s: generate_synthetic_bars(s, n=330, seed=i) for i, s in enumerate(["AAA", "BBB", "CCC"])}
+    # AAA misses bars on both sides of the checkpoint, BBB has a bar nobody else has
+    full["AAA"] = full["AAA"].drop(index=[150, 310]).reset_index(drop=True)
+    extra = full["BBB"].iloc[[320]].copy()
+    extra["timestamp"] += pd.Timedelta(hours=12)
+    full["BBB"] = pd.concat([full["BBB"], extra]).sort_values("timestamp").reset_index(drop=True)
+
+    warm = FeatureCache(tmp_path / "warm", overlap_bars=2)
+    warm.compute({s: df.iloc[:290].reset_index(drop=True) for s, df in full.items()}, "1d")
+    extended = warm.compute(full, "1d")
+    assert warm.extended == 3
+    cold = FeatureCache(tmp_path / "cold").compute(full, "1d")
+    for sym, bars in full.items():
+        _assert_features(extended[sym], bars)
+        for c in FEATURE_COLUMNS:
+            np.testing.assert_allclose(extended[sym][c].to_numpy(float), cold[sym][c].to_numpy(float), rtol=1e-9, equal_nan=True, err_msg=f"{sym}.{c}")
+
+
+def test_eviction_keeps_most_recent(tmp_path):
+    cache = FeatureCache(tmp_path, max_entries=2)
+    for i, sym in enumerate(["A", "B", "C"]):
+        cache.compute({sym: generate_synthetic_bars(sym, n=60, seed=i)}, "1d")
+    cache.evict()
+    left = sorted(p.name for p in tmp_path.glob("interval=1d/symbol=*"))
+    assert cache.evictions == 1 and len(left) == 2
+
+
+def test_memory_mode_skips_disk_reads(tmp_path, monkeypatch):
+    full = generate_synthetic_bars("AAA", n=330, seed=5)
+    cache = FeatureCache(tmp_path, memory=True)
+    cache.compute({"AAA": full.iloc[:300].reset_index(drop=True)}, "1d")
+
+    monkeypatch.setattr(pd, "read_parquet", lambda *a, **k: (_ for _ in ()).throw(AssertionError("disk read")))
+    _assert_features(cache.compute({"AAA": full}, "1d")["AAA"], full)
+    _assert_features(cache.compute({"AAA": full}, "1d")["AAA"], full)
+    assert (cache.extended, cache.hits) == (1, 1)
+
+    cache.max_entries = 0
+    cache.evict()
+    assert not cache._mem
@@ -0,0 +1,24 @@
+from src.data.http_cache import ResponseCache
+
+
+def test_ttl_lru_and_disk_tier(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.data.http_cache.time.time", lambda: clock[0])
+
+    cache = ResponseCache(ttl_s={"quote": 60}, max_entries=2, disk_dir=tmp_path)
+    assert cache.get("quote", {"symbol": "VIX"}) is None
+    cache.put("quote", {"symbol": "VIX", "token": "secret"}, {"c": 20.0})
+    assert cache.get("quote", {"symbol": "VIX"}) == {"c": 20.0}
+
+    # LRU eviction from memory still leaves the disk copy
+    cache.put("quote", {"symbol": "A"}, {"c": 1})
+    cache.put("quote", {"symbol": "B"}, {"c": 2})
+    assert cache.get("quote", {"symbol": "VIX"}) == {"c": 20.0}
+    assert cache.stats()["disk_hits"] == 1
+
+    clock[0] += 61
+    assert cache.get("quote", {"symbol": "VIX"}) is None
+    # endpoints without a TTL are never cached
+    cache.put("stock/candle", {"symbol": "A"}, {"s": "ok"})
+    assert cache.get("stock/candle", {"symbol": "A"}) is None
+    assert not any("secret" in p.read_text() for p in tmp_path.rglob("*.json"))
@@ -0,0 +1,63 @@
+from pathlib import Path
+import pstats
+
+from src.common.config_loader import load_config, load_score_maps
+from src.common.instrumentation import RunMetrics, latency_summary, profiled
+from src.data.loader import generate_synthetic_bars
+from src.data.rate_limit import TokenBucket
+from src.pipeline.run import run_scan
+from src.pipeline.sources import synthetic_source
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_run_metrics_summary():
+    m = RunMetrics()
+    with m.stage("features"):
+        sum(range(10_000))
+    m.add_stage("features", 0.5, 0.25)
+    m.call("finnhub", status=200, nbytes=1000)
+    m.call("finnhub", status=429, nbytes=20, retry=True)
+    m.call("finnhub", retry=True, error=True)
+    m.slept("backoff", 2.0)
+    lim = TokenBucket(1000.0)
+    lim.penalize(0.0)
+    m.watch(lim)
+
+    out = m.summary()
+    stage = out["timing"]["stages"]["features"]
+    assert stage["calls"] == 2 and stage["wall_s"] >= 0.5 and stage["cpu_s"] >= 0.25
+    assert out["vendor"]["calls"]["finnhub"] == {"calls": 3, "retries": 2, "http_429": 1, "errors": 2, "bytes": 1020}
+    assert out["vendor"]["sleep"] == {"backoff_s": 2.0, "rate_limit_s": 0.0, "throttled": 1}
+
+
+def test_latency_summary_percentiles():
+    s = latency_summary([i / 1000 for i in range(1, 101)])
+    assert s["n"] == 100 and s["max"] == 100.0
+    assert s["p50"] == 50.5 and s["p99"] >= s["p90"] >= s["p50"]
+    assert latency_summary([]) == {"n": 0}
+
+
+def test_profiled_writes_dump_and_summary(tmp_path):
+    with profiled(tmp_path, top_n=5):
+        sorted(range(1000), key=lambda x: -x)
+    assert pstats.Stats(str(tmp_path / "run_profile.pstats")).total_calls > 0
+    assert "top 5 by own time" in (tmp_path / "run_profile.txt").read_text()
+    with profiled(None) as prof:
+        assert prof is None
+
+
+def test_run_scan_reports_stage_timing():
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    metrics = RunMetrics()
+    syms = ["AAA", "BBB", "CCC"]
+    run = run_scan(
+        synthetic_source(n=300, metrics=metrics), syms, cfg, maps,
+        benchmark="SPY", bench_df=generate_synthetic_bars("SPY", n=300, seed=1),
+        data_provenance={}, metrics=metrics,
+    )
+    timing = run.report["timing"]
+    assert {"fetch", "features", "regime", "rank", "scan"} <= set(timing["stages"])
+    assert timing["stages"]["fetch"]["calls"] == 3
+    assert timing["latency_ms"]["fetch"]["n"] == 3 and timing["latency_ms"]["scan"]["n"] == 3
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.data.loader import generate_synthetic_bars
+from src.features.feature_set import compute_daily_features
+from src.features.panel import FEATURE_COLUMNS, compute_daily_features_panel
+
+
+def test_panel_matches_per_symbol_features():
+    frames = {f"S{i}": generate_synthetic_bars(f"S{i}", n=320, seed=i) for i in range(4)}
+    # shorter history -> leading NaNs in the panel
+    frames["NEW"] = generate_synthetic_bars("NEW", n=230, seed=42)
+
+    out = compute_daily_features_panel(frames)
+    for sym, df in frames.items():
+        ref = compute_daily_features(df)
+        got = out[sym]
+        assert list(got.columns) == list(ref.columns)
+        assert len(got) == len(ref)
+        for c in FEATURE_COLUMNS:
+            np.testing.assert_allclose(
+                got[c].to_numpy(float),
+                pd.to_numeric(ref[c]).to_numpy(float),
+                rtol=1e-9,
+                equal_nan=True,
+                err_msg=f"{sym}.{c}",
+            )
+
+
+def test_panel_windows_use_each_symbols_own_bars():
+    frames = {f"S{i}": generate_synthetic_bars(f"S{i}", n=320, seed=i) for i in range(3)}
+    # S0 misses a bar, S1 has one the others lack (a halt / an extra session)
+    frames["S0"] = frames["S0"].drop(index=300).reset_index(drop=True)
+    extra = frames["S1"].iloc[[250]].copy()
+    extra["timestamp"] += pd.Timedelta(hours=12)
+    frames["S1"] = pd.concat([frames["S1"], extra]).sort_values("timestamp").reset_index(drop=True)
+
+    out = compute_daily_features_panel(frames)
+    for sym, df in frames.items():
+        ref = compute_daily_features(df)
+        assert len(out[sym]) == len(ref) and len(out[sym].dropna()) == len(ref.dropna())
+        for c in FEATURE_COLUMNS:
+            np.testing.assert_allclose(
+                out[sym][c].to_numpy(float), pd.to_numeric(ref[c]).to_numpy(float), rtol=1e-9, equal_nan=True, err_msg=f"{sym}.{c}",
+            )
@@ -0,0 +1,91 @@
+from itertools import islice
+from pathlib import Path
+import time
+
+import pandas as pd
+import pytest
+
+from src.common.config_loader import load_config, load_score_maps
+from src.data.loader import generate_synthetic_bars
+from src.data.scheduler import FetchResult
+from src.pipeline.run import run_scan
+from src.pipeline.sources import synthetic_source
+from src.pipeline.stages import TopAlerts, bounded
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_bounded_applies_backpressure_and_reraises():
+    produced = []
+
+    def items():
+        for i in range(10):
+            produced.append(i)
+            yield i
+        raise ValueError("upstream broke")
+
+    it = bounded(items(), maxsize=2)
+    assert next(it) == 0
+    time.sleep(0.3)
+    # one item handed out, two queued, one waiting in put
+    assert len(produced) <= 4
+    assert list(islice(it, 9)) == list(range(1, 10))
+    with pytest.raises(ValueError, match="upstream broke"):
+        next(it)
+
+
+def test_top_alerts_matches_filter_and_stable_sort():
+    totals = [50, 80, 65, 80, 40, 90, 65, 80, 70]
+    alerts = [{"id": i, "scores": {"total": t}} for i, t in enumerate(totals)]
+    top = TopAlerts(k=4, min_total=60)
+    for a in alerts:
+        top.push(a)
+
+    want = sorted([a for a in alerts if a["scores"]["total"] >= 60], key=lambda a: a["scores"]["total"], reverse=True)[:4]
+    assert [a["id"] for a in top.result()] == [a["id"] for a in want]
+    assert TopAlerts(k=0, min_total=0).result() == []
+
+
+def _strip(alerts):
+    return [{k: v for k, v in a.items() if k not in ("alert_id", "created_at_utc")} for a in alerts]
+
+
+def test_run_scan_serial_and_parallel_agree():
+    cfg = load_config(ROOT)
+    cfg["scoring"]["pools"]["CORE"].update(min_total=0, max_alerts_per_run=1)
+    maps = load_score_maps(ROOT)
+    synth = synthetic_source(n=520, seeds={f"S{i}": i for i in range(12)})
+
+    def source(symbols):
+        for res in synth([s for s in symbols if s not in ("BAD", "EMPTY")]):
+            yield res
+        yield FetchResult("BAD", None, RuntimeError("HTTP 500"), 0.0)
+        yield FetchResult("EMPTY", pd.DataFrame(), None, 0.0)
+
+    symbols = [f"S{i}" for i in range(12)] + ["BAD", "EMPTY"]
+    kw = dict(
+        benchmark="SPY",
+        bench_df=generate_synthetic_bars("SPY", n=520, seed=1),
+        data_provenance={"vendor": "synthetic", "feed": "test", "bar_interval": "1d"},
+        min_history=100,
+        feature_batch=3,
+        queue_size=2,
+    )
+    serial = run_scan(source, symbols, cfg, maps, **kw)
+    parallel = run_scan(source, symbols, cfg, maps, workers=2, **kw)
+
+    stats = serial.report["stats"]
+    assert serial.report["universe"] == {"requested": 14, "loaded": 14}
+    assert stats["errors"] == 1 and serial.report["errors"][0]["symbol"] == "BAD"
+    assert {"symbol": "EMPTY", "reason": "no_data"} in serial.report["skipped_items"]
+    assert stats["alerts_raw"] > stats["alerts_final"] == len(serial.alerts) == 1
+    assert parallel.report["stats"] == stats
+    assert _strip(parallel.alerts) == _strip(serial.alerts)
+
+
+def test_run_scan_requires_benchmark():
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    with pytest.raises(RuntimeError, match="benchmark"):
+        run_scan(synthetic_source(n=300), ["AAA"], cfg, maps, benchmark="ZZZ", data_provenance={},
+                 bench_df=pd.DataFrame())
@@ -0,0 +1,102 @@
+import gzip
+import json
+
+from src.publish.export_latest import build_payload, iter_jsonl, publish, top_alerts
+from src.publish.shards import publish_shards
+
+
+def _write_jsonl(path, totals):
+    with path.open("w", encoding="utf-8") as f:
+        for i, t in enumerate(totals):
+            f.write(json.dumps({"alert_id": str(i), "symbol": "股" + str(i), "scores": {"total": t}}) + "\n")
+            if i % 3 == 0:
+                f.write("\n")
+
+
+def test_streaming_top_k_matches_full_sort(tmp_path):
+    totals = [50, 80, 65, 80, 40, 90, 65, 80, 70, 12]
+    path = tmp_path / "alerts.jsonl"
+    _write_jsonl(path, totals)
+
+    full = list(iter_jsonl(path))
+    want = sorted(full, key=lambda a: a.get("scores", {}).get("total", 0), reverse=True)[:4]
+    assert top_alerts(iter_jsonl(path), 4) == want
+    assert top_alerts(iter_jsonl(path), 0) == []
+    assert list(iter_jsonl(tmp_path / "missing.jsonl")) == []
+
+
+def test_publish_is_compact_precompressed_and_skips_unchanged(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    _write_jsonl(path, [10, 30, 20])
+    out = tmp_path / "public" / "latest.json"
+
+    assert publish(build_payload(iter_jsonl(path), 2), out, ["gz"])
+    raw = out.read_bytes()
+    assert b"\n" not in raw and b", " not in raw and "股1".encode("utf-8") in raw
+    assert gzip.decompress((tmp_path / "public" / "latest.json.gz").read_bytes()) == raw
+    assert [a["alert_id"] for a in json.loads(raw)["alerts"]] == ["1", "2"]
+
+    # a later run with the same alerts leaves the files alone
+    mtime = out.stat().st_mtime_ns
+    assert not publish(build_payload(iter_jsonl(path), 2), out, ["gz"])
+    assert out.stat().st_mtime_ns == mtime and out.read_bytes() == raw
+
+    _write_jsonl(path, [10, 30, 40])
+    assert publish(build_payload(iter_jsonl(path), 2), out, ["gz"])
+    assert [a["alert_id"] for a in json.loads(out.read_bytes())["alerts"]] == ["2", "1"]
+
+
+def test_shards_are_content_addressed_and_pruned(tmp_path):
+    out = tmp_path / "public"
+    alerts = [
+        {"symbol": s, "setup": {"setup_name": "TREND_BREAKOUT"}, "scores": {"total": t}, "created_at_utc": "2024-01-02T21:00:00+00:00"}
+        for s, t in (("AAA", 90), ("BRK/B", 85), ("CCC", 10))
+    ]
+    report = {"meta": {"run_ts_utc": "2024-01-02T21:00:00+00:00"}, "stats": {"scanned": 3}}
+
+    m1 = publish_shards(alerts, out, max_alerts=2, report=report)
+    assert [a["symbol"] for a in m1["alerts"]] == ["AAA", "BRK/B"] and set(m1["symbols"]) == {"AAA", "BRK/B"}
+    assert m1["symbols"]["BRK/B"].startswith("symbols/BRK_B-")
+    assert json.loads((out / m1["runs"][0]["alerts"]).read_text(encoding="utf-8"))["alerts"] == alerts[:2]
+    assert json.loads((out / m1["runs"][0]["report"]).read_text(encoding="utf-8")) == report
+    assert gzip.decompress((out / (m1["symbols"]["AAA"] + ".gz")).read_bytes()) == (out / m1["symbols"]["AAA"]).read_bytes()
+
+    # same content -> same names; a later run keeps the earlier one listed
+    report2 = {"meta": {"run_ts_utc": "2024-01-03T21:00:00+00:00"}, "stats": {"scanned": 3}}
+    m2 = publish_shards(alerts, out, max_alerts=1, report=report2, keep_runs=2)
+    assert m2["symbols"]["AAA"] == m1["symbols"]["AAA"]
+    assert [r["run_ts_utc"] for r in m2["runs"]] == ["2024-01-03T21:00:00+00:00", "2024-01-02T21:00:00+00:00"]
+    assert (out / m1["runs"][0]["alerts"]).exists()
+    assert not (out / m1["symbols"]["BRK/B"]).exists()  # no longer referenced
+
+    m3 = publish_shards(alerts, out, max_alerts=1, report={"meta": {"run_ts_utc": "2024-01-04"}}, keep_runs=1)
+    assert len(m3["runs"]) == 1 and not (out / m1["runs"][0]["alerts"]).exists()
+    assert json.loads((out / "manifest.json").read_text(encoding="utf-8")) == m3
+
+
+def test_publish_skips_a_new_run_with_the_same_alerts(tmp_path):
+    def run(ts, elapsed):
+        alerts = tmp_path / "alerts.jsonl"
+        alerts.write_text("".join(
+            json.dumps({"alert_id": f"{ts}-{s}", "created_at_utc": ts, "symbol": s, "scores": {"total": t}}) + "\n"
+            for s, t in (("AAA", 80), ("BBB", 70))
+        ), encoding="utf-8")
+        report = tmp_path / "run_report.json"
+        report.write_text(json.dumps({
+            "meta": {"run_ts_utc": ts, "vendor": "finnhub"},
+            "stats": {"scanned": 2, "alerts_final": 2},
+            "timing": {"total_s": elapsed},
+            "vendor": {"calls": {"finnhub": {"calls": 3}}},
+            "feature_cache": {"hits": int(elapsed)},
+        }), encoding="utf-8")
+        return build_payload(iter_jsonl(alerts), 20, report_path=report)
+
+    out = tmp_path / "public" / "latest.json"
+    assert publish(run("2024-01-02T15:00:00+00:00", 1.5), out, ["gz"])
+    first = out.read_bytes()
+    assert not publish(run("2024-01-02T20:00:00+00:00", 2.5), out, ["gz"])
+    assert out.read_bytes() == first
+
+    changed = run("2024-01-03T15:00:00+00:00", 1.5)
+    changed["report"]["stats"]["scanned"] = 3
+    assert publish(changed, out, ["gz"])
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.data import rate_limit
+from src.data.rate_limit import TokenBucket, parse_rate
+from src.data.scheduler import fetch_concurrently
+
+
+class FakeClock:
+    """Stands in for the time module in rate_limit: sleep() advances monotonic() instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, s):
+        self.sleeps.append(s)
+        self.now += s
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", c)
+    return c
+
+
+@pytest.mark.parametrize("spec, expected", [("60/min", 1.0), ("5/s", 5.0), (" 1800 / Hour ", 0.5), ("2.5", 2.5), (3, 3.0)])
+def test_parse_rate(spec, expected):
+    assert parse_rate(spec) == expected
+
+
+def test_parse_rate_rejects_unknown_units():
+    with pytest.raises(ValueError, match="Unsupported rate unit"):
+        parse_rate("10/day")
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket.from_spec("2/s", burst=4)
+    assert [bucket.acquire() for _ in range(4)] == [0.0] * 4
+    assert clock.sleeps == []
+
+    # the bucket is empty: each further call waits one token at 2/s
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.waited_s == pytest.approx(1.0)
+
+    # idle time refills only up to the burst
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(4)] == [0.0] * 4
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_penalize_cuts_the_rate_and_reward_recovers_slowly(clock):
+    bucket = TokenBucket(10.0, burst=1)
+    bucket.penalize()
+    assert (bucket.rate, bucket.throttled) == (5.0, 1)
+    # the first strike pauses everyone for 2 s, then tokens come at the halved rate
+    assert bucket.acquire() == pytest.approx(2.0)
+    assert bucket.acquire() == pytest.approx(1 / 5.0)
+
+    # consecutive 429s back off exponentially (capped at 30 s) and the rate bottoms out at min_rate
+    bucket.penalize()
+    assert bucket.acquire() == pytest.approx(4.0)
+    for _ in range(4):
+        bucket.penalize()
+    assert bucket.rate == bucket.min_rate == 10.0 * 0.125
+    assert bucket.acquire() == pytest.approx(30.0)
+
+    # additive increase: max_rate / 20 per success, never above max_rate
+    bucket.reward()
+    assert bucket.rate == pytest.approx(1.25 + 0.5)
+    for _ in range(100):
+        bucket.reward()
+    assert bucket.rate == bucket.max_rate
+
+    # Retry-After replaces the exponential cool-down
+    bucket.penalize(retry_after_s=7.0)
+    assert bucket.acquire() == pytest.approx(7.0)
+    assert bucket.rate == 5.0 and bucket.throttled == 7
+
+
+def test_fetch_concurrently_captures_errors_per_symbol():
+    release = {s: threading.Event() for s in "ABCDE"}
+
+    def fetch_one(sym):
+        release[sym].wait(5)
+        if sym == "C":
+            raise RuntimeError("boom C")
+        return pd.DataFrame({"close": [float(ord(sym))]})
+
+    results = fetch_concurrently("ABCDE", fetch_one, max_workers=5)
+    # results arrive in completion order, not submission order
+    for sym in "ECADB":
+        release[sym].set()
+        r = next(results)
+        assert r.symbol == sym
+        if sym == "C":
+            assert r.df is None and str(r.error) == "boom C"
+        else:
+            assert r.error is None and r.df["close"].iloc[0] == ord(sym)
+    assert next(results, None) is None
+
+
+def test_fetch_concurrently_bounds_in_flight_fetches():
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def fetch_one(sym):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.005)
+        with lock:
+            running -= 1
+        return pd.DataFrame()
+
+    results = list(fetch_concurrently([f"S{i}" for i in range(30)], fetch_one, max_workers=8, max_pending=3))
+    assert sorted(r.symbol for r in results) == sorted(f"S{i}" for i in range(30))
+    assert peak <= 3 and all(r.error is None for r in results)
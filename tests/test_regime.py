@@ -0,0 +1,141 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.common.config_loader import load_config, load_score_maps
+from src.common.settings import ConfigError, compile_config
+from src.data.loader import generate_synthetic_bars
+from src.features.feature_set import compute_daily_features
+from src.features.indicators import adx, adx_frame
+from src.pipeline.run import run_scan
+from src.pipeline.sources import synthetic_source
+from src.regime.classifier import classify_regime
+from src.regime.timeline import RegimeCache, regime_timeline
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _adx_loop(df: pd.DataFrame, n: int = 14) -> np.ndarray:
+    """Reference: Wilder's recursion bar by bar, seeded with the first value like the repo's ATR."""
+    h, l, c = (df[k].to_numpy(dtype=float) for k in ("high", "low", "close"))
+    out = np.full(len(df), np.nan)
+    tr_s = p_s = m_s = a_s = None
+    a = 1.0 / n
+    for t in range(1, len(df)):
+        up, down = h[t] - h[t - 1], l[t - 1] - l[t]
+        p = up if up > down and up > 0 else 0.0
+        m = down if down > up and down > 0 else 0.0
+        tr = max(h[t] - l[t], abs(h[t] - c[t - 1]), abs(l[t] - c[t - 1]))
+        tr_s, p_s, m_s = (x if s is None else (1 - a) * s + a * x for s, x in ((tr_s, tr), (p_s, p), (m_s, m)))
+        pdi, mdi = 100 * p_s / tr_s, 100 * m_s / tr_s
+        dx = 100 * abs(pdi - mdi) / (pdi + mdi) if pdi + mdi else 0.0
+        a_s = dx if a_s is None else (1 - a) * a_s + a * dx
+        out[t] = a_s
+    return out
+
+
+def _bars(n: int, drift: float, chop: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + drift * np.arange(n) + chop * np.where(np.arange(n) % 2, 1.0, -1.0) + rng.normal(0, 0.05, n)
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2022-01-03", periods=n, freq="B", tz="UTC"),
+        "open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 1e6,
+    })
+
+
+def test_adx_matches_wilder_recursion_and_resumes_exactly():
+    bars = generate_synthetic_bars("SPY", n=400, seed=3)
+    full = adx_frame(bars)
+    np.testing.assert_allclose(full["adx"].to_numpy()[1:], _adx_loop(bars)[1:], rtol=1e-10)
+
+    k = 250
+    last = bars.iloc[k - 1]
+    prev = {"high": last["high"], "low": last["low"], "close": last["close"], **adx_frame(bars.iloc[:k]).iloc[-1].to_dict()}
+    rest = adx_frame(bars.iloc[k:], prev=prev)
+    np.testing.assert_array_equal(rest.to_numpy(), full.iloc[k:].to_numpy())
+
+    assert adx(_bars(300, drift=0.5, chop=0.0)).iloc[-1] > 25
+    assert adx(_bars(300, drift=0.0, chop=1.0)).iloc[-1] < 18
+
+
+def test_timeline_follows_the_rules_for_every_bar():
+    cfg = load_config(ROOT)
+    up = compute_daily_features(_bars(400, drift=0.5, chop=0.0))
+    chop = compute_daily_features(_bars(400, drift=0.0, chop=1.0))
+
+    tl = regime_timeline(up, cfg)
+    assert len(tl) == len(up) and tl["regime"].iloc[-1] == "TREND"
+    assert tl["reason"].iloc[-1].split(";") == ["benchmark_close_above_ma200", "benchmark_ma50_above_ma200", "benchmark_adx14_ge_20"]
+    # vix 29: above TREND's vol guard, within RANGE's
+    assert regime_timeline(chop, cfg, vix=29.0)["regime"].iloc[-1] == "RANGE"
+
+    # the vol proxy as of each bar: a spike makes those bars HIGH_VOL, a single reading only the last
+    vix = pd.Series(15.0, index=up["timestamp"])
+    vix.iloc[300:310] = 35.0
+    tl = regime_timeline(up, cfg, vix=vix)
+    assert (tl["regime"].iloc[300:310] == "HIGH_VOL").all() and tl["regime"].iloc[-1] == "TREND"
+    assert regime_timeline(up, cfg, vix=35.0)["regime"].tolist()[-2:] == ["TREND", "HIGH_VOL"]
+
+    res = classify_regime(chop, vix_last=29.0, cfg=cfg)
+    assert (res.regime, res.reasons) == ("RANGE", ["benchmark_adx14_le_18"])
+
+
+@pytest.mark.parametrize("vix", [None, 0.0, 15.0, 20.0, 27.0, 29.0])
+def test_bear_market_is_risk_off_whatever_the_vix(vix):
+    # RISK_OFF's vol_guard min_vix only confirms; a calm decline below ma200 must not fall back to RANGE
+    cfg = load_config(ROOT)
+    down = compute_daily_features(_bars(400, drift=-0.3, chop=0.0))
+    res = classify_regime(down, vix_last=vix, cfg=cfg)
+    assert res.regime == classify_regime(down).regime == "RISK_OFF"
+    assert res.reasons == ["benchmark_close_below_ma200"] + (["vix_ge_28"] if vix is not None and vix >= 28 else [])
+
+
+def test_run_scan_keeps_the_regime_timeline(tmp_path):
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    bench = generate_synthetic_bars("SPY", n=520, seed=1)
+    cache = RegimeCache(tmp_path)
+    kw = dict(benchmark="SPY", data_provenance={"bar_interval": "1d"}, min_history=100, regime_cache=cache)
+
+    run_scan(synthetic_source(n=520), ["AAA"], cfg, maps, bench_df=bench.iloc[:500], **kw)
+    run = run_scan(synthetic_source(n=520), ["AAA"], cfg, maps, bench_df=bench, **kw)
+    assert (cache.misses, cache.extended, cache.rows_incremental) == (1, 1, 22)
+    res = classify_regime(compute_daily_features(bench), cfg=cfg)
+    assert (run.regime["regime"], run.regime["regime_reason"]) == (res.regime, res.reasons)
+
+
+def test_regime_cache_extends_by_new_bars(tmp_path):
+    cfg = load_config(ROOT)
+    feat = compute_daily_features(generate_synthetic_bars("SPY", n=600, seed=5))
+    vix = pd.Series(np.linspace(12, 40, len(feat)), index=feat["timestamp"])
+    expected = regime_timeline(feat, cfg, vix=vix)
+
+    cache = RegimeCache(tmp_path, overlap_bars=2)
+    cache.timeline("SPY", "1d", feat.iloc[:500], cfg, vix=vix)
+    got = cache.timeline("SPY", "1d", feat, cfg, vix=vix)
+    pd.testing.assert_frame_equal(got, expected)
+    assert cache.stats() == {"hits": 0, "extended": 1, "misses": 1, "rows_incremental": 102}
+
+    again = RegimeCache(tmp_path).timeline("SPY", "1d", feat, cfg, vix=vix)
+    pd.testing.assert_frame_equal(again, expected)
+
+    revised = feat.copy()
+    revised.loc[100, "close"] += 1.0
+    cache.timeline("SPY", "1d", revised, cfg, vix=vix)
+    assert cache.misses == 2
+
+    other = copy.deepcopy(cfg)
+    other["regime"]["rules"]["RANGE"]["conditions"] = ["benchmark_adx14 <= 25"]
+    cache.timeline("SPY", "1d", feat, other, vix=vix)
+    assert cache.misses == 3
+
+
+@pytest.mark.parametrize("condition", ["benchmark_adx14 => 18", "benchmark_rsi14 <= 30", "benchmark_close_above_ma200 >= 1"])
+def test_regime_rules_are_validated(condition):
+    cfg = copy.deepcopy(load_config(ROOT))
+    cfg["regime"]["rules"]["RANGE"]["conditions"] = [condition]
+    with pytest.raises(ConfigError, match=r"regime\.rules\.RANGE\.conditions\[0\]"):
+        compile_config(cfg)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from src.data.bar_store import BarStore
+from src.data.resample import Session, resample_bars, update_resampled
+from src.data.yahoo_client import _to_bars
+from src.pipeline.sources import vendor_source
+
+
+def _five_minute_bars(days, symbol="AAA", seed=0):
+    # 04:00-20:00 New York, so pre/post-market bars are present
+    ts = pd.DatetimeIndex([]).tz_localize("UTC")
+    for d in days:
+        ts = ts.append(pd.date_range(f"{d} 04:00", f"{d} 19:55", freq="5min", tz="America/New_York").tz_convert("UTC"))
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, len(ts)))
+    return pd.DataFrame({
+        "timestamp": ts, "open": close - 0.05, "high": close + 0.2, "low": close - 0.2, "close": close,
+        "volume": rng.integers(100, 1000, len(ts)).astype(float), "symbol": symbol,
+    })
+
+
+def test_hourly_bars_follow_the_session_across_dst():
+    fine = _five_minute_bars(["2024-03-08", "2024-03-11"])  # US DST starts 2024-03-10
+    h = resample_bars(fine, "60m")
+    assert len(h) == 14  # 9:30 ... 15:30 (the last one half an hour)
+    assert h["timestamp"].iloc[0] == pd.Timestamp("2024-03-08 14:30", tz="UTC")
+    assert h["timestamp"].iloc[7] == pd.Timestamp("2024-03-11 13:30", tz="UTC")
+
+    local = fine["timestamp"].dt.tz_convert("America/New_York")
+    first = fine[(local >= "2024-03-08 09:30") & (local < "2024-03-08 10:30")]
+    row = h.iloc[0]
+    assert row["open"] == first["open"].iloc[0] and row["close"] == first["close"].iloc[-1]
+    assert row["high"] == first["high"].max() and row["low"] == first["low"].min()
+    assert row["volume"] == first["volume"].sum()
+
+    d = resample_bars(fine, "1d")
+    assert d["timestamp"].tolist() == [pd.Timestamp("2024-03-08", tz="UTC"), pd.Timestamp("2024-03-11", tz="UTC")]
+    assert d["volume"].sum() == fine[(local.dt.time >= pd.Timestamp("09:30").time()) & (local.dt.time < pd.Timestamp("16:00").time())]["volume"].sum()
+
+    # coarser bars from intermediate bars equal coarser bars from the finest ones
+    pd.testing.assert_frame_equal(resample_bars(resample_bars(fine, "30m"), "60m"), h)
+    pd.testing.assert_frame_equal(resample_bars(h, "1d"), d)
+
+
+def test_other_sessions():
+    fine = _five_minute_bars(["2024-03-08"])
+    h = resample_bars(fine, "60m", Session("Europe/London", "08:00", "16:30"))
+    assert h["timestamp"].iloc[0] == pd.Timestamp("2024-03-08 09:00", tz="UTC")  # 04:00 New York
+
+
+def test_no_bars_resample_to_an_empty_frame():
+    assert resample_bars(None, "60m").empty
+    fine = _five_minute_bars(["2024-03-08"])
+    assert list(resample_bars(fine.iloc[:0], "1d").columns) == list(fine.columns)
+
+def test_incremental_update_matches_full_resample(tmp_path):
+    store = BarStore(tmp_path)
+    fine = _five_minute_bars(["2024-05-06", "2024-05-07", "2024-05-08"])
+    # arrive in uneven pieces, so coarse buckets are first built from partial data
+    for lo, hi in ((0, 100), (100, 137), (137, 300), (300, len(fine))):
+        store.append(fine.iloc[lo:hi], "5m")
+        update_resampled(store, "AAA", "5m", ["60m", "30m", "1d"])
+
+    for interval in ("30m", "60m", "1d"):
+        got = store.read("AAA", interval)
+        want = resample_bars(fine, interval)
+        pd.testing.assert_frame_equal(got[want.columns].reset_index(drop=True), want, check_dtype=False)
+
+
+def test_vendor_source_derives_from_one_download(tmp_path):
+    store = BarStore(tmp_path)
+    now = pd.Timestamp.now(tz="UTC").normalize()
+    days = [d.date().isoformat() for d in pd.bdate_range(end=now - pd.Timedelta(days=1), periods=3)]
+    fine = _five_minute_bars(days)
+    calls = []
+
+    def fetch(symbol, interval, lookback_days, now_utc=None, store=None, start_utc=None):
+        calls.append(interval)
+        store.append(fine, interval, symbol=symbol)
+        return fine
+
+    src = vendor_source(fetch, "60m", 10, store, derive_from="5m", derived=["30m"])
+    (res,) = list(src(["AAA"]))
+    assert calls == ["5m"]
+    assert res.error is None and len(res.df) == 3 * 7
+    assert len(store.read("AAA", "30m")) == 3 * 13
+
+
+def test_yahoo_intraday_timestamps_stay_utc_instants():
+    idx = pd.date_range("2024-03-11 09:30", periods=2, freq="60min", tz="America/New_York")
+    raw = pd.DataFrame({"Open": [1.0, 2.0], "High": [1.0, 2.0], "Low": [1.0, 2.0], "Close": [1.0, 2.0], "Volume": [1, 2]}, index=idx)
+    assert _to_bars(raw, "AAA", intraday=True)["timestamp"].iloc[0] == pd.Timestamp("2024-03-11 13:30", tz="UTC")
+    assert _to_bars(raw, "AAA")["timestamp"].iloc[0] == pd.Timestamp("2024-03-11 09:30", tz="UTC")
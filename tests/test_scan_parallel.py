@@ -0,0 +1,74 @@
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pytest
+
+from src.common.config_loader import load_config, load_score_maps
+from src.data.loader import generate_synthetic_bars
+from src.features.cross_section import rank_universe_rs
+from src.features.feature_set import compute_daily_features
+from src.features.panel import compute_daily_features_panel
+from src.scan import parallel
+from src.scan.core import ScanContext, scan_symbol
+from src.scan.parallel import scan_parallel
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _strip(outcome):
+    alerts = [{k: v for k, v in a.items() if k not in ("alert_id", "created_at_utc")} for a in outcome.alerts]
+    return outcome.symbol, outcome.skip_reason, outcome.passed_filters, outcome.error, alerts
+
+
+def test_parallel_scan_matches_serial():
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    bench_feat = compute_daily_features(generate_synthetic_bars("SPY", n=400, seed=1))
+    frames = {f"S{i}": generate_synthetic_bars(f"S{i}", n=400, seed=i) for i in range(10)}
+    frames["NEW"] = generate_synthetic_bars("NEW", n=150, seed=99)
+
+    ctx = ScanContext(
+        cfg, maps, "TREND", {"regime": "TREND"}, bench_feat,
+        data_provenance={"vendor": "synthetic", "feed": "test", "bar_interval": "1d"},
+        min_history=100,
+    )
+    got = scan_parallel(frames, ctx, workers=2, chunk_size=3)
+
+    feats = compute_daily_features_panel(frames)
+    ctx.rs_ranks = rank_universe_rs(feats, bench_feat, min_history=ctx.min_history)
+    want = [scan_symbol(sym, feat, ctx) for sym, feat in feats.items()]
+
+    assert [o.symbol for o in got] == list(frames)
+    assert [_strip(o) for o in got] == [_strip(o) for o in want]
+    assert got[-1].skip_reason == "insufficient_history"
+
+
+@pytest.mark.parametrize("stage", ["_views", "snapshot_from_panel"])
+def test_failed_scan_raises_its_error_and_frees_shared_memory(monkeypatch, stage):
+    cfg = load_config(ROOT)
+    bench_feat = compute_daily_features(generate_synthetic_bars("SPY", n=300, seed=1))
+    ctx = ScanContext(cfg, load_score_maps(ROOT), "TREND", {"regime": "TREND"}, bench_feat, data_provenance={})
+    frames = {f"S{i}": generate_synthetic_bars(f"S{i}", n=300, seed=i) for i in range(3)}
+
+    created = []
+    real_shm, real_stage = shared_memory.SharedMemory, getattr(parallel, stage)
+
+    def tracking_shm(*args, **kwargs):
+        shm = real_shm(*args, **kwargs)
+        created.append(shm.name)
+        return shm
+
+    def failing(*args, **kwargs):
+        if stage == "snapshot_from_panel":
+            real_stage(*args, **kwargs)  # fail after the views are in use
+        raise ValueError(f"{stage} failed")
+
+    monkeypatch.setattr(parallel.shared_memory, "SharedMemory", tracking_shm)
+    monkeypatch.setattr(parallel, stage, failing)
+    with pytest.raises(ValueError, match=f"{stage} failed"):
+        scan_parallel(frames, ctx, workers=1)
+
+    assert len(created) == 2
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            real_shm(name=name)
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.common.config_loader import load_config, load_score_maps
+from src.scoring.maps import CompiledScoreMap, compile_score_maps, piecewise_score
+from src.scoring.scorer import components_matrix, round2, total_score, total_scores
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_compiled_maps_match_piecewise_score():
+    maps = load_score_maps(ROOT)["maps"]
+    # overlapping and out-of-order rules exercise first-match semantics
+    maps["mixed"] = [{"gt": 5, "score": 1}, {"lt": 2, "score": 2}, {"gte": 2, "score": 3}, {"lte": 5, "score": 4}]
+    compiled = compile_score_maps({"maps": maps})
+
+    rng = np.random.default_rng(0)
+    for name, rules in maps.items():
+        cmap = compiled[name]
+        bounds = list(cmap.bounds)
+        values = np.concatenate([
+            bounds,
+            np.nextafter(bounds, np.inf) if bounds else [],
+            np.nextafter(bounds, -np.inf) if bounds else [],
+            rng.normal(0, 3, 200),
+            rng.uniform(0, 2e8, 200),
+            [0.0, -0.0, np.inf, -np.inf, np.nan],
+        ])
+        want = [piecewise_score(float(v), rules) for v in values]
+        assert [cmap(v) for v in values] == want, name
+        assert cmap.score(values).tolist() == want, name
+
+    assert CompiledScoreMap([])(1.0) == 0
+
+
+def test_total_scores_match_total_score():
+    weights = load_config(ROOT)["scoring"]["weights_global"]
+    rng = np.random.default_rng(1)
+    comps = [
+        {
+            "regime_fit": int(rng.integers(0, 101)),
+            "trend_momo": int(rng.integers(0, 101)),
+            "mean_reversion": int(rng.integers(0, 101)),
+            "volume_flow": int(rng.integers(0, 101)),
+            "risk_reward": int(rng.integers(0, 101)),
+            "liquidity": int(rng.integers(0, 101)),
+            "event_risk_penalty": int(rng.choice([0, -5, -10])),
+        }
+        for _ in range(500)
+    ]
+    comps.append({"trend_momo": 77})
+    got = total_scores(components_matrix(comps), weights)
+    assert got.tolist() == [total_score(c, weights) for c in comps]
+
+
+def test_round2_matches_python_round_on_ties():
+    rng = np.random.default_rng(2)
+    x = np.concatenate([
+        rng.uniform(-200, 200, 20000),
+        rng.integers(-40000, 40000, 20000) / 200.0,  # exact and near half-cents
+        np.array([2.675, 1.005, 0.125, -0.125, 0.0, -0.0, 1e15 + 0.5, np.nan, np.inf, -np.inf]),
+    ])
+    got = round2(x.reshape(5, -1)).ravel()
+    want = np.array([round(float(v), 2) for v in x])
+    np.testing.assert_array_equal(got, want)
+    assert np.signbit(got).tolist() == np.signbit(want).tolist()
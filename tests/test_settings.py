@@ -0,0 +1,91 @@
+import copy
+from pathlib import Path
+import pickle
+import shutil
+
+import pytest
+
+from src.common import config_loader, settings
+from src.common.config_loader import load_compiled, load_config
+from src.common.settings import ConfigError, compile_config, settings_for
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def project(tmp_path):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    return tmp_path
+
+
+def test_compile_config_reads_the_repo_config():
+    cfg = load_config(ROOT)
+    s = compile_config(cfg)
+    assert s.core.max_alerts_per_run == cfg["scoring"]["pools"]["CORE"]["max_alerts_per_run"]
+    assert s.trend_breakout.allowed_regimes == frozenset(cfg["strategies"]["TREND_BREAKOUT"]["allowed_regimes"])
+    assert [t.rr for t in s.trend_breakout.params.targets] == [t["rr"] for t in cfg["strategies"]["TREND_BREAKOUT"]["params"]["targets"]]
+    assert pickle.loads(pickle.dumps(s)) == s
+
+
+@pytest.mark.parametrize(
+    "mutate, path",
+    [
+        (lambda c: c["universe_filter"].pop("min_price"), "universe_filter.min_price: missing"),
+        (lambda c: c["scoring"]["pools"]["CORE"].update(max_alerts_per_run="20"), "scoring.pools.CORE.max_alerts_per_run"),
+        (lambda c: c["strategies"]["RS_ROTATION"].update(pool_default="NOPE"), "strategies.RS_ROTATION.pool_default"),
+        (lambda c: c["strategies"]["TREND_BREAKOUT"]["allowed_regimes"].append("BULL"), "strategies.TREND_BREAKOUT.allowed_regimes"),
+        (lambda c: c["scoring"]["weights_global"].update(momentum=0.1), "scoring.weights_global"),
+        (lambda c: c["strategies"]["TREND_BREAKOUT"]["params"].update(require_close_confirm="yes"), "strategies.TREND_BREAKOUT.params.require_close_confirm"),
+    ],
+)
+def test_compile_config_names_the_bad_key(mutate, path):
+    cfg = copy.deepcopy(load_config(ROOT))
+    mutate(cfg)
+    with pytest.raises(ConfigError, match=path.replace(".", r"\.")):
+        compile_config(cfg)
+
+
+def test_settings_for_is_compiled_once_per_dict():
+    cfg = copy.deepcopy(load_config(ROOT))
+    assert settings_for(cfg) is settings_for(cfg)
+    assert settings_for(copy.deepcopy(cfg)) is not settings_for(cfg)
+
+
+def test_load_compiled_caches_until_a_file_changes(project, monkeypatch):
+    first = load_compiled(project)
+    assert len(list((project / "data" / "cache" / "config").glob("compiled-*.pkl"))) == 1
+
+    def no_yaml(path):
+        raise AssertionError(f"parsed {path} despite a cached compile")
+
+    monkeypatch.setattr(config_loader, "load_yaml", no_yaml)
+    again = load_compiled(project)
+    assert again.digest == first.digest and again.cfg == first.cfg
+    # fresh dicts per load, as parsing would give
+    assert again.cfg is not first.cfg
+    again.cfg["universe_filter"]["min_price"] = -1
+    assert load_compiled(project).cfg["universe_filter"]["min_price"] != -1
+
+    monkeypatch.undo()
+    path = project / "config" / "config.yaml"
+    path.write_text(path.read_text(encoding="utf-8") + "\n# edited\n", encoding="utf-8")
+    assert load_compiled(project).digest != first.digest
+
+
+def test_load_compiled_rejects_an_invalid_config(project):
+    path = project / "config" / "config.yaml"
+    path.write_text(path.read_text(encoding="utf-8").replace("min_price:", "min_price_typo:", 1), encoding="utf-8")
+    with pytest.raises(ConfigError, match="universe_filter.min_price"):
+        load_compiled(project)
+    assert not list((project / "data" / "cache" / "config").glob("compiled-*.pkl"))
+
+
+def test_load_compiled_registers_its_settings(project, monkeypatch):
+    def no_compile(cfg):
+        raise AssertionError("compiled a config load_compiled already compiled")
+
+    for _ in range(2):  # compiled, then from the pickle
+        compiled = load_compiled(project)
+        with monkeypatch.context() as m:
+            m.setattr(settings, "compile_config", no_compile)
+            assert settings_for(compiled.cfg) is compiled.settings
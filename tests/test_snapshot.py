@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.common.config_loader import load_config, load_score_maps
+from src.data.loader import generate_synthetic_bars
+from src.features.feature_set import compute_daily_features
+from src.features.panel import build_bar_panel, compute_panel_features, panel_to_frames
+from src.features.snapshot import VALUE_COLUMNS, build_snapshot, snapshot_from_panel, snapshot_row, universe_mask
+from src.regime.classifier import classify_regime
+from src.strategies import rs_rotation, trend_breakout
+from src.universe.filter import passes_universe_filters
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_snapshot_matches_latest_dropna_row():
+    frames = {f"S{i}": generate_synthetic_bars(f"S{i}", n=300, seed=i) for i in range(6)}
+    frames["S1"]["volume"] *= 30
+    frames["NEW"] = generate_synthetic_bars("NEW", n=150, seed=9)
+    panel = build_bar_panel(frames)
+    features = compute_panel_features(panel)
+    feats = panel_to_frames(panel, features)
+
+    snap = build_snapshot(feats)
+    from_panel = snapshot_from_panel(panel, features)
+    for name in snap.dtype.names:
+        np.testing.assert_array_equal(from_panel[name], snap[name], err_msg=name)
+    for sym, row in zip(feats, snap):
+        valid = feats[sym].dropna()
+        assert row["symbol"] == sym and row["n_valid"] == len(valid)
+        if len(valid):
+            np.testing.assert_array_equal([row[c] for c in VALUE_COLUMNS], valid[VALUE_COLUMNS].iloc[-1].to_numpy(float))
+        else:
+            assert np.isnan(row["close"])
+
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    cfg["universe_filter"]["exclude_symbols"] = ["S2"]
+    mask = universe_mask(snap, cfg)
+    bench = compute_daily_features(generate_synthetic_bars("SPY", n=300, seed=1))
+    bench_row = snapshot_row(bench)
+    assert classify_regime(bench_row) == classify_regime(bench)
+    for sym, row, ok in zip(feats, snap, mask):
+        if not row["n_valid"]:
+            assert not ok
+            continue
+        assert ok == passes_universe_filters(feats[sym], cfg) == passes_universe_filters(row, cfg)
+        assert trend_breakout.evaluate(sym, row, cfg, maps) == trend_breakout.evaluate(sym, feats[sym], cfg, maps)
+        assert rs_rotation.evaluate(sym, row, bench_row, cfg, maps) == rs_rotation.evaluate(sym, feats[sym], bench, cfg, maps)
+    assert mask.any() and not mask.all()
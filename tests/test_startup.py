@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from src.common.importtime import HEAVY_MODULES, by_package, measure_imports, total_us
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# CLI entry points and what importing each may cost; measured in a fresh interpreter, so
+# the budget is generous (a few ms locally) and only trips when pandas & co. creep back in.
+ENTRY_POINTS = ["src.main", "src.publish.export_latest", "src.publish.shards", "src.runtime.daemon"]
+STARTUP_BUDGET_MS = 150
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_starts_without_heavy_imports(module):
+    rows = measure_imports(module, cwd=str(ROOT))
+    heavy = {r.module for r in rows if r.module.split(".")[0] in HEAVY_MODULES}
+    assert not heavy, f"{module} imports {sorted(heavy)[:5]} at startup"
+    assert total_us(rows, module) / 1000 < STARTUP_BUDGET_MS, by_package(rows)
+
+
+def test_measure_imports_sees_the_pipeline():
+    rows = measure_imports("src.pipeline.run", cwd=str(ROOT))
+    assert total_us(rows, "src.pipeline.run") > 0
+    assert "pandas" in by_package(rows)
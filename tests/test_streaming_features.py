@@ -0,0 +1,29 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.data.loader import generate_synthetic_bars
+from src.features.feature_set import compute_daily_features
+from src.features.panel import FEATURE_COLUMNS
+from src.features.streaming import IncrementalFeatures
+
+
+def test_streaming_matches_batch_across_a_saved_state():
+    df = generate_synthetic_bars("A", n=700, seed=5)
+    ref = compute_daily_features(df)
+
+    inc = IncrementalFeatures("A")
+    head = inc.seed(df.iloc[:400])
+    restored = IncrementalFeatures.from_state(json.loads(json.dumps(inc.to_state())))
+    tail = pd.DataFrame([restored.update(r) for r in df.iloc[400:].to_dict("records")])
+    got = pd.concat([head, tail], ignore_index=True)
+
+    for c in FEATURE_COLUMNS:
+        np.testing.assert_allclose(
+            got[c].to_numpy(float),
+            pd.to_numeric(ref[c]).to_numpy(float),
+            rtol=1e-9,
+            equal_nan=True,
+            err_msg=c,
+        )
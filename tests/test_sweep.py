@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.common.config_loader import load_config, load_score_maps, load_yaml
+from src.data.loader import generate_synthetic_bars
+from src.features.panel import build_bar_panel
+from src.research.sweep import FeatureMemo, expand_grid, run_sweep, sweep_point, trade_outcomes, walk_forward_folds
+
+ROOT = Path(__file__).resolve().parents[1]
+GRID = {
+    "TREND_BREAKOUT": {"require_close_confirm": [True, False], "stop_atr_multiple": [1.5, 2.0]},
+    "RS_ROTATION": {"rs_percentile_min": [0.5, 0.8]},
+}
+
+
+def test_trade_outcomes_stop_target_and_time_exit():
+    ts = pd.date_range("2024-01-01", periods=5, tz="UTC")
+    close = np.array([[10.0, 10.0, 10.0], [10.0, 10.0, 10.0], [10.0, 10.0, 10.5], [10.0, 10.0, 10.5], [10.0, 10.0, 10.5]])
+    high = close.copy()
+    low = close.copy()
+    high[2, 1] = 13.0  # target (entry 10 + 2 * 1.0 risk)
+    low[1, 0] = 8.5    # stop (entry 10 - 1.0)
+    panel = build_bar_panel({
+        s: pd.DataFrame({"timestamp": ts, "open": close[:, j], "high": high[:, j], "low": low[:, j], "close": close[:, j], "volume": 1.0})
+        for j, s in enumerate("ABC")
+    })
+    signal = np.zeros((5, 3), dtype=bool)
+    signal[0] = True
+    r = trade_outcomes(panel, signal, np.full((5, 3), 0.5), 2.0, 2.0, horizon=3)
+    assert r[0].tolist() == [-1.0, 2.0, 0.5]
+    assert np.isnan(r[1:]).all()
+
+
+def test_sweep_rows_and_memo_reuse(tmp_path):
+    cfg = load_config(ROOT)
+    maps = load_score_maps(ROOT)
+    frames = {f"S{i}": generate_synthetic_bars(f"S{i}", n=500, seed=i) for i in range(8)}
+    bench = generate_synthetic_bars("SPY", n=500, seed=1)
+
+    points = expand_grid(GRID)
+    assert len(points) == 6
+    folds = walk_forward_folds(len(build_bar_panel(frames).timestamps), 200, 50)
+
+    memo = FeatureMemo(build_bar_panel(frames), bench)
+    for i, (s, p) in enumerate(points):
+        sweep_point(memo, cfg, maps, i, s, p, folds, horizon=10)
+    # base and bench_ret60 computed once each
+    assert memo.misses == 2
+
+    serial = run_sweep(frames, bench, cfg, maps, GRID, tmp_path / "a.parquet", 200, 50, workers=1)
+    pooled = run_sweep(frames, bench, cfg, maps, GRID, tmp_path / "b.parquet", 200, 50, workers=2)
+    assert serial == pooled == len(points) * len(folds)
+    a = pd.read_parquet(tmp_path / "a.parquet")
+    b = pd.read_parquet(tmp_path / "b.parquet")
+    pd.testing.assert_frame_equal(a, b)
+    assert a["train_trades"].sum() > 0
+
+
+
+def test_grid_only_sweeps_params_the_live_strategies_read():
+    with pytest.raises(ValueError, match=r"grid\.TREND_BREAKOUT\.breakout_lookback_days"):
+        expand_grid({"TREND_BREAKOUT": {"breakout_lookback_days": [20, 55]}})
+    assert len(expand_grid(load_yaml(ROOT / "config" / "sweep_grid.yaml")["grid"])) == 10
+
+
+@pytest.mark.parametrize("bad", [{"horizon_bars": 0}, {"train_bars": 0}, {"test_bars": -1}])
+def test_run_sweep_rejects_empty_windows(tmp_path, bad):
+    frames = {"S0": generate_synthetic_bars("S0", n=300, seed=0)}
+    name = next(iter(bad))
+    with pytest.raises(ValueError, match=f"walk_forward.{name} must be >= 1"):
+        run_sweep(frames, frames["S0"], load_config(ROOT), load_score_maps(ROOT), GRID, tmp_path / "s.parquet", workers=1, **{"train_bars": 100, "test_bars": 50, **bad})
+    assert not (tmp_path / "s.parquet").exists()
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.run_benchmarks import bench_size, compare, parse_size
+from src.common.config_loader import load_config, load_score_maps
+from src.data.synthetic import generate_synthetic_panel, symbol_seed
+from src.pipeline.sources import synthetic_source
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_panel_is_deterministic_and_well_formed():
+    a = generate_synthetic_panel(600, 300, seed=7)
+    b = generate_synthetic_panel(600, 300, seed=7)
+    assert a.shape == (300, 600) and len(set(a.symbols)) == 600
+    for c in ("open", "high", "low", "close", "volume"):
+        assert np.array_equal(a[c], b[c]) and np.isfinite(a[c]).all()
+    assert (a["high"] >= np.maximum(a["open"], a["close"])).all()
+    assert (a["low"] <= np.minimum(a["open"], a["close"])).all()
+    assert (a["volume"] > 0).all()
+    # every symbol has its own path, across the block boundary too
+    assert len(np.unique(a["close"][-1])) == 600
+    assert not np.array_equal(generate_synthetic_panel(10, 300, seed=8)["close"], a["close"][:, :10])
+
+
+def test_panel_returns_are_correlated():
+    p = generate_synthetic_panel(80, 1000, seed=1, market_corr=0.4, sector_corr=0.0)
+    r = np.diff(np.log(p["close"]), axis=0)
+    c = np.corrcoef(r.T)[np.triu_indices(80, 1)]
+    assert 0.3 < c.mean() < 0.5
+
+
+def test_symbol_seeds_are_stable_and_distinct():
+    assert symbol_seed("AAPL") == symbol_seed("AAPL") != symbol_seed("MSFT")
+    bars = {r.symbol: r.df for r in synthetic_source(n=50)(["AAPL", "MSFT"])}
+    assert not np.allclose(bars["AAPL"]["close"], bars["MSFT"]["close"])
+
+
+def test_bench_size_and_regression_check():
+    res = bench_size(*parse_size("20x1"), load_config(ROOT), load_score_maps(ROOT), repeat=1)
+    assert res["bars"] == 252 and set(res["seconds"]) >= {"features", "strategies", "scoring", "alerts", "publish"}
+
+    base = {"results": {"20x1": {"seconds": {"features": 0.1, "alerts": 0.001}}}}
+    now = {"20x1": {"seconds": {"features": 0.3, "alerts": 0.01}}}
+    assert compare(now, base, tolerance=1.5, min_delta_s=0.02) == ["20x1 features: 0.3000s vs baseline 0.1000s (x3.00)"]
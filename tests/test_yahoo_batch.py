@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import yahoo_client
+from src.data.bar_store import BarStore
+from src.data.refresh import refresh_candles_batch, window_start_for
+from src.data.scheduler import fetch_batched
+from src.data.yahoo_client import fetch_stock_candles_yahoo_batch
+
+NOW = datetime(2024, 6, 28, 21, 0, tzinfo=timezone.utc)
+
+
+def _yf_frame(seed: int, start: str = "2023-06-01", end: str = "2024-06-28") -> pd.DataFrame:
+    # what yf.download returns for one ticker: capitalised columns on a naive date index
+    idx = pd.bdate_range(start, end, name="Date")
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, len(idx)))
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Adj Close": close, "Volume": 1e6},
+        index=idx,
+    )
+
+
+@pytest.fixture
+def download(monkeypatch):
+    """Stub yf.download: serves TICKERS (None = no data) and records each call's tickers/start."""
+    calls = []
+    tickers = {"AAA": _yf_frame(1), "BBB": _yf_frame(2), "CCC": _yf_frame(3), "DEAD": None}
+
+    def fake(tickers=None, start=None, end=None, group_by=None, **kw):
+        calls.append((list(tickers), start))
+        got = {t: data.loc[start:] for t in tickers if (data := download.tickers.get(t)) is not None}
+        if not got:
+            return pd.DataFrame()
+        if len(tickers) == 1:
+            return next(iter(got.values()))
+        return pd.concat(got, axis=1)
+
+    download = fake
+    download.calls = calls
+    download.tickers = tickers
+    monkeypatch.setattr(yahoo_client.yf, "download", fake)
+    return download
+
+
+def test_batch_splits_a_multiindex_frame_per_symbol(download):
+    frames, empty = fetch_stock_candles_yahoo_batch(["AAA", "DEAD", "BBB", "CCC"], "1d", 200, chunk_size=3, now_utc=NOW)
+
+    assert [c[0] for c in download.calls] == [["AAA", "DEAD", "BBB"], ["CCC"]]
+    assert set(frames) == {"AAA", "BBB", "CCC"} and empty == ["DEAD"]
+    for sym, seed in (("AAA", 1), ("BBB", 2), ("CCC", 3)):
+        df = frames[sym]
+        assert list(df.columns) == ["timestamp", "open", "high", "low", "close", "volume", "symbol"]
+        assert (df["symbol"] == sym).all() and str(df["timestamp"].dt.tz) == "UTC"
+        src = _yf_frame(seed).loc[download.calls[0][1]:]
+        np.testing.assert_array_equal(df["close"].to_numpy(), src["Close"].to_numpy())
+
+
+def test_single_ticker_chunk_and_all_empty_chunk(download, tmp_path):
+    store = BarStore(tmp_path)
+    frames, empty = fetch_stock_candles_yahoo_batch(["BBB"], "1d", 200, now_utc=NOW, store=store)
+    assert list(frames) == ["BBB"] and empty == []
+    assert len(store.read("BBB", "1d")) == len(frames["BBB"])
+
+    frames, empty = fetch_stock_candles_yahoo_batch(["DEAD", "GONE"], "1d", 200, chunk_size=1, now_utc=NOW, store=store)
+    assert frames == {} and empty == ["DEAD", "GONE"]
+    assert store.last_timestamp("DEAD", "1d") is None
+
+
+def test_refresh_batch_with_yahoo_deltas_after_the_first_fetch(download, tmp_path):
+    store = BarStore(tmp_path)
+    syms = ["AAA", "BBB", "DEAD"]
+    window_start = window_start_for(NOW, 200)
+
+    frames, empty = refresh_candles_batch(fetch_stock_candles_yahoo_batch, syms, "1d", 200, store, now_utc=NOW)
+    assert download.calls[-1] == (syms, window_start.date().isoformat())
+    assert set(frames) == {"AAA", "BBB"} and empty == ["DEAD"]
+    assert frames["AAA"]["timestamp"].iloc[0] >= window_start
+
+    # AAA and BBB now cover the window: the next refresh asks only for the overlap tail
+    refresh_candles_batch(fetch_stock_candles_yahoo_batch, ["AAA", "BBB"], "1d", 200, store, now_utc=NOW)
+    assert download.calls[-1] == (["AAA", "BBB"], "2024-06-27")
+
+    # a revised last bar overwrites the stored one
+    download.tickers["AAA"] = download.tickers["AAA"].copy()
+    download.tickers["AAA"].iloc[-1, download.tickers["AAA"].columns.get_loc("Close")] = 1.0
+    frames, _ = refresh_candles_batch(fetch_stock_candles_yahoo_batch, ["AAA", "BBB"], "1d", 200, store, now_utc=NOW)
+    assert frames["AAA"]["close"].iloc[-1] == 1.0
+    assert len(frames["AAA"]) == len(store.read("AAA", "1d", start=window_start))
+
+
+def test_fetch_batched_yields_every_symbol_in_order():
+    calls = []
+
+    def fetch_chunk(chunk):
+        calls.append(chunk)
+        if "BAD" in chunk:
+            raise RuntimeError("chunk failed")
+        return {s: pd.DataFrame({"close": [1.0]}) for s in chunk if s != "MISSING"}
+
+    syms = ["A", "B", "MISSING", "C", "BAD", "D", "E"]
+    results = list(fetch_batched(syms, fetch_chunk, chunk_size=3))
+
+    assert calls == [["A", "B", "MISSING"], ["C", "BAD", "D"], ["E"]]
+    assert [r.symbol for r in results] == syms
+    by_sym = {r.symbol: r for r in results}
+    assert by_sym["MISSING"].error is None and by_sym["MISSING"].df.empty
+    assert all(str(by_sym[s].error) == "chunk failed" and by_sym[s].df is None for s in ("C", "BAD", "D"))
+    assert by_sym["E"].error is None and len(by_sym["E"].df) == 1
+    assert list(fetch_batched([], fetch_chunk)) == []